@@ -0,0 +1,199 @@
+"""Drive the Jokes coordinator against local stand-in providers.
+
+Example::
+
+    python benchmarks/bench_fetch.py --refreshes 5000 --fetch-mode hedged \
+        --server jokeapi=latency=0.4,error_rate=0.1 \
+        --server icanhazdadjoke=rate_limit=60
+
+Reports wall time, refresh latency percentiles, refreshes served from the
+cache and provider requests skipped while throttled, sockets opened, the
+requests each stand-in received and peak memory. No network access is needed.
+
+The integration's own request budgets (30 a minute per provider, 120 for
+JokeAPI) would throttle a run after a few hundred requests, so the benchmark
+would then measure the cache fallback rather than the fetch strategies. They
+are lifted unless ``--client-rate-limit`` sets one. Server-driven backoff
+after 429 and 5xx responses still applies, so a stand-in's ``rate_limit``
+shows up in the results.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import math
+from pathlib import Path
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.ha_jokes.const import (
+    ATTR_FROM_CACHE,
+    DEFAULT_PROVIDERS,
+    FETCH_MODES,
+)
+from custom_components.ha_jokes.coordinator import JokesDataUpdateCoordinator
+from custom_components.ha_jokes.hub import async_close_hub, async_get_hub
+from custom_components.ha_jokes.ratelimit import RateLimitTracker
+from servers import PROVIDER_FORMATS, ServerBehaviour, StandInServer
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    """Return the q-th percentile (nearest rank) of sorted samples."""
+    if not samples:
+        return math.nan
+    return samples[min(len(samples) - 1, max(0, math.ceil(q / 100 * len(samples)) - 1))]
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--refreshes", type=int, default=2000)
+    parser.add_argument("--fetch-mode", choices=FETCH_MODES, default="sequential")
+    parser.add_argument("--hedge-delay", type=float, default=0.2)
+    parser.add_argument("--provider-timeout", type=int, default=2)
+    parser.add_argument("--pool-size", type=int, default=30)
+    parser.add_argument("--refill-threshold", type=int, default=10)
+    parser.add_argument("--entries", type=int, default=1, help="coordinators sharing the hub")
+    parser.add_argument(
+        "--client-rate-limit",
+        default="off",
+        metavar="PER_MINUTE",
+        help="client-side requests per minute for every provider; 'default' keeps "
+        "the integration's own budgets, 'off' (the default) lifts them",
+    )
+    parser.add_argument(
+        "--providers",
+        default=",".join(DEFAULT_PROVIDERS),
+        help="comma-separated providers to enable",
+    )
+    parser.add_argument(
+        "--server",
+        action="append",
+        default=[],
+        metavar="PROVIDER=SETTINGS",
+        help="per-server behaviour, e.g. jokeapi=latency=0.3,error_rate=0.1,"
+        "timeout_rate=0.01,rate_limit=120 (repeatable)",
+    )
+    parser.add_argument(
+        "--default-server",
+        default="",
+        metavar="SETTINGS",
+        help="behaviour for servers without their own --server setting",
+    )
+    return parser.parse_args()
+
+
+async def _run(args: argparse.Namespace) -> None:
+    providers = [name for name in args.providers.split(",") if name]
+    unknown = [name for name in providers if name not in PROVIDER_FORMATS]
+    if unknown:
+        raise SystemExit(f"No stand-in server for: {', '.join(unknown)}")
+    behaviours = {name: ServerBehaviour.parse(args.default_server) for name in providers}
+    for spec in args.server:
+        name, _, settings = spec.partition("=")
+        behaviours[name] = ServerBehaviour.parse(settings)
+
+    servers = {name: StandInServer(name, behaviours[name]) for name in providers}
+    for server in servers.values():
+        await server.start()
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        hub = async_get_hub(hass)
+        if args.client_rate_limit != "default":
+            rate = 10**9 if args.client_rate_limit == "off" else int(args.client_rate_limit)
+            hub.limits = RateLimitTracker({name: rate for name in hub.provider_names})
+        # Point every provider at its stand-in.
+        for name, server in servers.items():
+            config = hub._providers[name]
+            for key in ("url", "bulk_url"):
+                if key in config:
+                    config[key] = server.rewrite(config[key])
+
+        coordinators = [
+            JokesDataUpdateCoordinator(
+                hass,
+                refresh_interval=5,
+                enabled_providers=providers,
+                fetch_mode=args.fetch_mode,
+                hedge_delay=args.hedge_delay,
+                provider_timeout=args.provider_timeout,
+                pool_size=args.pool_size,
+                pool_refill_threshold=args.refill_threshold,
+            )
+            for _ in range(args.entries)
+        ]
+
+        tracemalloc.start()
+        latencies: list[float] = []
+        failures = from_cache = throttled_refreshes = 0
+        started = time.perf_counter()
+        for i in range(args.refreshes):
+            coordinator = coordinators[i % len(coordinators)]
+            throttled_before = hub.throttled
+            refresh_started = time.perf_counter()
+            await coordinator.async_refresh()
+            latencies.append(time.perf_counter() - refresh_started)
+            if hub.throttled > throttled_before:
+                throttled_refreshes += 1
+            if not coordinator.last_update_success:
+                failures += 1
+            elif coordinator.data.get(ATTR_FROM_CACHE):
+                from_cache += 1
+        wall = time.perf_counter() - started
+        _, peak_traced = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        client_stats = hub.client.stats
+        coalesced = hub.coalesced
+        throttled = hub.throttled
+        metrics = {name: hub.metrics.get(name).as_dict() for name in providers}
+        for coordinator in coordinators:
+            await coordinator.async_shutdown()
+        await async_close_hub(hass)
+        await hass.async_stop(force=True)
+
+    for server in servers.values():
+        await server.stop()
+
+    latencies.sort()
+    print(f"fetch mode        {args.fetch_mode} ({args.entries} entr{'y' if args.entries == 1 else 'ies'})")
+    print(f"client rate limit {args.client_rate_limit}")
+    print(f"refreshes         {args.refreshes} ({failures} failed)")
+    print(f"from cache        {from_cache} (every provider failed or was throttled)")
+    print(f"throttled         {throttled_refreshes} refreshes skipped a throttled provider")
+    print(f"wall time         {wall:.3f} s ({args.refreshes / wall:.0f} refreshes/s)")
+    for q in (50, 95, 99):
+        print(f"refresh p{q:<2}       {_percentile(latencies, q) * 1000:.2f} ms")
+    print(f"refresh max       {latencies[-1] * 1000:.2f} ms")
+    print(f"HTTP requests     {client_stats['requests']}")
+    print(f"sockets opened    {client_stats['connections_created']}")
+    print(f"sockets reused    {client_stats['connections_reused']}")
+    print(f"coalesced         {coalesced}")
+    print(f"throttled skips   {throttled}")
+    print(f"peak traced mem   {peak_traced / 1024:.0f} KiB")
+    print(f"peak RSS          {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB")
+    print()
+    print(f"{'provider':<20}{'served':>8}{'429':>6}{'500':>6}{'hang':>6}{'p95 ms':>9}")
+    for name, server in servers.items():
+        stats = server.stats
+        print(
+            f"{name:<20}{stats.requests:>8}{stats.rate_limited:>6}{stats.errors:>6}"
+            f"{stats.hangs:>6}{metrics[name]['latency_p95_ms'] or 0:>9}"
+        )
+
+
+def main() -> None:
+    """Run the benchmark."""
+    asyncio.run(_run(_parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""Local stand-ins for the joke provider APIs.
+
+Each server answers in the response format of one real provider, for both its
+single-joke and bulk endpoints, with configurable latency, error rate,
+timeouts and rate limiting. Nothing here touches the network beyond loopback.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+import itertools
+import random
+import time
+from typing import Any, Callable
+from urllib.parse import urlsplit, urlunsplit
+
+from aiohttp import web
+
+
+@dataclass
+class ServerBehaviour:
+    """How a stand-in server misbehaves."""
+
+    latency: float = 0.05        # seconds added to every response
+    jitter: float = 0.02         # up to this many extra seconds, uniformly
+    error_rate: float = 0.0      # share of requests answered with a 500
+    timeout_rate: float = 0.0    # share of requests that hang for `hang` seconds
+    hang: float = 60.0
+    rate_limit: int | None = None  # requests per `rate_period`; None is unlimited
+    rate_period: float = 60.0
+
+    @classmethod
+    def parse(cls, spec: str) -> ServerBehaviour:
+        """Parse ``latency=0.1,error_rate=0.05,...`` into a behaviour."""
+        behaviour = cls()
+        for item in filter(None, spec.split(",")):
+            key, _, value = item.partition("=")
+            key = key.strip()
+            if key not in cls.__dataclass_fields__:
+                raise ValueError(f"Unknown server setting: {key}")
+            setattr(behaviour, key, int(value) if key == "rate_limit" else float(value))
+        return behaviour
+
+
+@dataclass
+class ServerStats:
+    """What a stand-in server saw."""
+
+    requests: int = 0
+    errors: int = 0
+    hangs: int = 0
+    rate_limited: int = 0
+
+
+_COUNTER = itertools.count(1)
+
+
+def _joke_text() -> str:
+    """Return a unique joke, so repeat suppression never starves the pool."""
+    n = next(_COUNTER)
+    return f"Why did benchmark joke {n} cross the road? To reach request {n + 1}."
+
+
+def _icanhazdadjoke(bulk: bool) -> Any:
+    if bulk:
+        return {
+            "current_page": 1,
+            "limit": 20,
+            "results": [{"id": f"ich{next(_COUNTER)}", "joke": _joke_text()} for _ in range(20)],
+            "total_pages": 30,
+        }
+    return {"id": f"ich{next(_COUNTER)}", "joke": _joke_text(), "status": 200}
+
+
+def _jokeapi(bulk: bool) -> Any:
+    def joke() -> dict[str, Any]:
+        return {"error": False, "type": "single", "joke": _joke_text(), "id": next(_COUNTER)}
+
+    if bulk:
+        return {"error": False, "amount": 10, "jokes": [joke() for _ in range(10)]}
+    return joke()
+
+
+def _official(bulk: bool) -> Any:
+    def joke() -> dict[str, Any]:
+        text = _joke_text()
+        setup, _, punchline = text.partition("? ")
+        return {"id": next(_COUNTER), "type": "general", "setup": f"{setup}?", "punchline": punchline}
+
+    return [joke() for _ in range(10)] if bulk else joke()
+
+
+def _geekjokes(bulk: bool) -> Any:
+    return {"joke": _joke_text()}
+
+
+def _yomama(bulk: bool) -> Any:
+    return {"joke": _joke_text(), "category": "benchmark"}
+
+
+# Provider name -> (response builder, predicate telling bulk requests apart)
+PROVIDER_FORMATS: dict[str, tuple[Callable[[bool], Any], Callable[[web.Request], bool]]] = {
+    "icanhazdadjoke": (_icanhazdadjoke, lambda request: request.path.startswith("/search")),
+    "jokeapi": (_jokeapi, lambda request: "amount" in request.query),
+    "official_joke_api": (_official, lambda request: request.path.endswith("random_ten")),
+    "geek_jokes": (_geekjokes, lambda request: False),
+    "yomama_jokes": (_yomama, lambda request: False),
+}
+
+
+@dataclass
+class StandInServer:
+    """One running stand-in provider."""
+
+    provider: str
+    behaviour: ServerBehaviour
+    stats: ServerStats = field(default_factory=ServerStats)
+    port: int = 0
+    _runner: web.AppRunner | None = None
+    _window: deque[float] = field(default_factory=deque)
+
+    async def start(self) -> None:
+        """Start serving on a free loopback port."""
+        app = web.Application()
+        app.router.add_route("GET", "/{tail:.*}", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, "127.0.0.1", 0).start()
+        self.port = self._runner.addresses[0][1]
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def rewrite(self, url: str) -> str:
+        """Point a real provider URL at this server, keeping path and query."""
+        parts = urlsplit(url)
+        return urlunsplit(("http", f"127.0.0.1:{self.port}", parts.path, parts.query, ""))
+
+    def _rate_limited(self) -> dict[str, str] | None:
+        """Apply the sliding-window quota; return 429 headers if exceeded."""
+        limit = self.behaviour.rate_limit
+        if limit is None:
+            return None
+        now = time.monotonic()
+        while self._window and now - self._window[0] >= self.behaviour.rate_period:
+            self._window.popleft()
+        reset = self.behaviour.rate_period - (now - self._window[0]) if self._window else 0
+        if len(self._window) >= limit:
+            return {
+                "Retry-After": str(max(int(reset), 1)),
+                "RateLimit-Limit": str(limit),
+                "RateLimit-Remaining": "0",
+                "RateLimit-Reset": str(max(int(reset), 1)),
+            }
+        self._window.append(now)
+        return None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        """Answer like the real provider would, after the configured delay."""
+        behaviour = self.behaviour
+        self.stats.requests += 1
+        if (headers := self._rate_limited()) is not None:
+            self.stats.rate_limited += 1
+            return web.Response(status=429, headers=headers)
+
+        await asyncio.sleep(behaviour.latency + random.uniform(0, behaviour.jitter))
+        roll = random.random()
+        if roll < behaviour.timeout_rate:
+            self.stats.hangs += 1
+            await asyncio.sleep(behaviour.hang)
+        elif roll < behaviour.timeout_rate + behaviour.error_rate:
+            self.stats.errors += 1
+            return web.Response(status=500, text="stand-in failure")
+
+        build, is_bulk = PROVIDER_FORMATS[self.provider]
+        headers = {}
+        if behaviour.rate_limit is not None:
+            headers = {
+                "RateLimit-Limit": str(behaviour.rate_limit),
+                "RateLimit-Remaining": str(behaviour.rate_limit - len(self._window)),
+            }
+        return web.json_response(build(is_bulk(request)), headers=headers)
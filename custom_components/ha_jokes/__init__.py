@@ -1,27 +1,103 @@
 """The Jokes integration."""
 from __future__ import annotations
 
+import asyncio
+import importlib
 import logging
 from pathlib import Path
-from typing import Any
+import time
+from typing import TYPE_CHECKING, Any
+
+import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.const import ATTR_ENTITY_ID, Platform
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ConfigEntryNotReady, HomeAssistantError
+from homeassistant.helpers import entity_registry as er
+import homeassistant.helpers.config_validation as cv
 
+from .channels import channel_id_from_unique_id, channel_options, get_channels
 from .const import (
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_COUNT,
+    ATTR_FORCE,
+    ATTR_LIMIT,
+    ATTR_OFFSET,
     DOMAIN,
+    CONF_BLOCKLIST,
+    CONF_CATEGORIES,
+    CONF_CHANNEL_ID,
+    CONF_CORPUS_PATH,
+    CONF_DEMAND_ENTITY,
+    CONF_EXCLUDE_KEYWORDS,
+    CONF_FETCH_MODE,
+    CONF_HEDGE_DELAY,
+    CONF_IDLE_REFRESH_INTERVAL,
+    CONF_INCLUDE_KEYWORDS,
+    CONF_MAX_LENGTH,
+    CONF_POOL_REFILL_THRESHOLD,
+    CONF_POOL_SIZE,
+    CONF_PREGENERATE_BUDGET,
+    CONF_PREGENERATE_CONCURRENCY,
+    CONF_PREGENERATE_EXPLANATIONS,
+    CONF_PROVIDER_TIMEOUT,
     CONF_REFRESH_INTERVAL,
+    CONF_REFRESH_MODE,
+    CONF_SAFETY_FILTER,
+    CONF_SEEN_HISTORY_SIZE,
     CONF_PROVIDERS,
+    DEFAULT_BLOCKLIST,
+    DEFAULT_CATEGORIES,
+    DEFAULT_CORPUS_PATH,
+    DEFAULT_FETCH_MODE,
+    DEFAULT_GET_JOKES_COUNT,
+    DEFAULT_HISTORY_PAGE,
+    DEFAULT_HEDGE_DELAY,
+    DEFAULT_IDLE_REFRESH_INTERVAL,
+    DEFAULT_KEYWORDS,
+    DEFAULT_MAX_LENGTH,
+    DEFAULT_POOL_REFILL_THRESHOLD,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_PREGENERATE_BUDGET,
+    DEFAULT_PREGENERATE_CONCURRENCY,
+    DEFAULT_PREGENERATE_EXPLANATIONS,
+    DEFAULT_PROVIDER_TIMEOUT,
     DEFAULT_REFRESH_INTERVAL,
+    DEFAULT_REFRESH_MODE,
+    DEFAULT_SAFETY_FILTER,
     DEFAULT_PROVIDERS,
+    DEFAULT_SEEN_HISTORY_SIZE,
+    MAX_GET_JOKES_COUNT,
+    MAX_HISTORY_PAGE,
     VERSION,
 )
-from .sensor import JokesDataUpdateCoordinator
+from .store import JokesStore
+
+if TYPE_CHECKING:
+    from .coordinator import JokesDataUpdateCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
+# Modules only entry setup needs. They pull in the HTTP client, the websocket
+# API and the rest of the fetch stack, so they are imported in the executor
+# on first setup rather than when Home Assistant loads the package.
+_SETUP_MODULES = (
+    "coordinator",
+    "demand",
+    "explanations",
+    "filters",
+    "hub",
+    "jokelog",
+    "safety",
+)
+
 PLATFORMS: list[Platform] = [Platform.SENSOR]
 
 # URL the bundled Lovelace card is served from, and the flag key used to ensure
@@ -29,12 +105,139 @@ PLATFORMS: list[Platform] = [Platform.SENSOR]
 CARD_URL = f"/{DOMAIN}_frontend/ha-jokes-card.js"
 FRONTEND_REGISTERED = f"{DOMAIN}_frontend_registered"
 
+EXPLAIN_JOKE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_FORCE, default=False): cv.boolean,
+        vol.Optional(ATTR_ENTITY_ID): cv.entity_id,
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
+
+NEXT_JOKE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTITY_ID): cv.entity_id,
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
+
+GET_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_OFFSET, default=0): vol.All(
+            vol.Coerce(int), vol.Range(min=0)
+        ),
+        vol.Optional(ATTR_LIMIT, default=DEFAULT_HISTORY_PAGE): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_HISTORY_PAGE)
+        ),
+        vol.Optional(ATTR_ENTITY_ID): cv.entity_id,
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
+
+GET_JOKES_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_COUNT, default=DEFAULT_GET_JOKES_COUNT): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_GET_JOKES_COUNT)
+        ),
+        vol.Optional(ATTR_ENTITY_ID): cv.entity_id,
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
 
-async def _async_register_frontend(hass: HomeAssistant) -> None:
-    """Serve and auto-load the bundled custom Lovelace card (idempotent)."""
-    if hass.data.get(FRONTEND_REGISTERED):
-        return
 
+@callback
+def _async_resolve_entry_data(
+    hass: HomeAssistant, call: ServiceCall
+) -> dict[str, Any] | None:
+    """Return the hass.data record of the entry a service call targets.
+
+    A call may target an entry directly (``config_entry_id``) or through one of
+    its entities (``entity_id``); both resolve with dictionary lookups. An
+    entity of a channel resolves to that channel's record, which has the same
+    shape as the entry's. Without a target, the first loaded entry is used.
+    """
+    entries: dict[str, Any] = hass.data.get(DOMAIN, {})
+    if entry_id := call.data.get(ATTR_CONFIG_ENTRY_ID):
+        return entries.get(entry_id)
+    if entity_id := call.data.get(ATTR_ENTITY_ID):
+        entity_entry = er.async_get(hass).async_get(entity_id)
+        if entity_entry is None or entity_entry.config_entry_id is None:
+            return None
+        entry_data = entries.get(entity_entry.config_entry_id)
+        channel_id = channel_id_from_unique_id(
+            entity_entry.config_entry_id, entity_entry.unique_id
+        )
+        if entry_data is None or channel_id is None:
+            return entry_data
+        return entry_data["channels"].get(channel_id)
+    return next(iter(entries.values()), None)
+
+
+@callback
+def _async_require_entry_data(hass: HomeAssistant, call: ServiceCall) -> dict[str, Any]:
+    """Return the targeted entry's hass.data record, or fail the action."""
+    if (entry_data := _async_resolve_entry_data(hass, call)) is None:
+        raise HomeAssistantError(
+            "No Jokes entry found for "
+            f"{call.data.get(ATTR_CONFIG_ENTRY_ID) or call.data.get(ATTR_ENTITY_ID)}"
+        )
+    return entry_data
+
+
+def _import_setup_modules() -> None:
+    """Import the modules entry setup needs; runs in the executor."""
+    for name in _SETUP_MODULES:
+        importlib.import_module(f"{__package__}.{name}")
+
+
+def _create_coordinator(
+    hass: HomeAssistant, store_id: str, options: dict[str, Any]
+) -> JokesDataUpdateCoordinator:
+    """Create the coordinator of an entry, or of one of its channels."""
+    from .coordinator import JokesDataUpdateCoordinator
+    from .filters import JokeFilter, parse_keywords
+    from .safety import ContentFilter
+
+    return JokesDataUpdateCoordinator(
+        hass,
+        options.get(CONF_REFRESH_INTERVAL, DEFAULT_REFRESH_INTERVAL),
+        options.get(CONF_PROVIDERS, DEFAULT_PROVIDERS),
+        fetch_mode=options.get(CONF_FETCH_MODE, DEFAULT_FETCH_MODE),
+        hedge_delay=options.get(CONF_HEDGE_DELAY, DEFAULT_HEDGE_DELAY),
+        provider_timeout=options.get(CONF_PROVIDER_TIMEOUT, DEFAULT_PROVIDER_TIMEOUT),
+        pool_size=options.get(CONF_POOL_SIZE, DEFAULT_POOL_SIZE),
+        pool_refill_threshold=options.get(
+            CONF_POOL_REFILL_THRESHOLD, DEFAULT_POOL_REFILL_THRESHOLD
+        ),
+        seen_history_size=options.get(
+            CONF_SEEN_HISTORY_SIZE, DEFAULT_SEEN_HISTORY_SIZE
+        ),
+        corpus_path=options.get(CONF_CORPUS_PATH, DEFAULT_CORPUS_PATH),
+        store=JokesStore(hass, store_id),
+        refresh_mode=options.get(CONF_REFRESH_MODE, DEFAULT_REFRESH_MODE),
+        idle_refresh_interval=options.get(
+            CONF_IDLE_REFRESH_INTERVAL, DEFAULT_IDLE_REFRESH_INTERVAL
+        ),
+        demand_entity=options.get(CONF_DEMAND_ENTITY),
+        joke_filter=JokeFilter(
+            categories=options.get(CONF_CATEGORIES, DEFAULT_CATEGORIES),
+            max_length=options.get(CONF_MAX_LENGTH, DEFAULT_MAX_LENGTH),
+            include_keywords=parse_keywords(
+                options.get(CONF_INCLUDE_KEYWORDS, DEFAULT_KEYWORDS)
+            ),
+            exclude_keywords=parse_keywords(
+                options.get(CONF_EXCLUDE_KEYWORDS, DEFAULT_KEYWORDS)
+            ),
+        ),
+        content_filter=(
+            ContentFilter(parse_keywords(options.get(CONF_BLOCKLIST, DEFAULT_BLOCKLIST)))
+            if options.get(CONF_SAFETY_FILTER, DEFAULT_SAFETY_FILTER)
+            else None
+        ),
+    )
+
+
+async def _async_register_frontend(hass: HomeAssistant) -> None:
+    """Serve and auto-load the bundled custom Lovelace card."""
     card_path = Path(__file__).parent / "www" / "ha-jokes-card.js"
 
     try:
@@ -58,71 +261,201 @@ async def _async_register_frontend(hass: HomeAssistant) -> None:
             CARD_URL,
         )
 
-    hass.data[FRONTEND_REGISTERED] = True
     _LOGGER.debug("Registered ha-jokes-card frontend resource at %s", CARD_URL)
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Jokes from a config entry."""
     _LOGGER.debug("Setting up Jokes integration")
+    setup_started = time.perf_counter()
+
+    # Import the fetch stack off the event loop; only the first setup pays
+    await hass.async_add_executor_job(_import_setup_modules)
+    import_duration = time.perf_counter() - setup_started
+
+    from .demand import async_register_websocket_commands
+    from .explanations import ExplanationPrefetcher, async_get_explanation_cache
 
     # Store the config entry data in hass.data
     hass.data.setdefault(DOMAIN, {})
 
-    # Serve and auto-load the bundled custom Lovelace card (once per instance)
-    await _async_register_frontend(hass)
-    
-    # Get refresh interval and providers from options
-    refresh_interval = entry.options.get(
-        CONF_REFRESH_INTERVAL, DEFAULT_REFRESH_INTERVAL
-    )
-    enabled_providers = entry.options.get(
-        CONF_PROVIDERS, DEFAULT_PROVIDERS
-    )
+    # Serve and auto-load the bundled custom Lovelace card (once per instance).
+    # Nothing in setup depends on it, so it runs in the background.
+    if not hass.data.get(FRONTEND_REGISTERED):
+        hass.data[FRONTEND_REGISTERED] = True
+        hass.async_create_background_task(
+            _async_register_frontend(hass), f"{DOMAIN} frontend registration"
+        )
+    async_register_websocket_commands(hass)
     
-    # Create coordinator
-    coordinator = JokesDataUpdateCoordinator(hass, refresh_interval, enabled_providers)
+    # One coordinator for the entry itself and one per channel; all of them
+    # are fed by the shared fetch hub
+    coordinator = _create_coordinator(hass, entry.entry_id, entry.options)
+    channels = {
+        channel[CONF_CHANNEL_ID]: _create_coordinator(
+            hass,
+            f"{entry.entry_id}_{channel[CONF_CHANNEL_ID]}",
+            channel_options(entry.options, channel),
+        )
+        for channel in get_channels(entry.options)
+    }
+    coordinators = [coordinator, *channels.values()]
     
-    # Fetch initial data - this can raise ConfigEntryNotReady
+    # Populate from disk if we can; the network is then only touched by the
+    # background pool refill. Otherwise fetch initial data; only the entry's
+    # own coordinator can raise ConfigEntryNotReady. Channels load side by
+    # side, and their first fetches are merged by the hub.
+    data_started = time.perf_counter()
+    restored_flags = await asyncio.gather(
+        *(channel.async_restore() for channel in coordinators)
+    )
+    restored = all(restored_flags)
+    for channel, channel_restored in zip(coordinators, restored_flags):
+        if channel_restored:
+            channel.async_schedule_refill()
+    first_refreshes = [
+        channel.async_config_entry_first_refresh()
+        if channel is coordinator
+        else channel.async_refresh()
+        for channel, channel_restored in zip(coordinators, restored_flags)
+        if not channel_restored
+    ]
     try:
-        await coordinator.async_config_entry_first_refresh()
+        await asyncio.gather(*first_refreshes)
     except Exception as err:
         _LOGGER.error("Jokes integration failed to fetch initial data: %s", err)
+        for channel in coordinators:
+            await channel.async_shutdown()
         raise ConfigEntryNotReady from err
+    # A channel that failed retries on its own schedule, with its sensors
+    # unavailable until then
+    for channel_id, channel in channels.items():
+        if not channel.last_update_success:
+            _LOGGER.warning(
+                "Jokes channel %s failed to fetch initial data; retrying on its "
+                "refresh interval",
+                channel_id,
+            )
+    data_duration = time.perf_counter() - data_started
     
-    # Store coordinator in hass.data
+    # Store coordinators in hass.data; each channel record has the same
+    # shape as the entry's, so actions can target either
     hass.data[DOMAIN][entry.entry_id] = {
         "coordinator": coordinator,
         "data": entry.data,
         "explanation_entity": None,  # Will be set by the sensor platform
+        "channels": {
+            channel_id: {"coordinator": channel, "explanation_entity": None}
+            for channel_id, channel in channels.items()
+        },
     }
+
+    # In on-demand mode, follow which dashboards are showing this entry
+    for channel in coordinators:
+        channel.async_start_demand_tracking(entry.entry_id)
     
+    # Load cached explanations before the explain_joke action can be called
+    cache = await async_get_explanation_cache(hass)
+
+    # Explanation sensors of the entry and its channels share one prefetcher,
+    # so channels don't multiply the AI budget
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    entry_data["prefetcher"] = (
+        ExplanationPrefetcher(
+            hass,
+            cache,
+            entry.options.get(CONF_PREGENERATE_CONCURRENCY, DEFAULT_PREGENERATE_CONCURRENCY),
+            entry.options.get(CONF_PREGENERATE_BUDGET, DEFAULT_PREGENERATE_BUDGET),
+        )
+        if entry.options.get(
+            CONF_PREGENERATE_EXPLANATIONS, DEFAULT_PREGENERATE_EXPLANATIONS
+        )
+        else None
+    )
+
     # Set up platforms
+    platforms_started = time.perf_counter()
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    platforms_duration = time.perf_counter() - platforms_started
     
     # Register the explain_joke action (only once)
-    async def handle_explain_joke(call):
+    async def handle_explain_joke(call: ServiceCall) -> None:
         """Handle the explain_joke action."""
-        # Find the explanation sensor entity for any entry
-        explanation_entity = None
-        for entry_id, entry_data in hass.data[DOMAIN].items():
-            if isinstance(entry_data, dict) and "explanation_entity" in entry_data:
-                explanation_entity = entry_data["explanation_entity"]
-                if explanation_entity:
-                    break
-        
+        entry_data = _async_require_entry_data(hass, call)
+        explanation_entity = entry_data["explanation_entity"]
         if not explanation_entity:
-            _LOGGER.error("Joke Explanation entity not found or not yet initialized")
-            return
-        
-        await explanation_entity.async_explain_joke()
+            raise HomeAssistantError(
+                "Joke Explanation entity not found or not yet initialized"
+            )
+
+        await explanation_entity.async_explain_joke(force=call.data[ATTR_FORCE])
     
     # Only register the service if it hasn't been registered yet
     if not hass.services.has_service(DOMAIN, "explain_joke"):
-        hass.services.async_register(DOMAIN, "explain_joke", handle_explain_joke)
+        hass.services.async_register(
+            DOMAIN,
+            "explain_joke",
+            handle_explain_joke,
+            schema=EXPLAIN_JOKE_SCHEMA,
+        )
+    
+    async def handle_next_joke(call: ServiceCall) -> None:
+        """Handle the next_joke action."""
+        entry_data = _async_require_entry_data(hass, call)
+        await entry_data["coordinator"].async_next_joke()
+
+    if not hass.services.has_service(DOMAIN, "next_joke"):
+        hass.services.async_register(
+            DOMAIN,
+            "next_joke",
+            handle_next_joke,
+            schema=NEXT_JOKE_SCHEMA,
+        )
+
+    async def handle_get_history(call: ServiceCall) -> ServiceResponse:
+        """Handle the get_history action."""
+        entry_data = _async_require_entry_data(hass, call)
+        return entry_data["coordinator"].history_page(
+            call.data[ATTR_OFFSET], call.data[ATTR_LIMIT]
+        )
+
+    if not hass.services.has_service(DOMAIN, "get_history"):
+        hass.services.async_register(
+            DOMAIN,
+            "get_history",
+            handle_get_history,
+            schema=GET_HISTORY_SCHEMA,
+            supports_response=SupportsResponse.ONLY,
+        )
+    
+    async def handle_get_jokes(call: ServiceCall) -> ServiceResponse:
+        """Handle the get_jokes action."""
+        entry_data = _async_require_entry_data(hass, call)
+        jokes = await entry_data["coordinator"].async_get_jokes(call.data[ATTR_COUNT])
+        return {"jokes": jokes}
+
+    if not hass.services.has_service(DOMAIN, "get_jokes"):
+        hass.services.async_register(
+            DOMAIN,
+            "get_jokes",
+            handle_get_jokes,
+            schema=GET_JOKES_SCHEMA,
+            supports_response=SupportsResponse.ONLY,
+        )
     
     # Set up options update listener
     entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
+    _LOGGER.debug(
+        "Set up Jokes entry %s in %.3f s (imports %.3f s, first data %.3f s "
+        "from %s, platform setup %.3f s)",
+        entry.entry_id,
+        time.perf_counter() - setup_started,
+        import_duration,
+        data_duration,
+        "disk" if restored else "network",
+        platforms_duration,
+    )
     
     return True
 
@@ -135,15 +468,49 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        entry_data = hass.data[DOMAIN].pop(entry.entry_id)
+        if entry_data["prefetcher"] is not None:
+            entry_data["prefetcher"].async_cancel()
+        await entry_data["coordinator"].async_shutdown()
+        for channel_data in entry_data["channels"].values():
+            await channel_data["coordinator"].async_shutdown()
         
-        # Unregister service if no more entries
+        # Unregister services if no more entries. The shared fetch hub stays:
+        # an options change reloads the entry, and provider health, rate
+        # limits and backoff must survive that. It closes when Home Assistant
+        # stops or the last entry is deleted.
         if not hass.data[DOMAIN]:
             hass.services.async_remove(DOMAIN, "explain_joke")
+            hass.services.async_remove(DOMAIN, "next_joke")
+            hass.services.async_remove(DOMAIN, "get_history")
+            hass.services.async_remove(DOMAIN, "get_jokes")
     
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored jokes, and with the last entry the shared stores, on delete."""
+    await JokesStore(hass, entry.entry_id).async_remove()
+    for channel in get_channels(entry.options):
+        await JokesStore(
+            hass, f"{entry.entry_id}_{channel[CONF_CHANNEL_ID]}"
+        ).async_remove()
+    # The joke log, the explanation cache and the fetch hub are shared by
+    # every entry; they go with the last one
+    if not any(
+        other.entry_id != entry.entry_id
+        for other in hass.config_entries.async_entries(DOMAIN)
+    ):
+        await hass.async_add_executor_job(_import_setup_modules)
+        from .explanations import async_remove_explanation_cache
+        from .hub import async_close_hub
+        from .jokelog import async_get_joke_log
+
+        await async_get_joke_log(hass).async_remove()
+        await async_remove_explanation_cache(hass)
+        await async_close_hub(hass)
+
+
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Reload config entry."""
     await async_unload_entry(hass, entry)
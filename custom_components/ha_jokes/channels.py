@@ -0,0 +1,83 @@
+"""Joke channels: extra joke sensors of one config entry.
+
+A channel has its own name, refresh interval, providers and filters, and
+takes everything else from the entry's options. Each channel runs its own
+coordinator and pool, but all of them are fed by the shared fetch hub, so a
+batch fetched for one channel lands in every channel that uses its provider.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from itertools import chain
+from typing import TYPE_CHECKING, Any
+import uuid
+
+from homeassistant.const import CONF_NAME
+
+from .const import (
+    CONF_CATEGORIES,
+    CONF_CHANNEL_ID,
+    CONF_CHANNELS,
+    CONF_EXCLUDE_KEYWORDS,
+    CONF_INCLUDE_KEYWORDS,
+    CONF_MAX_LENGTH,
+    CONF_PROVIDERS,
+    CONF_REFRESH_INTERVAL,
+    DOMAIN,
+)
+
+if TYPE_CHECKING:
+    from .coordinator import JokesDataUpdateCoordinator
+
+# Entry options a channel sets for itself.
+CHANNEL_OPTIONS = (
+    CONF_REFRESH_INTERVAL,
+    CONF_PROVIDERS,
+    CONF_CATEGORIES,
+    CONF_MAX_LENGTH,
+    CONF_INCLUDE_KEYWORDS,
+    CONF_EXCLUDE_KEYWORDS,
+)
+
+
+def new_channel_id() -> str:
+    """Return a short random ID for a new channel."""
+    return uuid.uuid4().hex[:8]
+
+
+def get_channels(options: dict[str, Any]) -> list[dict[str, Any]]:
+    """Return the channels defined in an entry's options."""
+    return list(options.get(CONF_CHANNELS, []))
+
+
+def channel_options(options: dict[str, Any], channel: dict[str, Any]) -> dict[str, Any]:
+    """Return an entry's options with a channel's own settings applied."""
+    return {
+        **options,
+        **{key: channel[key] for key in CHANNEL_OPTIONS if key in channel},
+    }
+
+
+def entry_providers(coordinators: Iterable[JokesDataUpdateCoordinator]) -> list[str]:
+    """Return the providers enabled for an entry or any of its channels, in order."""
+    return list(
+        dict.fromkeys(chain.from_iterable(c.providers for c in coordinators))
+    )
+
+
+def channel_unique_id(entry_id: str, channel_id: str) -> str:
+    """Return the unique ID of a channel's joke sensor."""
+    return f"{DOMAIN}_{entry_id}_channel_{channel_id}"
+
+
+def channel_id_from_unique_id(entry_id: str, unique_id: str) -> str | None:
+    """Return the channel a sensor's unique ID belongs to, or None for the entry."""
+    prefix = f"{DOMAIN}_{entry_id}_channel_"
+    if not unique_id.startswith(prefix):
+        return None
+    return unique_id[len(prefix):].removesuffix("_explanation")
+
+
+def channel_title(channel: dict[str, Any]) -> str:
+    """Return a channel's display name."""
+    return channel.get(CONF_NAME) or channel[CONF_CHANNEL_ID]
@@ -0,0 +1,104 @@
+"""Pooled HTTP client used by the Jokes fetch hub."""
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+import aiohttp
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant
+
+from .const import (
+    HTTP_DNS_CACHE_TTL,
+    HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_LIMIT,
+    HTTP_LIMIT_PER_HOST,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class JokesHttpClient:
+    """Long-lived aiohttp session with keep-alive, DNS caching and per-host limits.
+
+    Every provider request goes through one connector, so consecutive refreshes
+    reuse warm TCP/TLS connections instead of paying a fresh handshake per joke.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the client; the session itself is created lazily."""
+        self._hass = hass
+        self._session: aiohttp.ClientSession | None = None
+        self._unsub_close = hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_CLOSE, self._async_handle_close
+        )
+        self.requests = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Return the pooled session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=HTTP_LIMIT,
+                limit_per_host=HTTP_LIMIT_PER_HOST,
+                ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+                keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector, trace_configs=[self._build_trace_config()]
+            )
+        return self._session
+
+    def _build_trace_config(self) -> aiohttp.TraceConfig:
+        """Count requests and whether each one opened or reused a connection."""
+
+        async def _on_request_start(*_: Any) -> None:
+            self.requests += 1
+
+        async def _on_connection_create_end(*_: Any) -> None:
+            self.connections_created += 1
+
+        async def _on_connection_reuseconn(*_: Any) -> None:
+            self.connections_reused += 1
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(_on_request_start)
+        trace_config.on_connection_create_end.append(_on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(_on_connection_reuseconn)
+        return trace_config
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Return the connection reuse counters."""
+        return {
+            "requests": self.requests,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+        }
+
+    def log_stats(self) -> None:
+        """Log the connection reuse counters at debug level."""
+        _LOGGER.debug(
+            "HTTP pool: %s requests, %s connections opened, %s reused",
+            self.requests,
+            self.connections_created,
+            self.connections_reused,
+        )
+
+    async def async_close(self) -> None:
+        """Close the pooled session and its connector."""
+        if self._unsub_close is not None:
+            self._unsub_close()
+            self._unsub_close = None
+        if self._session is not None and not self._session.closed:
+            self.log_stats()
+            await self._session.close()
+        self._session = None
+
+    async def _async_handle_close(self, event: Event) -> None:
+        """Close the session when Home Assistant shuts down."""
+        self._unsub_close = None
+        await self.async_close()
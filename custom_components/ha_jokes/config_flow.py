@@ -2,33 +2,119 @@
 from __future__ import annotations
 
 import logging
+import os
 from typing import Any
 
 import voluptuous as vol
 
 from homeassistant import config_entries
+from homeassistant.const import CONF_NAME
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers import entity_registry as er, selector
 import homeassistant.helpers.config_validation as cv
 
+from .channels import channel_title, channel_unique_id, get_channels, new_channel_id
 from .const import (
+    CONF_BLOCKLIST,
+    CONF_CATEGORIES,
+    CONF_CHANNEL_ID,
+    CONF_CHANNELS,
+    CONF_COMPACT_HISTORY,
+    CONF_CORPUS_PATH,
+    CONF_DEMAND_ENTITY,
+    CONF_EXCLUDE_KEYWORDS,
+    CONF_FETCH_MODE,
+    CONF_HEDGE_DELAY,
+    CONF_IDLE_REFRESH_INTERVAL,
+    CONF_INCLUDE_KEYWORDS,
+    CONF_MAX_LENGTH,
+    CONF_POOL_REFILL_THRESHOLD,
+    CONF_POOL_SIZE,
+    CONF_PREGENERATE_BUDGET,
+    CONF_PREGENERATE_CONCURRENCY,
+    CONF_PREGENERATE_EXPLANATIONS,
+    CONF_PROVIDER_TIMEOUT,
     CONF_PROVIDERS,
     CONF_REFRESH_INTERVAL,
+    CONF_REFRESH_MODE,
+    CONF_SAFETY_FILTER,
+    CONF_SEEN_HISTORY_SIZE,
+    DEFAULT_BLOCKLIST,
+    DEFAULT_CATEGORIES,
+    DEFAULT_COMPACT_HISTORY,
+    DEFAULT_CORPUS_PATH,
+    DEFAULT_FETCH_MODE,
+    DEFAULT_HEDGE_DELAY,
+    DEFAULT_IDLE_REFRESH_INTERVAL,
+    DEFAULT_KEYWORDS,
+    DEFAULT_MAX_LENGTH,
+    DEFAULT_POOL_REFILL_THRESHOLD,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_PREGENERATE_BUDGET,
+    DEFAULT_PREGENERATE_CONCURRENCY,
+    DEFAULT_PREGENERATE_EXPLANATIONS,
+    DEFAULT_PROVIDER_TIMEOUT,
     DEFAULT_PROVIDERS,
     DEFAULT_REFRESH_INTERVAL,
+    DEFAULT_REFRESH_MODE,
+    DEFAULT_SAFETY_FILTER,
+    DEFAULT_SEEN_HISTORY_SIZE,
     DOMAIN,
+    FETCH_MODE_HEDGED,
+    FETCH_MODE_RACE_ALL,
+    FETCH_MODE_SEQUENTIAL,
+    JOKE_CATEGORIES,
+    MAX_HEDGE_DELAY,
+    MAX_CHANNELS,
+    MAX_IDLE_REFRESH_INTERVAL,
+    MAX_MAX_LENGTH,
+    MAX_POOL_SIZE,
+    MAX_PREGENERATE_BUDGET,
+    MAX_PREGENERATE_CONCURRENCY,
+    MAX_PROVIDER_TIMEOUT,
     MAX_REFRESH_INTERVAL,
+    MAX_SEEN_HISTORY_SIZE,
+    MIN_HEDGE_DELAY,
+    MIN_IDLE_REFRESH_INTERVAL,
+    MIN_MAX_LENGTH,
+    MIN_POOL_REFILL_THRESHOLD,
+    MIN_POOL_SIZE,
+    MIN_PREGENERATE_BUDGET,
+    MIN_PREGENERATE_CONCURRENCY,
+    MIN_PROVIDER_TIMEOUT,
     MIN_REFRESH_INTERVAL,
+    MIN_SEEN_HISTORY_SIZE,
     NAME,
     PROVIDER_GEEKJOKES,
     PROVIDER_ICANHAZDADJOKE,
     PROVIDER_JOKEAPI,
+    PROVIDER_LOCAL,
     PROVIDER_OFFICIAL,
     PROVIDER_YOMAMA,
+    REFRESH_MODE_ALWAYS,
+    REFRESH_MODE_ON_DEMAND,
 )
+from .store import JokesStore
 
 _LOGGER = logging.getLogger(__name__)
 
+PROVIDER_OPTIONS = {
+    PROVIDER_ICANHAZDADJOKE: "icanhazdadjoke.com",
+    PROVIDER_JOKEAPI: "JokeAPI (jokeapi.dev)",
+    PROVIDER_OFFICIAL: "Official Joke API",
+    PROVIDER_GEEKJOKES: "Geek Jokes (⚠️ not family-friendly)",
+    PROVIDER_YOMAMA: "Yo Mama Jokes (⚠️ not family-friendly)",
+    PROVIDER_LOCAL: "Local joke file (offline)",
+}
+
+
+async def _async_corpus_exists(hass: HomeAssistant, corpus_path: str) -> bool:
+    """Return whether the local joke file exists in the config directory."""
+    return await hass.async_add_executor_job(
+        os.path.isfile, hass.config.path(corpus_path)
+    )
+
 
 class JokesConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Jokes."""
@@ -51,6 +137,10 @@ class JokesConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             providers = user_input.get(CONF_PROVIDERS, [])
             if not providers:
                 errors[CONF_PROVIDERS] = "no_providers_selected"
+            elif PROVIDER_LOCAL in providers and not await _async_corpus_exists(
+                self.hass, DEFAULT_CORPUS_PATH
+            ):
+                errors[CONF_PROVIDERS] = "corpus_not_found"
             
             if not errors:
                 # Create the config entry
@@ -71,13 +161,7 @@ class JokesConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 ): vol.All(cv.positive_int, vol.Range(min=MIN_REFRESH_INTERVAL, max=MAX_REFRESH_INTERVAL)),
                 vol.Required(
                     CONF_PROVIDERS, default=DEFAULT_PROVIDERS
-                ): cv.multi_select({
-                    PROVIDER_ICANHAZDADJOKE: "icanhazdadjoke.com",
-                    PROVIDER_JOKEAPI: "JokeAPI (jokeapi.dev)",
-                    PROVIDER_OFFICIAL: "Official Joke API",
-                    PROVIDER_GEEKJOKES: "Geek Jokes (⚠️ not family-friendly)",
-                    PROVIDER_YOMAMA: "Yo Mama Jokes (⚠️ not family-friendly)",
-                }),
+                ): cv.multi_select(PROVIDER_OPTIONS),
             }
         )
 
@@ -107,7 +191,16 @@ class JokesOptionsFlow(config_entries.OptionsFlow):
     async def async_step_init(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
-        """Manage the options."""
+        """Manage the options, or the entry's channels."""
+        menu_options = ["settings", "add_channel"]
+        if get_channels(self._config_entry.options):
+            menu_options.append("remove_channel")
+        return self.async_show_menu(step_id="init", menu_options=menu_options)
+
+    async def async_step_settings(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the entry's own options."""
         errors: dict[str, str] = {}
 
         if user_input is not None:
@@ -120,9 +213,23 @@ class JokesOptionsFlow(config_entries.OptionsFlow):
             providers = user_input.get(CONF_PROVIDERS, [])
             if not providers:
                 errors[CONF_PROVIDERS] = "no_providers_selected"
+            elif PROVIDER_LOCAL in providers and not await _async_corpus_exists(
+                self.hass, user_input[CONF_CORPUS_PATH]
+            ):
+                errors[CONF_CORPUS_PATH] = "corpus_not_found"
+
+            # The pool must be able to rise above its refill threshold
+            if user_input[CONF_POOL_REFILL_THRESHOLD] >= user_input[CONF_POOL_SIZE]:
+                errors[CONF_POOL_REFILL_THRESHOLD] = "invalid_pool_refill_threshold"
             
             if not errors:
-                return self.async_create_entry(title="", data=user_input)
+                return self.async_create_entry(
+                    title="",
+                    data={
+                        **user_input,
+                        CONF_CHANNELS: get_channels(self._config_entry.options),
+                    },
+                )
 
         # Get current options or defaults
         current_refresh_interval = self._config_entry.options.get(
@@ -131,6 +238,64 @@ class JokesOptionsFlow(config_entries.OptionsFlow):
         current_providers = self._config_entry.options.get(
             CONF_PROVIDERS, DEFAULT_PROVIDERS
         )
+        current_refresh_mode = self._config_entry.options.get(
+            CONF_REFRESH_MODE, DEFAULT_REFRESH_MODE
+        )
+        current_idle_refresh_interval = self._config_entry.options.get(
+            CONF_IDLE_REFRESH_INTERVAL, DEFAULT_IDLE_REFRESH_INTERVAL
+        )
+        current_demand_entity = self._config_entry.options.get(CONF_DEMAND_ENTITY)
+        current_corpus_path = self._config_entry.options.get(
+            CONF_CORPUS_PATH, DEFAULT_CORPUS_PATH
+        )
+        current_fetch_mode = self._config_entry.options.get(
+            CONF_FETCH_MODE, DEFAULT_FETCH_MODE
+        )
+        current_hedge_delay = self._config_entry.options.get(
+            CONF_HEDGE_DELAY, DEFAULT_HEDGE_DELAY
+        )
+        current_provider_timeout = self._config_entry.options.get(
+            CONF_PROVIDER_TIMEOUT, DEFAULT_PROVIDER_TIMEOUT
+        )
+        current_pool_size = self._config_entry.options.get(
+            CONF_POOL_SIZE, DEFAULT_POOL_SIZE
+        )
+        current_pool_refill_threshold = self._config_entry.options.get(
+            CONF_POOL_REFILL_THRESHOLD, DEFAULT_POOL_REFILL_THRESHOLD
+        )
+        current_seen_history_size = self._config_entry.options.get(
+            CONF_SEEN_HISTORY_SIZE, DEFAULT_SEEN_HISTORY_SIZE
+        )
+        current_categories = self._config_entry.options.get(
+            CONF_CATEGORIES, DEFAULT_CATEGORIES
+        )
+        current_max_length = self._config_entry.options.get(
+            CONF_MAX_LENGTH, DEFAULT_MAX_LENGTH
+        )
+        current_include_keywords = self._config_entry.options.get(
+            CONF_INCLUDE_KEYWORDS, DEFAULT_KEYWORDS
+        )
+        current_exclude_keywords = self._config_entry.options.get(
+            CONF_EXCLUDE_KEYWORDS, DEFAULT_KEYWORDS
+        )
+        current_safety_filter = self._config_entry.options.get(
+            CONF_SAFETY_FILTER, DEFAULT_SAFETY_FILTER
+        )
+        current_blocklist = self._config_entry.options.get(
+            CONF_BLOCKLIST, DEFAULT_BLOCKLIST
+        )
+        current_compact_history = self._config_entry.options.get(
+            CONF_COMPACT_HISTORY, DEFAULT_COMPACT_HISTORY
+        )
+        current_pregenerate = self._config_entry.options.get(
+            CONF_PREGENERATE_EXPLANATIONS, DEFAULT_PREGENERATE_EXPLANATIONS
+        )
+        current_pregenerate_concurrency = self._config_entry.options.get(
+            CONF_PREGENERATE_CONCURRENCY, DEFAULT_PREGENERATE_CONCURRENCY
+        )
+        current_pregenerate_budget = self._config_entry.options.get(
+            CONF_PREGENERATE_BUDGET, DEFAULT_PREGENERATE_BUDGET
+        )
 
         # Schema for the options form
         options_schema = vol.Schema(
@@ -140,18 +305,234 @@ class JokesOptionsFlow(config_entries.OptionsFlow):
                 ): vol.All(cv.positive_int, vol.Range(min=MIN_REFRESH_INTERVAL, max=MAX_REFRESH_INTERVAL)),
                 vol.Required(
                     CONF_PROVIDERS, default=current_providers
-                ): cv.multi_select({
-                    PROVIDER_ICANHAZDADJOKE: "icanhazdadjoke.com",
-                    PROVIDER_JOKEAPI: "JokeAPI (jokeapi.dev)",
-                    PROVIDER_OFFICIAL: "Official Joke API",
-                    PROVIDER_GEEKJOKES: "Geek Jokes (⚠️ not family-friendly)",
-                    PROVIDER_YOMAMA: "Yo Mama Jokes (⚠️ not family-friendly)",
+                ): cv.multi_select(PROVIDER_OPTIONS),
+                vol.Required(
+                    CONF_REFRESH_MODE, default=current_refresh_mode
+                ): vol.In({
+                    REFRESH_MODE_ALWAYS: "Always (poll around the clock)",
+                    REFRESH_MODE_ON_DEMAND: "On demand (only while someone is looking)",
                 }),
+                vol.Required(
+                    CONF_IDLE_REFRESH_INTERVAL, default=current_idle_refresh_interval
+                ): vol.All(vol.Coerce(int), vol.Range(min=MIN_IDLE_REFRESH_INTERVAL, max=MAX_IDLE_REFRESH_INTERVAL)),
+                vol.Optional(
+                    CONF_DEMAND_ENTITY,
+                    description={"suggested_value": current_demand_entity},
+                ): selector.EntitySelector(
+                    selector.EntitySelectorConfig(
+                        domain=[
+                            "schedule",
+                            "person",
+                            "device_tracker",
+                            "input_boolean",
+                            "binary_sensor",
+                        ]
+                    )
+                ),
+                vol.Required(
+                    CONF_CORPUS_PATH, default=current_corpus_path
+                ): cv.string,
+                vol.Required(
+                    CONF_FETCH_MODE, default=current_fetch_mode
+                ): vol.In({
+                    FETCH_MODE_SEQUENTIAL: "Sequential (one provider at a time)",
+                    FETCH_MODE_HEDGED: "Hedged (start a backup if a provider is slow)",
+                    FETCH_MODE_RACE_ALL: "Race all (ask every provider at once)",
+                }),
+                vol.Required(
+                    CONF_HEDGE_DELAY, default=current_hedge_delay
+                ): vol.All(vol.Coerce(float), vol.Range(min=MIN_HEDGE_DELAY, max=MAX_HEDGE_DELAY)),
+                vol.Required(
+                    CONF_PROVIDER_TIMEOUT, default=current_provider_timeout
+                ): vol.All(cv.positive_int, vol.Range(min=MIN_PROVIDER_TIMEOUT, max=MAX_PROVIDER_TIMEOUT)),
+                vol.Required(
+                    CONF_POOL_SIZE, default=current_pool_size
+                ): vol.All(cv.positive_int, vol.Range(min=MIN_POOL_SIZE, max=MAX_POOL_SIZE)),
+                vol.Required(
+                    CONF_POOL_REFILL_THRESHOLD, default=current_pool_refill_threshold
+                ): vol.All(vol.Coerce(int), vol.Range(min=MIN_POOL_REFILL_THRESHOLD, max=MAX_POOL_SIZE - 1)),
+                vol.Required(
+                    CONF_SEEN_HISTORY_SIZE, default=current_seen_history_size
+                ): vol.All(vol.Coerce(int), vol.Range(min=MIN_SEEN_HISTORY_SIZE, max=MAX_SEEN_HISTORY_SIZE)),
+                vol.Required(
+                    CONF_CATEGORIES, default=current_categories
+                ): selector.SelectSelector(
+                    selector.SelectSelectorConfig(
+                        options=JOKE_CATEGORIES,
+                        multiple=True,
+                        custom_value=True,
+                    )
+                ),
+                vol.Required(
+                    CONF_MAX_LENGTH, default=current_max_length
+                ): vol.All(vol.Coerce(int), vol.Range(min=MIN_MAX_LENGTH, max=MAX_MAX_LENGTH)),
+                vol.Optional(
+                    CONF_INCLUDE_KEYWORDS, default=current_include_keywords
+                ): cv.string,
+                vol.Optional(
+                    CONF_EXCLUDE_KEYWORDS, default=current_exclude_keywords
+                ): cv.string,
+                vol.Required(
+                    CONF_SAFETY_FILTER, default=current_safety_filter
+                ): cv.boolean,
+                vol.Optional(
+                    CONF_BLOCKLIST, default=current_blocklist
+                ): cv.string,
+                vol.Required(
+                    CONF_COMPACT_HISTORY, default=current_compact_history
+                ): cv.boolean,
+                vol.Required(
+                    CONF_PREGENERATE_EXPLANATIONS, default=current_pregenerate
+                ): cv.boolean,
+                vol.Required(
+                    CONF_PREGENERATE_CONCURRENCY, default=current_pregenerate_concurrency
+                ): vol.All(cv.positive_int, vol.Range(min=MIN_PREGENERATE_CONCURRENCY, max=MAX_PREGENERATE_CONCURRENCY)),
+                vol.Required(
+                    CONF_PREGENERATE_BUDGET, default=current_pregenerate_budget
+                ): vol.All(cv.positive_int, vol.Range(min=MIN_PREGENERATE_BUDGET, max=MAX_PREGENERATE_BUDGET)),
             }
         )
 
         return self.async_show_form(
-            step_id="init",
+            step_id="settings",
             data_schema=options_schema,
             errors=errors,
         )
+
+    async def async_step_add_channel(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Add a channel: another joke sensor with its own settings."""
+        errors: dict[str, str] = {}
+        options = self._config_entry.options
+        channels = get_channels(options)
+
+        if len(channels) >= MAX_CHANNELS:
+            return self.async_abort(reason="too_many_channels")
+
+        if user_input is not None:
+            name = user_input[CONF_NAME].strip()
+            if not name:
+                errors[CONF_NAME] = "invalid_channel_name"
+            elif name.casefold() in (
+                channel_title(channel).casefold() for channel in channels
+            ):
+                errors[CONF_NAME] = "channel_exists"
+
+            # Validate providers - at least one must be selected
+            providers = user_input.get(CONF_PROVIDERS, [])
+            if not providers:
+                errors[CONF_PROVIDERS] = "no_providers_selected"
+            elif PROVIDER_LOCAL in providers and not await _async_corpus_exists(
+                self.hass, options.get(CONF_CORPUS_PATH, DEFAULT_CORPUS_PATH)
+            ):
+                errors[CONF_PROVIDERS] = "corpus_not_found"
+
+            if not errors:
+                channel = {
+                    **user_input,
+                    CONF_CHANNEL_ID: new_channel_id(),
+                    CONF_NAME: name,
+                }
+                return self.async_create_entry(
+                    title="",
+                    data={**options, CONF_CHANNELS: [*channels, channel]},
+                )
+
+        # New channels start from the entry's own settings
+        channel_schema = vol.Schema(
+            {
+                vol.Required(CONF_NAME): cv.string,
+                vol.Required(
+                    CONF_REFRESH_INTERVAL,
+                    default=options.get(CONF_REFRESH_INTERVAL, DEFAULT_REFRESH_INTERVAL),
+                ): vol.All(cv.positive_int, vol.Range(min=MIN_REFRESH_INTERVAL, max=MAX_REFRESH_INTERVAL)),
+                vol.Required(
+                    CONF_PROVIDERS,
+                    default=options.get(CONF_PROVIDERS, DEFAULT_PROVIDERS),
+                ): cv.multi_select(PROVIDER_OPTIONS),
+                vol.Required(
+                    CONF_CATEGORIES,
+                    default=options.get(CONF_CATEGORIES, DEFAULT_CATEGORIES),
+                ): selector.SelectSelector(
+                    selector.SelectSelectorConfig(
+                        options=JOKE_CATEGORIES,
+                        multiple=True,
+                        custom_value=True,
+                    )
+                ),
+                vol.Required(
+                    CONF_MAX_LENGTH,
+                    default=options.get(CONF_MAX_LENGTH, DEFAULT_MAX_LENGTH),
+                ): vol.All(vol.Coerce(int), vol.Range(min=MIN_MAX_LENGTH, max=MAX_MAX_LENGTH)),
+                vol.Optional(
+                    CONF_INCLUDE_KEYWORDS,
+                    default=options.get(CONF_INCLUDE_KEYWORDS, DEFAULT_KEYWORDS),
+                ): cv.string,
+                vol.Optional(
+                    CONF_EXCLUDE_KEYWORDS,
+                    default=options.get(CONF_EXCLUDE_KEYWORDS, DEFAULT_KEYWORDS),
+                ): cv.string,
+            }
+        )
+
+        return self.async_show_form(
+            step_id="add_channel",
+            data_schema=channel_schema,
+            errors=errors,
+        )
+
+    async def async_step_remove_channel(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Remove channels, with their sensors and stored jokes."""
+        options = self._config_entry.options
+        channels = get_channels(options)
+        entry_id = self._config_entry.entry_id
+
+        if user_input is not None:
+            removed = set(user_input[CONF_CHANNELS])
+            registry = er.async_get(self.hass)
+            for channel_id in removed:
+                unique_id = channel_unique_id(entry_id, channel_id)
+                for suffix in ("", "_explanation"):
+                    if entity_id := registry.async_get_entity_id(
+                        "sensor", DOMAIN, unique_id + suffix
+                    ):
+                        registry.async_remove(entity_id)
+                # A running channel drops its pending write along with the file
+                channel_data = (
+                    self.hass.data.get(DOMAIN, {})
+                    .get(entry_id, {})
+                    .get("channels", {})
+                    .get(channel_id)
+                )
+                if channel_data is not None:
+                    await channel_data["coordinator"].async_remove_store()
+                else:
+                    await JokesStore(self.hass, f"{entry_id}_{channel_id}").async_remove()
+            return self.async_create_entry(
+                title="",
+                data={
+                    **options,
+                    CONF_CHANNELS: [
+                        channel
+                        for channel in channels
+                        if channel[CONF_CHANNEL_ID] not in removed
+                    ],
+                },
+            )
+
+        return self.async_show_form(
+            step_id="remove_channel",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_CHANNELS, default=[]): cv.multi_select(
+                        {
+                            channel[CONF_CHANNEL_ID]: channel_title(channel)
+                            for channel in channels
+                        }
+                    ),
+                }
+            ),
+        )
@@ -2,7 +2,7 @@
 
 DOMAIN = "ha_jokes"
 NAME = "Jokes"
-VERSION = "1.4.0"
+VERSION = "1.5.0"
 
 # API Configuration for icanhazdadjoke.com
 API_URL_ICANHAZDADJOKE = "https://icanhazdadjoke.com"
@@ -11,8 +11,14 @@ API_HEADERS_ICANHAZDADJOKE = {
     "User-Agent": "Home Assistant Jokes Integration",
 }
 
+# Search endpoint used for bulk retrieval (one random page per request)
+API_URL_ICANHAZDADJOKE_SEARCH = "https://icanhazdadjoke.com/search"
+ICANHAZDADJOKE_PAGE_SIZE = 20
+ICANHAZDADJOKE_DEFAULT_PAGES = 30  # until the first search response says otherwise
+
 # API Configuration for JokeAPI v2
 API_URL_JOKEAPI = "https://v2.jokeapi.dev/joke/Any?safe-mode&type=single"
+API_URL_JOKEAPI_BULK = f"{API_URL_JOKEAPI}&amount=10"
 API_HEADERS_JOKEAPI = {
     "Accept": "application/json",
     "User-Agent": "Home Assistant Jokes Integration",
@@ -20,6 +26,7 @@ API_HEADERS_JOKEAPI = {
 
 # API Configuration for Official Joke API
 API_URL_OFFICIAL = "https://official-joke-api.appspot.com/random_joke"
+API_URL_OFFICIAL_BULK = "https://official-joke-api.appspot.com/random_ten"
 API_HEADERS_OFFICIAL = {
     "Accept": "application/json",
     "User-Agent": "Home Assistant Jokes Integration",
@@ -40,15 +47,157 @@ API_HEADERS_YOMAMA = {
     "User-Agent": "Home Assistant Jokes Integration",
 }
 
+# Local joke corpus (offline provider): one joke per line in the config directory
+DEFAULT_CORPUS_PATH = "jokes.jsonl"
+CORPUS_INDEX_SUFFIX = ".idx"      # sidecar file holding the line-offset index
+CORPUS_SCAN_CHUNK = 1024 * 1024   # bytes read at a time while indexing
+CORPUS_BATCH_SIZE = 10            # jokes drawn per bulk request
+
 # Legacy API constants (for backward compatibility)
 API_URL = API_URL_ICANHAZDADJOKE
 API_HEADERS = API_HEADERS_ICANHAZDADJOKE
 
+# Pooled HTTP session (shared by every config entry)
+HTTP_LIMIT = 20               # total simultaneous connections
+HTTP_LIMIT_PER_HOST = 4       # simultaneous connections per provider host
+HTTP_DNS_CACHE_TTL = 300      # seconds
+HTTP_KEEPALIVE_TIMEOUT = 120  # seconds an idle connection is kept open
+
 # Default Configuration
 DEFAULT_REFRESH_INTERVAL = 5  # minutes
 MIN_REFRESH_INTERVAL = 1     # minute
 MAX_REFRESH_INTERVAL = 1440  # 24 hours in minutes
 
+# Fetch strategy
+FETCH_MODE_SEQUENTIAL = "sequential"  # try providers one after another
+FETCH_MODE_HEDGED = "hedged"          # start the next provider after a short delay
+FETCH_MODE_RACE_ALL = "race_all"      # query every provider at once
+FETCH_MODES = [FETCH_MODE_SEQUENTIAL, FETCH_MODE_HEDGED, FETCH_MODE_RACE_ALL]
+DEFAULT_FETCH_MODE = FETCH_MODE_SEQUENTIAL
+DEFAULT_HEDGE_DELAY = 1.5      # seconds before a hedged request is launched
+MIN_HEDGE_DELAY = 0.1
+MAX_HEDGE_DELAY = 10.0
+DEFAULT_PROVIDER_TIMEOUT = 10  # seconds each provider gets to answer
+MIN_PROVIDER_TIMEOUT = 1
+MAX_PROVIDER_TIMEOUT = 30
+UPDATE_TIMEOUT = 30            # seconds a whole refresh may take
+GET_JOKES_TIMEOUT = 15         # seconds a whole get_jokes call may take
+
+# Demand-driven polling
+REFRESH_MODE_ALWAYS = "always"        # poll on the refresh interval around the clock
+REFRESH_MODE_ON_DEMAND = "on_demand"  # poll only while someone is looking
+REFRESH_MODES = [REFRESH_MODE_ALWAYS, REFRESH_MODE_ON_DEMAND]
+DEFAULT_REFRESH_MODE = REFRESH_MODE_ALWAYS
+DEFAULT_IDLE_REFRESH_INTERVAL = 0  # minutes between refreshes while idle; 0 pauses
+MIN_IDLE_REFRESH_INTERVAL = 0
+MAX_IDLE_REFRESH_INTERVAL = 1440
+DEMAND_IDLE_GRACE = 60             # seconds without viewers before polling slows down
+DEMAND_ACTIVE_STATES = ("on", "home")  # gate entity states that count as demand
+
+# Prefetched joke pool
+DEFAULT_POOL_SIZE = 30
+MIN_POOL_SIZE = 1
+MAX_POOL_SIZE = 200
+DEFAULT_POOL_REFILL_THRESHOLD = 10  # refill in the background at or below this
+MIN_POOL_REFILL_THRESHOLD = 0
+
+# Repeat suppression
+DEFAULT_SEEN_HISTORY_SIZE = 1000  # fingerprints of recently shown jokes remembered
+MIN_SEEN_HISTORY_SIZE = 0         # 0 disables repeat suppression
+MAX_SEEN_HISTORY_SIZE = 20000
+
+# Joke filters (matched against the pool's inverted index)
+DEFAULT_CATEGORIES: list[str] = []  # empty allows every category
+DEFAULT_MAX_LENGTH = 0              # characters; 0 is no limit
+MIN_MAX_LENGTH = 0
+MAX_MAX_LENGTH = 1000
+DEFAULT_KEYWORDS = ""               # comma-separated
+# Categories the providers are known to use, offered in the options form
+JOKE_CATEGORIES = [
+    "general",
+    "programming",
+    "knock-knock",
+    "dad",
+    "misc",
+    "pun",
+    "spooky",
+    "christmas",
+    "dark",
+]
+
+# Content safety filter (opt-in; jokes with a blocked word never reach the pool)
+DEFAULT_SAFETY_FILTER = False
+DEFAULT_BLOCKLIST = ""  # extra comma-separated words or phrases to block
+# Built-in blocklist; whole words, matched case-insensitively
+SAFETY_BLOCKLIST = (
+    "arse", "arsehole", "ass", "asses", "asshole", "assholes", "bastard",
+    "bastards", "bitch", "bitches", "bitchy", "bollocks", "boner", "boob",
+    "boobs", "booty", "bullshit", "butthole", "cock", "cocks", "crap",
+    "cum", "cunt", "cunts", "dick", "dickhead", "dicks", "dildo", "douche",
+    "fart", "farted", "farts", "fuck", "fucked", "fucker", "fuckers",
+    "fucking", "fucks", "hooker", "hookers", "horny", "jizz", "masturbate",
+    "masturbating", "milf", "motherfucker", "naked", "nipple", "nipples",
+    "nude", "orgasm", "penis", "piss", "pissed", "porn", "porno", "prick",
+    "pussy", "rape", "raped", "semen", "sex", "sexual", "sexy", "shit",
+    "shits", "shitty", "slut", "sluts", "slutty", "sperm", "stripper",
+    "testicles", "tits", "titties", "twat", "vagina", "viagra", "wank",
+    "wanker", "whore", "whores",
+)
+
+# Channels (extra joke sensors of one entry, fed by the shared hub)
+MAX_CHANNELS = 20
+
+# Persistent storage
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 30  # seconds; saves requested within this window are batched
+
+# Joke history (per entry, persisted with the pool)
+HISTORY_SIZE = 200           # shown jokes kept for get_history and the offline fallback
+DEFAULT_HISTORY_PAGE = 10    # jokes returned by get_history without a limit
+MAX_HISTORY_PAGE = 100
+
+# get_jokes action
+DEFAULT_GET_JOKES_COUNT = 5
+MAX_GET_JOKES_COUNT = 50
+
+# Compact history: joke text is kept out of the recorder and logged here once
+DEFAULT_COMPACT_HISTORY = False
+JOKE_LOG_FILE = f"{DOMAIN}.joke_log.jsonl"  # in .storage, one JSON line per joke
+JOKE_LOG_MAX_ENTRIES = 5000  # then the log moves to <file>.1 and starts afresh
+
+# AI explanation cache (shared by all entries)
+EXPLANATION_CACHE_SIZE = 500
+
+# Speculative explanation pre-generation (opt-in)
+DEFAULT_PREGENERATE_EXPLANATIONS = False
+DEFAULT_PREGENERATE_CONCURRENCY = 1  # simultaneous background AI calls
+MIN_PREGENERATE_CONCURRENCY = 1
+MAX_PREGENERATE_CONCURRENCY = 5
+DEFAULT_PREGENERATE_BUDGET = 20      # background AI calls per rolling hour
+MIN_PREGENERATE_BUDGET = 1
+MAX_PREGENERATE_BUDGET = 500
+
+# Provider health and circuit breaker
+HEALTH_WINDOW = 20               # outcomes kept for the rolling success rate
+HEALTH_EWMA_ALPHA = 0.3          # weight of the newest latency sample
+HEALTH_DEFAULT_LATENCY = 1.0     # seconds assumed before a provider is measured
+HEALTH_EXPLORATION = 0.1         # minimum weight, relative to the best provider
+BREAKER_FAILURE_THRESHOLD = 3    # consecutive failures that open the breaker
+BREAKER_COOLDOWN = 300           # seconds before an open breaker half-opens
+BREAKER_MAX_COOLDOWN = 3600      # cap for the cool-down after repeated trials fail
+
+# Per-provider rate limiting (token bucket, refilled continuously)
+RATE_LIMIT_PERIOD = 60           # seconds the per-provider quotas below apply to
+RATE_LIMIT_JOKEAPI = 120         # JokeAPI's published requests per minute
+RATE_LIMIT_DEFAULT = 30          # requests per minute for providers without a published quota
+RATE_LIMIT_BACKOFF_BASE = 2.0    # seconds before retrying after the first 429/5xx
+RATE_LIMIT_BACKOFF_MAX = 900     # cap for the exponential backoff
+
+# Per-provider request metrics
+METRICS_HISTOGRAM_MIN = 0.005     # seconds; upper bound of the smallest latency bucket
+METRICS_HISTOGRAM_MAX = 60.0      # seconds; larger samples share one overflow bucket
+METRICS_HISTOGRAM_FACTOR = 1.2    # growth between bucket bounds (percentiles within 20%)
+
 # Sensor Configuration
 SENSOR_NAME = "Joke"
 SENSOR_ICON = "mdi:emoticon-happy-outline"
@@ -56,6 +205,28 @@ SENSOR_ICON = "mdi:emoticon-happy-outline"
 # Configuration Keys
 CONF_REFRESH_INTERVAL = "refresh_interval"
 CONF_PROVIDERS = "providers"
+CONF_FETCH_MODE = "fetch_mode"
+CONF_HEDGE_DELAY = "hedge_delay"
+CONF_PROVIDER_TIMEOUT = "provider_timeout"
+CONF_POOL_SIZE = "pool_size"
+CONF_POOL_REFILL_THRESHOLD = "pool_refill_threshold"
+CONF_SEEN_HISTORY_SIZE = "seen_history_size"
+CONF_PREGENERATE_EXPLANATIONS = "pregenerate_explanations"
+CONF_PREGENERATE_CONCURRENCY = "pregenerate_concurrency"
+CONF_PREGENERATE_BUDGET = "pregenerate_budget"
+CONF_REFRESH_MODE = "refresh_mode"
+CONF_IDLE_REFRESH_INTERVAL = "idle_refresh_interval"
+CONF_DEMAND_ENTITY = "demand_entity"
+CONF_COMPACT_HISTORY = "compact_history"
+CONF_CORPUS_PATH = "corpus_path"
+CONF_CATEGORIES = "categories"
+CONF_MAX_LENGTH = "max_length"
+CONF_INCLUDE_KEYWORDS = "include_keywords"
+CONF_EXCLUDE_KEYWORDS = "exclude_keywords"
+CONF_SAFETY_FILTER = "safety_filter"
+CONF_BLOCKLIST = "blocklist"
+CONF_CHANNELS = "channels"
+CONF_CHANNEL_ID = "id"
 
 # Attributes
 ATTR_JOKE = "joke"
@@ -63,7 +234,25 @@ ATTR_JOKE_ID = "joke_id"
 ATTR_LAST_UPDATED = "last_updated"
 ATTR_REFRESH_INTERVAL = "refresh_interval"
 ATTR_SOURCE = "source"
+ATTR_CATEGORY = "category"
+ATTR_FLAGS = "flags"
 ATTR_EXPLANATION = "explanation"
+ATTR_POOL_DEPTH = "pool_depth"
+ATTR_FROM_CACHE = "from_cache"
+ATTR_CACHED = "cached"
+ATTR_PREGENERATE_HIT_RATE = "pregenerate_hit_rate"
+ATTR_PREGENERATE_CALLS = "pregenerate_calls_last_hour"
+ATTR_PREGENERATE_BUDGET = "pregenerate_budget"
+ATTR_POLLING = "polling"
+ATTR_JOKE_REF = "joke_ref"
+ATTR_SHOWN_AT = "shown_at"
+
+# Service fields
+ATTR_FORCE = "force"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_OFFSET = "offset"
+ATTR_LIMIT = "limit"
+ATTR_COUNT = "count"
 
 # Provider names
 PROVIDER_ICANHAZDADJOKE = "icanhazdadjoke"
@@ -71,6 +260,7 @@ PROVIDER_JOKEAPI = "jokeapi"
 PROVIDER_OFFICIAL = "official_joke_api"
 PROVIDER_GEEKJOKES = "geek_jokes"
 PROVIDER_YOMAMA = "yomama_jokes"
+PROVIDER_LOCAL = "local_corpus"
 
 # Default providers (family-friendly sources enabled by default).
 # PROVIDER_GEEKJOKES and PROVIDER_YOMAMA are intentionally excluded — both serve
@@ -0,0 +1,646 @@
+"""Data update coordinator for the Jokes integration."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+import logging
+import random
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import (
+    async_call_later,
+    async_track_state_change_event,
+)
+from homeassistant.helpers.update_coordinator import (
+    DataUpdateCoordinator,
+    UpdateFailed,
+)
+
+from .demand import async_get_viewer_tracker
+from .filters import JokeFilter
+from .history import JokeHistory
+from .hub import async_get_hub
+from .pool import JokePool, SeenJokes, joke_fingerprint
+from .safety import ContentFilter
+from .store import JokesStore
+from .const import (
+    ATTR_FROM_CACHE,
+    ATTR_JOKE,
+    ATTR_LAST_UPDATED,
+    ATTR_OFFSET,
+    ATTR_REFRESH_INTERVAL,
+    DEFAULT_CORPUS_PATH,
+    DEFAULT_FETCH_MODE,
+    DEFAULT_HEDGE_DELAY,
+    DEFAULT_IDLE_REFRESH_INTERVAL,
+    DEFAULT_POOL_REFILL_THRESHOLD,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_PROVIDER_TIMEOUT,
+    DEFAULT_PROVIDERS,
+    DEFAULT_REFRESH_MODE,
+    DEFAULT_SEEN_HISTORY_SIZE,
+    DEMAND_ACTIVE_STATES,
+    DEMAND_IDLE_GRACE,
+    DOMAIN,
+    FETCH_MODE_HEDGED,
+    FETCH_MODE_RACE_ALL,
+    GET_JOKES_TIMEOUT,
+    HISTORY_SIZE,
+    PROVIDER_LOCAL,
+    REFRESH_MODE_ON_DEMAND,
+    UPDATE_TIMEOUT,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class JokesDataUpdateCoordinator(DataUpdateCoordinator):
+    """Class to manage fetching data from the API."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        refresh_interval: int,
+        enabled_providers: list[str],
+        fetch_mode: str = DEFAULT_FETCH_MODE,
+        hedge_delay: float = DEFAULT_HEDGE_DELAY,
+        provider_timeout: int = DEFAULT_PROVIDER_TIMEOUT,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        pool_refill_threshold: int = DEFAULT_POOL_REFILL_THRESHOLD,
+        seen_history_size: int = DEFAULT_SEEN_HISTORY_SIZE,
+        corpus_path: str = DEFAULT_CORPUS_PATH,
+        store: JokesStore | None = None,
+        refresh_mode: str = DEFAULT_REFRESH_MODE,
+        idle_refresh_interval: int = DEFAULT_IDLE_REFRESH_INTERVAL,
+        demand_entity: str | None = None,
+        joke_filter: JokeFilter | None = None,
+        content_filter: ContentFilter | None = None,
+    ) -> None:
+        """Initialize."""
+        self.platforms = []
+        self._refresh_interval = refresh_interval
+        self._fetch_mode = fetch_mode
+        self._hedge_delay = hedge_delay
+        self._provider_timeout = provider_timeout
+        self._corpus_path = corpus_path
+
+        # Providers, the HTTP session and provider health are shared by every
+        # config entry through the fetch hub.
+        self._hub = async_get_hub(hass)
+        self.update_enabled_providers(enabled_providers)
+
+        # Jokes fetched in bulk and served one per refresh; refilled in the
+        # background once it drops to the low-water mark. Recently shown
+        # jokes are rejected as they arrive and again when drawn, and only
+        # jokes matching the filter are served.
+        self._seen = SeenJokes(seen_history_size)
+        self._filter = joke_filter or JokeFilter()
+        self._pool = JokePool(
+            pool_size, pool_refill_threshold, self._seen, self._filter
+        )
+
+        # With the safety filter on, jokes holding a blocked word never
+        # reach the pool; the next candidate is served instead.
+        self._content_filter = content_filter
+        self._refill_task: asyncio.Task | None = None
+
+        # Batches fetched by other entries for providers we also use land in
+        # our pool too.
+        self._unsub_hub = self._hub.async_subscribe(self)
+
+        # Recently shown jokes, persisted with the pool. They back the
+        # get_history action and the offline fallback; the current joke is
+        # persisted too so the sensor can be restored instantly on startup.
+        self._store = store
+        self._history = JokeHistory(HISTORY_SIZE)
+
+        # In on-demand mode, polling slows down or pauses while no card is
+        # mounted and the optional gate entity is off.
+        self._refresh_mode = refresh_mode
+        self._idle_refresh_interval = idle_refresh_interval
+        self._demand_entity = demand_entity
+        self._entry_id: str | None = None
+        self._active = True
+        self._idle_timer: CALLBACK_TYPE | None = None
+        self._demand_unsubs: list[CALLBACK_TYPE] = []
+        
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            update_interval=timedelta(minutes=refresh_interval),
+        )
+
+    def accepts(self, provider: str, corpus_path: str | None) -> bool:
+        """Return whether jokes fetched from a provider belong in this pool."""
+        if provider not in self._providers:
+            return False
+        return provider != PROVIDER_LOCAL or corpus_path == self._corpus_path
+
+    @callback
+    def offer_jokes(self, provider: str, jokes: list[dict[str, Any]]) -> None:
+        """Add a batch fetched through the hub to the pool."""
+        if self._content_filter is not None:
+            jokes = self._content_filter.screen(provider, jokes)
+        if self._pool.add(jokes):
+            self._schedule_save()
+
+    def _is_clean(self, joke: dict[str, Any]) -> bool:
+        """Return whether a joke passes the safety filter, if it is on."""
+        return self._content_filter is None or self._content_filter.blocked(joke) is None
+
+    def _wanted(self, joke: dict[str, Any]) -> bool:
+        """Return whether a joke passes the filters and the safety filter."""
+        return self._filter.matches(joke) and self._is_clean(joke)
+
+    async def _fetch_with_deadline(
+        self, provider: str, bulk: bool = False
+    ) -> list[dict[str, Any]] | None:
+        """Fetch from a provider, giving up once its own deadline passes."""
+        return await self._hub.async_fetch(
+            provider, bulk, self._provider_timeout, self._corpus_path
+        )
+
+    async def _fetch_sequential(
+        self, providers: list[str], bulk: bool
+    ) -> list[dict[str, Any]] | None:
+        """Try each provider in turn until one succeeds."""
+        for provider in providers:
+            result = await self._fetch_with_deadline(provider, bulk)
+            if result:
+                return result
+        return None
+
+    async def _fetch_hedged(
+        self,
+        providers: list[str],
+        bulk: bool,
+        hedge_delay: float,
+    ) -> list[dict[str, Any]] | None:
+        """Race providers, starting another whenever one is slow or fails.
+
+        The first provider is started straight away; the next one is launched
+        after ``hedge_delay`` seconds without an answer, or immediately when a
+        running request fails. The first valid result wins and every request
+        still in flight is cancelled. A delay of 0 starts all providers at once.
+        """
+        remaining = iter(providers)
+        pending: set[asyncio.Task] = set()
+
+        def _launch_next() -> bool:
+            provider = next(remaining, None)
+            if provider is None:
+                return False
+            pending.add(
+                asyncio.create_task(
+                    self._fetch_with_deadline(provider, bulk),
+                    name=f"{DOMAIN}_fetch_{provider}",
+                )
+            )
+            return True
+
+        exhausted = not _launch_next()
+        if hedge_delay <= 0:
+            while _launch_next():
+                pass
+            exhausted = True
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=None if exhausted else hedge_delay,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    if result := task.result():
+                        return result
+                # Nothing came back in time, or something failed: hedge.
+                for _ in range(max(len(done), 1)):
+                    if not exhausted and not _launch_next():
+                        exhausted = True
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _async_fetch_batch(self) -> list[dict[str, Any]]:
+        """Fetch a batch of jokes using the configured fetch strategy."""
+        # Healthy, fast providers first (with some randomness); open breakers
+        # and rate-limited providers skipped
+        providers = self._hub.order(self._providers)
+        
+        _LOGGER.debug(
+            "Attempting to fetch jokes from providers %s (%s mode)",
+            providers,
+            self._fetch_mode,
+        )
+        
+        try:
+            async with asyncio.timeout(UPDATE_TIMEOUT):
+                if self._fetch_mode == FETCH_MODE_HEDGED:
+                    result = await self._fetch_hedged(
+                        providers, True, self._hedge_delay
+                    )
+                elif self._fetch_mode == FETCH_MODE_RACE_ALL:
+                    result = await self._fetch_hedged(providers, True, 0)
+                else:
+                    result = await self._fetch_sequential(providers, True)
+
+                if result:
+                    return result
+
+                # If all providers failed
+                raise UpdateFailed("All joke providers failed to respond")
+
+        except asyncio.TimeoutError as exception:
+            raise UpdateFailed(
+                f"Timeout communicating with joke APIs: {exception}"
+            ) from exception
+        except UpdateFailed:
+            raise
+        except Exception as exception:
+            raise UpdateFailed(
+                f"Error communicating with joke APIs: {exception}"
+            ) from exception
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        """Serve the next joke from the pool, fetching only when it is empty."""
+        from_cache = False
+        joke = self._pool.pop()
+        if joke is None:
+            # Cold or drained pool: fetch a batch inline and serve from it
+            try:
+                # The hub has already offered the batch to our pool
+                batch = await self._async_fetch_batch()
+                if (joke := self._pool.pop()) is None:
+                    # Everything in the batch was a repeat or filtered out; a
+                    # repeat beats no joke, but a filtered one is never shown
+                    matching = [item for item in batch if self._wanted(item)]
+                    if not matching and self.data:
+                        _LOGGER.debug(
+                            "No fetched joke matched the filters; keeping the current one"
+                        )
+                        self.async_schedule_refill()
+                        return self.data
+                    if not matching:
+                        # Nothing is shown yet (first setup); failing here would
+                        # retry setup forever if the filters are too strict, so
+                        # show a clean joke until a matching one turns up
+                        matching = [item for item in batch if self._is_clean(item)]
+                        if not matching:
+                            raise UpdateFailed("No fetched joke passed the safety filter")
+                        _LOGGER.warning(
+                            "No fetched joke matched the filters; showing an "
+                            "unfiltered one until one does"
+                        )
+                    else:
+                        _LOGGER.debug("Fetched batch held only recently seen jokes")
+                    joke = random.choice(matching)
+            except UpdateFailed as err:
+                # Every provider is failing: fall back to a cached joke
+                if (joke := self._pick_cached_joke()) is None:
+                    raise
+                _LOGGER.warning("Serving a cached joke because %s", err)
+                from_cache = True
+
+        self.async_schedule_refill()
+        return self._serve(joke, from_cache)
+
+    @callback
+    def _serve(self, joke: dict[str, Any], from_cache: bool = False) -> dict[str, Any]:
+        """Return a joke as coordinator data, recording it in the history."""
+        result = dict(joke)
+        result[ATTR_LAST_UPDATED] = datetime.now().isoformat()
+        result[ATTR_REFRESH_INTERVAL] = self._refresh_interval
+        result[ATTR_FROM_CACHE] = from_cache
+        if not from_cache:
+            self._history.append(joke, result[ATTR_LAST_UPDATED])
+        self._schedule_save()
+        return result
+
+    async def async_next_joke(self) -> None:
+        """Show the next joke now, for the next_joke action.
+
+        A pooled joke is shown straight away and the pool is refilled in the
+        background afterwards; only an empty pool falls back to a full
+        refresh. Either way the refresh interval starts over.
+        """
+        if (joke := self._pool.pop()) is None:
+            _LOGGER.debug("Joke pool is empty; refreshing instead")
+            await self.async_refresh()
+            return
+        self.async_set_updated_data(self._serve(joke))
+        self.async_schedule_refill()
+
+    async def async_get_jokes(self, count: int) -> list[dict[str, Any]]:
+        """Return up to ``count`` unique jokes for the get_jokes action.
+
+        Pooled jokes are served first. For the rest, every enabled provider
+        is asked for a batch at once, in rounds, until there are enough or
+        ``GET_JOKES_TIMEOUT`` passes; recently shown jokes only fill a gap
+        that fresh ones could not. Only jokes matching the entry's filters are
+        returned, and they count as shown.
+        """
+        jokes: dict[str, dict[str, Any]] = {}
+
+        def _take_from_pool() -> None:
+            while len(jokes) < count and (joke := self._pool.pop()) is not None:
+                jokes.setdefault(joke_fingerprint(joke[ATTR_JOKE]), joke)
+
+        _take_from_pool()
+        fetched: list[dict[str, Any]] = []
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + GET_JOKES_TIMEOUT
+        while len(jokes) < count and (remaining := deadline - loop.time()) > 0:
+            round_jokes = await self._async_fetch_round(remaining)
+            if not round_jokes:
+                break
+            before = len(jokes)
+            fetched.extend(round_jokes)
+            # Batches reach the pool through offer_jokes(), minus repeats
+            _take_from_pool()
+            # A full pool turns fresh jokes away; take those directly
+            for joke in round_jokes:
+                if len(jokes) >= count:
+                    break
+                key = joke_fingerprint(joke[ATTR_JOKE])
+                if not self._wanted(joke):
+                    continue
+                if key not in jokes and key not in self._seen:
+                    jokes[key] = joke
+                    self._seen.add(key)
+            if len(jokes) == before:
+                # Providers only have repeats left for us
+                break
+
+        # Short of fresh jokes: repeats the providers sent, then the history
+        for joke in [
+            *fetched,
+            *(record.as_joke() for record in reversed(list(self._history))),
+        ]:
+            if len(jokes) >= count:
+                break
+            if self._wanted(joke):
+                jokes.setdefault(joke_fingerprint(joke[ATTR_JOKE]), joke)
+
+        _LOGGER.debug("Returning %s of %s requested jokes", len(jokes), count)
+        self.async_schedule_refill()
+        self._schedule_save()
+        return list(jokes.values())
+
+    async def _async_fetch_round(self, timeout: float) -> list[dict[str, Any]]:
+        """Fetch a batch from every enabled provider at once.
+
+        Whatever has arrived when ``timeout`` passes is returned; requests
+        still running are cancelled.
+        """
+        tasks = [
+            asyncio.create_task(
+                self._fetch_with_deadline(provider, bulk=True),
+                name=f"{DOMAIN}_fetch_{provider}",
+            )
+            for provider in self._hub.order(self._providers)
+        ]
+        if not tasks:
+            return []
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        return [joke for task in done for joke in task.result() or ()]
+
+    def _pick_cached_joke(self) -> dict[str, Any] | None:
+        """Return a recently served matching joke other than the current one."""
+        current = self.data.get(ATTR_JOKE) if self.data else None
+        candidates = [
+            record.as_joke() for record in self._history if record.joke != current
+        ]
+        candidates = [joke for joke in candidates if self._wanted(joke)]
+        return random.choice(candidates) if candidates else None
+
+    def history_page(self, offset: int, limit: int) -> dict[str, Any]:
+        """Return a page of the joke history, newest first."""
+        return {
+            "total": len(self._history),
+            ATTR_OFFSET: offset,
+            "jokes": [record.as_dict() for record in self._history.page(offset, limit)],
+        }
+
+    async def async_restore(self) -> bool:
+        """Restore the last joke, pool and history from disk.
+
+        Returns True if a joke was restored, in which case the sensor is
+        populated immediately and no network request is needed to set up.
+        """
+        if self._store is None:
+            return False
+        stored = await self._store.async_load()
+        self._seen.load(stored.get("seen", []))
+        self._history.load(stored.get("history", []))
+        self._pool.add(
+            [joke for joke in stored.get("pool", []) if self._is_clean(joke)]
+        )
+        if not (current := stored.get("current")):
+            return False
+        if self._wanted(current):
+            current[ATTR_REFRESH_INTERVAL] = self._refresh_interval
+        elif (joke := self._pool.pop()) is not None:
+            # The filters changed since the joke was saved; show a pooled one
+            current = self._serve(joke)
+        else:
+            _LOGGER.debug("Stored joke no longer passes the filters; fetching a new one")
+            return False
+        self.async_set_updated_data(current)
+        _LOGGER.debug(
+            "Restored joke from disk with %s pooled jokes and %s in history",
+            len(self._pool),
+            len(self._history),
+        )
+        return True
+
+    async def async_remove_store(self) -> None:
+        """Delete the stored state, dropping any pending write, and stop saving."""
+        if self._store is not None:
+            store, self._store = self._store, None
+            await store.async_remove()
+
+    @callback
+    def _schedule_save(self) -> None:
+        """Schedule a debounced write of the current joke, pool and history."""
+        if self._store is not None:
+            self._store.async_schedule_save(self._data_to_store)
+
+    @callback
+    def _data_to_store(self) -> dict[str, Any]:
+        """Return the state to persist."""
+        return {
+            "current": self.data,
+            "pool": self._pool.jokes(),
+            "history": self._history.rows(),
+            "seen": self._seen.fingerprints(),
+        }
+
+    @callback
+    def async_schedule_refill(self) -> None:
+        """Start a background refill if the pool is low and none is running."""
+        if not self._pool.needs_refill:
+            return
+        if self._refill_task is not None and not self._refill_task.done():
+            return
+        self._refill_task = self.hass.async_create_background_task(
+            self._async_refill(), f"{DOMAIN} joke pool refill"
+        )
+
+    async def _async_refill(self) -> None:
+        """Top the pool up in bulk, taking at most one batch per provider."""
+        for provider in self._hub.order(self._providers):
+            if self._pool.available >= self._pool.max_size:
+                break
+            # Batches reach the pool through offer_jokes()
+            await self._fetch_with_deadline(provider, bulk=True)
+        _LOGGER.debug("Joke pool refilled to %s jokes", self._pool.available)
+
+    @property
+    def pool_depth(self) -> int:
+        """Return the number of prefetched jokes waiting to be served."""
+        return self._pool.available
+
+    @property
+    def providers(self) -> list[str]:
+        """Return the enabled providers."""
+        return list(self._providers)
+
+    def provider_stats(
+        self,
+        name: str,
+        channels: Mapping[str, JokesDataUpdateCoordinator] | None = None,
+    ) -> dict[str, Any]:
+        """Return the request metrics, health and quota of a provider.
+
+        Safety filter rejects of the given channel coordinators are listed per
+        channel rather than summed: a batch is screened by every channel it
+        lands in, so a sum would count one rejected joke several times.
+        """
+        stats = self._hub.metrics.get(name).as_dict()
+        stats["health"] = self._hub.health.get(name).as_dict()
+        if self._content_filter is not None:
+            stats["safety_rejects"] = self._content_filter.rejects.get(name, 0)
+            if channels:
+                stats["channel_safety_rejects"] = {
+                    channel_id: coordinator._content_filter.rejects.get(name, 0)
+                    for channel_id, coordinator in channels.items()
+                    if coordinator._content_filter is not None
+                }
+        if not self._hub.is_local(name):
+            stats["quota"] = self._hub.limits.get(name).as_dict()
+        return stats
+
+    @property
+    def pooled_jokes(self) -> list[str]:
+        """Return the text of the prefetched jokes waiting to be served."""
+        return [joke[ATTR_JOKE] for joke in self._pool.matching_jokes()]
+
+    @property
+    def polling(self) -> str:
+        """Return whether polling is active, slowed down (idle) or paused."""
+        if self._active:
+            return "active"
+        return "idle" if self._idle_refresh_interval else "paused"
+
+    @callback
+    def async_start_demand_tracking(self, entry_id: str) -> None:
+        """Follow viewers and the gate entity when in on-demand mode."""
+        if self._refresh_mode != REFRESH_MODE_ON_DEMAND:
+            return
+        self._entry_id = entry_id
+        self._demand_unsubs.append(
+            async_get_viewer_tracker(self.hass).async_listen(
+                entry_id, self._async_demand_changed
+            )
+        )
+        if self._demand_entity:
+            self._demand_unsubs.append(
+                async_track_state_change_event(
+                    self.hass, [self._demand_entity], self._async_demand_changed
+                )
+            )
+        self._async_demand_changed()
+
+    def _has_demand(self) -> bool:
+        """Return whether a card is showing this entry or the gate entity is on."""
+        assert self._entry_id is not None
+        if async_get_viewer_tracker(self.hass).viewers(self._entry_id):
+            return True
+        if self._demand_entity and (state := self.hass.states.get(self._demand_entity)):
+            return state.state in DEMAND_ACTIVE_STATES
+        return False
+
+    @callback
+    def _async_demand_changed(self, *_: Any) -> None:
+        """Resume polling on demand; go idle once demand has been gone a while."""
+        if self._has_demand():
+            if self._idle_timer is not None:
+                self._idle_timer()
+                self._idle_timer = None
+            if not self._active:
+                self._async_set_active(True)
+        elif self._active and self._idle_timer is None:
+            # A grace period keeps page switches and reloads from flapping.
+            self._idle_timer = async_call_later(
+                self.hass, DEMAND_IDLE_GRACE, self._async_go_idle
+            )
+
+    @callback
+    def _async_go_idle(self, _now: datetime) -> None:
+        """Slow down or pause polling if there is still no demand."""
+        self._idle_timer = None
+        if not self._has_demand():
+            self._async_set_active(False)
+
+    @callback
+    def _async_set_active(self, active: bool) -> None:
+        """Switch between the normal and the idle refresh interval."""
+        self._active = active
+        if active:
+            _LOGGER.debug("Jokes are being watched; resuming refreshes")
+            self.update_interval = timedelta(minutes=self._refresh_interval)
+            self.hass.async_create_task(self.async_request_refresh())
+        else:
+            _LOGGER.debug("Nobody is watching the jokes; polling is %s", self.polling)
+            self.update_interval = (
+                timedelta(minutes=self._idle_refresh_interval)
+                if self._idle_refresh_interval
+                else None
+            )
+        self.async_update_listeners()
+
+    async def async_shutdown(self) -> None:
+        """Cancel any background refill and shut the coordinator down."""
+        self._unsub_hub()
+        for unsub in self._demand_unsubs:
+            unsub()
+        self._demand_unsubs.clear()
+        if self._idle_timer is not None:
+            self._idle_timer()
+            self._idle_timer = None
+        if self._refill_task is not None:
+            self._refill_task.cancel()
+            self._refill_task = None
+        await super().async_shutdown()
+
+    def update_refresh_interval(self, refresh_interval: int) -> None:
+        """Update the refresh interval."""
+        self._refresh_interval = refresh_interval
+        if self._active:
+            self.update_interval = timedelta(minutes=refresh_interval)
+
+    def update_enabled_providers(self, enabled_providers: list[str]) -> None:
+        """Update the enabled providers."""
+        self._enabled_providers = enabled_providers if enabled_providers else DEFAULT_PROVIDERS
+        
+        # Keep the hub's provider order, limited to the enabled ones
+        self._providers = [
+            name for name in self._hub.provider_names if name in self._enabled_providers
+        ]
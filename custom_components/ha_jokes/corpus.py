@@ -0,0 +1,234 @@
+"""Offline joke corpus with O(1) random access for the Jokes integration.
+
+The corpus is a local file with one joke per line: JSON Lines (objects with a
+``joke`` field, or ``setup``/``punchline``, and an optional ``category``), CSV
+(a ``joke`` column, or the first column) or plain text. Both the corpus and a sidecar index of line offsets are
+memory-mapped, so picking a random joke reads one line from disk and memory use
+stays flat no matter how many millions of lines the file holds.
+
+Everything in this module does blocking I/O and must run in the executor.
+"""
+from __future__ import annotations
+
+import csv
+import hashlib
+import json
+import logging
+import mmap
+import os
+from pathlib import Path
+import random
+import struct
+from typing import Any
+
+from .const import (
+    ATTR_CATEGORY,
+    ATTR_JOKE,
+    ATTR_JOKE_ID,
+    ATTR_SOURCE,
+    CORPUS_INDEX_SUFFIX,
+    CORPUS_SCAN_CHUNK,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Index file: header, then one little-endian uint64 start offset per line.
+# The header records how much of the corpus has been indexed and a hash of its
+# first block, so an appended-to corpus is indexed incrementally while a
+# rewritten one is re-indexed from scratch.
+_INDEX_MAGIC = b"HAJKIDX1"
+_HEADER = struct.Struct("<8sQ8s")
+_OFFSET = struct.Struct("<Q")
+_HEAD_BYTES = 4096
+_MAX_ATTEMPTS = 5
+
+
+class JokeCorpus:
+    """Random access to a large local joke file."""
+
+    def __init__(self, path: Path) -> None:
+        """Initialize for a corpus file; nothing is opened until load()."""
+        self.path = path
+        self.index_path = path.with_name(path.name + CORPUS_INDEX_SUFFIX)
+        self._is_csv = path.suffix.lower() == ".csv"
+        self._joke_column = 0
+        self._first_line = 0
+        self._stat: tuple[int, int] | None = None
+        self._data: mmap.mmap | None = None
+        self._index: mmap.mmap | None = None
+        self._offsets: memoryview | None = None
+        self._indexed_size = 0
+        self._size = 0
+
+    @property
+    def line_count(self) -> int:
+        """Return the number of lines available, including an unterminated last one."""
+        if self._offsets is None:
+            return 0
+        tail = 1 if self._size > self._indexed_size else 0
+        return len(self._offsets) + tail
+
+    def random_jokes(self, count: int) -> list[dict[str, Any]]:
+        """Return up to ``count`` random jokes, (re)loading the corpus if it changed."""
+        self._ensure_loaded()
+        if self.line_count <= self._first_line:
+            return []
+        jokes = []
+        for _ in range(count * _MAX_ATTEMPTS):
+            if len(jokes) >= count:
+                break
+            line = random.randrange(self._first_line, self.line_count)
+            if joke := self._parse(line, self._read_line(line)):
+                jokes.append(joke)
+        return jokes
+
+    def close(self) -> None:
+        """Release the memory maps."""
+        if self._offsets is not None:
+            self._offsets.release()
+            self._offsets = None
+        for mapped in (self._data, self._index):
+            if mapped is not None:
+                mapped.close()
+        self._data = self._index = None
+        self._stat = None
+
+    def _ensure_loaded(self) -> None:
+        """Map the corpus and its index, updating the index if the file changed."""
+        stat = os.stat(self.path)
+        if self._stat == (stat.st_size, stat.st_mtime_ns):
+            return
+        self.close()
+        self._size = stat.st_size
+        self._update_index()
+        if self._size:
+            with open(self.path, "rb") as corpus:
+                self._data = mmap.mmap(corpus.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(self.index_path, "rb") as index:
+            self._index = mmap.mmap(index.fileno(), 0, access=mmap.ACCESS_READ)
+        self._offsets = memoryview(self._index)[_HEADER.size :].cast("Q")
+        if self._is_csv:
+            self._read_csv_header()
+        self._stat = (stat.st_size, stat.st_mtime_ns)
+        _LOGGER.debug("Loaded joke corpus %s with %s lines", self.path, self.line_count)
+
+    def _update_index(self) -> None:
+        """Bring the sidecar index up to date with the corpus."""
+        head = self._head_hash()
+        indexed_size = 0
+        try:
+            with open(self.index_path, "rb") as index:
+                magic, indexed_size, indexed_head = _HEADER.unpack(
+                    index.read(_HEADER.size)
+                )
+            if magic != _INDEX_MAGIC or indexed_head != head or indexed_size > self._size:
+                indexed_size = 0
+        except (OSError, struct.error):
+            indexed_size = 0
+
+        if indexed_size == 0:
+            with open(self.index_path, "wb") as index:
+                index.write(_HEADER.pack(_INDEX_MAGIC, 0, head))
+
+        with open(self.path, "rb") as corpus, open(self.index_path, "r+b") as index:
+            index.seek(0, os.SEEK_END)
+            new_size = self._scan(corpus, index, indexed_size)
+            index.seek(0)
+            index.write(_HEADER.pack(_INDEX_MAGIC, new_size, head))
+
+        if new_size != indexed_size:
+            _LOGGER.debug(
+                "Indexed joke corpus %s from byte %s to %s",
+                self.path,
+                indexed_size,
+                new_size,
+            )
+        self._indexed_size = new_size
+
+    def _scan(self, corpus: Any, index: Any, start: int) -> int:
+        """Append the start offset of each complete line from ``start`` on.
+
+        Returns the offset just past the last newline; an unterminated last
+        line is left out of the index so that appending to it later is safe.
+        """
+        corpus.seek(start)
+        line_start = start
+        position = start
+        while chunk := corpus.read(CORPUS_SCAN_CHUNK):
+            offsets = bytearray()
+            found = chunk.find(b"\n")
+            while found != -1:
+                offsets += _OFFSET.pack(line_start)
+                line_start = position + found + 1
+                found = chunk.find(b"\n", found + 1)
+            index.write(offsets)
+            position += len(chunk)
+        return line_start
+
+    def _head_hash(self) -> bytes:
+        """Return a hash of the start of the corpus, to detect rewrites."""
+        with open(self.path, "rb") as corpus:
+            return hashlib.blake2b(corpus.read(_HEAD_BYTES), digest_size=8).digest()
+
+    def _read_line(self, line: int) -> bytes:
+        """Return the raw bytes of a line."""
+        assert self._data is not None and self._offsets is not None
+        start = self._indexed_size if line == len(self._offsets) else self._offsets[line]
+        if line + 1 < len(self._offsets):
+            end = self._offsets[line + 1]
+        elif line + 1 == len(self._offsets):
+            end = self._indexed_size
+        else:
+            end = self._size
+        return self._data[start:end]
+
+    def _read_csv_header(self) -> None:
+        """Use a ``joke`` column if the CSV has a header naming one."""
+        self._joke_column = 0
+        self._first_line = 0
+        if not self.line_count:
+            return
+        header = next(csv.reader([self._read_line(0).decode("utf-8", "replace")]), [])
+        names = [name.strip().casefold() for name in header]
+        if "joke" in names:
+            self._joke_column = names.index("joke")
+            self._first_line = 1
+
+    def _parse(self, line: int, raw: bytes) -> dict[str, Any] | None:
+        """Parse one corpus line into a joke, or None if it holds no joke."""
+        text = raw.decode("utf-8", "replace").strip()
+        if not text:
+            return None
+        joke_id = f"{self.path.name}:{line}"
+        joke = ""
+        category = ""
+        if self._is_csv:
+            row = next(csv.reader([text]), [])
+            joke = row[self._joke_column] if len(row) > self._joke_column else ""
+        elif text[0] in "{\"":
+            try:
+                data = json.loads(text)
+            except ValueError:
+                # A broken JSON object, e.g. a line still being appended, is
+                # never shown; a quoted line of plain text still is
+                if text[0] == "{":
+                    return None
+                data = text
+            if isinstance(data, dict):
+                joke = data.get("joke") or " ".join(
+                    part for part in (data.get("setup"), data.get("punchline")) if part
+                )
+                joke_id = str(data.get("id") or joke_id)
+                category = str(data.get("category") or data.get("type") or "")
+            elif isinstance(data, str):
+                joke = data
+        else:
+            joke = text
+        if not joke or not joke.strip():
+            return None
+        return {
+            ATTR_JOKE: joke.strip(),
+            ATTR_JOKE_ID: joke_id,
+            ATTR_SOURCE: f"local corpus ({self.path.name})",
+            ATTR_CATEGORY: category,
+        }
@@ -0,0 +1,134 @@
+"""Viewer tracking for demand-driven polling in the Jokes integration."""
+from __future__ import annotations
+
+from collections.abc import Callable
+import logging
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+import homeassistant.helpers.config_validation as cv
+
+from .const import ATTR_CONFIG_ENTRY_ID, DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+# hass.data key holding the single ViewerTracker for this Home Assistant instance.
+VIEWER_TRACKER = f"{DOMAIN}_viewers"
+
+
+class ViewerTracker:
+    """Count the frontends currently showing each config entry's joke.
+
+    Counts live outside the coordinators so that open dashboards keep
+    counting across an entry reload.
+    """
+
+    def __init__(self) -> None:
+        """Initialize with no viewers."""
+        self._viewers: dict[str, int] = {}
+        self._listeners: dict[str, set[Callable[[], None]]] = {}
+
+    def viewers(self, entry_id: str) -> int:
+        """Return the number of viewers of an entry."""
+        return self._viewers.get(entry_id, 0)
+
+    @callback
+    def async_add_viewer(self, entry_id: str) -> CALLBACK_TYPE:
+        """Register a viewer; return a callable that removes it again."""
+        self._viewers[entry_id] = self.viewers(entry_id) + 1
+        self._async_notify(entry_id)
+        removed = False
+
+        @callback
+        def _remove() -> None:
+            nonlocal removed
+            if removed:
+                return
+            removed = True
+            if (count := self.viewers(entry_id) - 1) > 0:
+                self._viewers[entry_id] = count
+            else:
+                self._viewers.pop(entry_id, None)
+            self._async_notify(entry_id)
+
+        return _remove
+
+    @callback
+    def async_listen(
+        self, entry_id: str, listener: Callable[[], None]
+    ) -> CALLBACK_TYPE:
+        """Call ``listener`` whenever the viewer count of an entry changes."""
+        self._listeners.setdefault(entry_id, set()).add(listener)
+
+        @callback
+        def _unsubscribe() -> None:
+            self._listeners.get(entry_id, set()).discard(listener)
+
+        return _unsubscribe
+
+    @callback
+    def _async_notify(self, entry_id: str) -> None:
+        """Tell an entry's listeners that its viewer count changed."""
+        _LOGGER.debug(
+            "Jokes entry %s now has %s viewer(s)", entry_id, self.viewers(entry_id)
+        )
+        for listener in list(self._listeners.get(entry_id, ())):
+            listener()
+
+
+@callback
+def async_get_viewer_tracker(hass: HomeAssistant) -> ViewerTracker:
+    """Return the shared viewer tracker, creating it on first use."""
+    tracker: ViewerTracker | None = hass.data.get(VIEWER_TRACKER)
+    if tracker is None:
+        tracker = hass.data[VIEWER_TRACKER] = ViewerTracker()
+    return tracker
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/subscribe_viewer",
+        vol.Optional(ATTR_ENTITY_ID): cv.entity_id,
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
+@callback
+def websocket_subscribe_viewer(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Count the caller as a viewer of an entry until it unsubscribes.
+
+    The entry is picked like the explain_joke action picks it: by config
+    entry ID, by one of its entities, or the first entry. Closing the
+    websocket ends the subscription too.
+    """
+    entries: dict[str, Any] = hass.data.get(DOMAIN, {})
+    entry_id = msg.get(ATTR_CONFIG_ENTRY_ID)
+    if entry_id is None and (entity_id := msg.get(ATTR_ENTITY_ID)):
+        entity_entry = er.async_get(hass).async_get(entity_id)
+        entry_id = entity_entry.config_entry_id if entity_entry else None
+    elif entry_id is None:
+        entry_id = next(iter(entries), None)
+    if entry_id is None or entry_id not in entries:
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, "No Jokes entry found"
+        )
+        return
+
+    connection.subscriptions[msg["id"]] = async_get_viewer_tracker(
+        hass
+    ).async_add_viewer(entry_id)
+    connection.send_result(msg["id"])
+
+
+@callback
+def async_register_websocket_commands(hass: HomeAssistant) -> None:
+    """Register the integration's websocket commands."""
+    websocket_api.async_register_command(hass, websocket_subscribe_viewer)
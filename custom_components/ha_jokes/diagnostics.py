@@ -0,0 +1,51 @@
+"""Diagnostics support for the Jokes integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .channels import entry_providers
+from .const import DOMAIN
+from .coordinator import JokesDataUpdateCoordinator
+from .hub import async_get_hub
+
+
+def _coordinator_diagnostics(coordinator: JokesDataUpdateCoordinator) -> dict[str, Any]:
+    """Return diagnostics for the coordinator of an entry or channel."""
+    return {
+        "last_update_success": coordinator.last_update_success,
+        "update_interval": str(coordinator.update_interval),
+        "polling": coordinator.polling,
+        "pool_depth": coordinator.pool_depth,
+        "current": coordinator.data,
+    }
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    coordinator = entry_data["coordinator"]
+    hub = async_get_hub(hass)
+    channels = {
+        channel_id: channel_data["coordinator"]
+        for channel_id, channel_data in entry_data["channels"].items()
+    }
+    return {
+        "options": dict(entry.options),
+        "coordinator": _coordinator_diagnostics(coordinator),
+        "channels": {
+            channel_id: _coordinator_diagnostics(channel_coordinator)
+            for channel_id, channel_coordinator in channels.items()
+        },
+        "providers": {
+            name: coordinator.provider_stats(name, channels)
+            for name in entry_providers([coordinator, *channels.values()])
+        },
+        "http": hub.client.stats,
+        "coalesced_requests": hub.coalesced,
+        "throttled_requests": hub.throttled,
+    }
@@ -0,0 +1,269 @@
+"""AI joke explanations for the Jokes integration: persistent cache and pre-generation."""
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict, deque
+from datetime import datetime
+from itertools import chain, zip_longest
+import logging
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DOMAIN,
+    EXPLANATION_CACHE_SIZE,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+)
+from .pool import joke_fingerprint
+from .singleflight import SingleFlight
+
+_LOGGER = logging.getLogger(__name__)
+
+# hass.data key holding the single ExplanationCache for this Home Assistant instance.
+EXPLANATION_CACHE = f"{DOMAIN}_explanation_cache"
+# hass.data key holding the AI calls in flight, by joke fingerprint.
+EXPLANATIONS_IN_FLIGHT = f"{DOMAIN}_explanations_in_flight"
+
+
+class ExplanationCache:
+    """LRU cache of explanations keyed by joke fingerprint, kept in `.storage`.
+
+    Shared by every config entry: the same joke gets the same explanation
+    whichever entry (or provider) served it.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize an empty cache."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.explanations"
+        )
+        self._entries: OrderedDict[str, dict[str, str]] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Return the number of cached explanations."""
+        return len(self._entries)
+
+    def __contains__(self, fingerprint: object) -> bool:
+        """Return whether a joke has a cached explanation."""
+        return fingerprint in self._entries
+
+    async def async_load(self) -> None:
+        """Load cached explanations from disk."""
+        stored = await self._store.async_load() or {}
+        for fingerprint, entry in stored.get("explanations", {}).items():
+            self._entries[fingerprint] = entry
+
+    def get(self, fingerprint: str) -> str | None:
+        """Return the cached explanation for a joke, marking it recently used."""
+        if (entry := self._entries.get(fingerprint)) is None:
+            return None
+        self._entries.move_to_end(fingerprint)
+        return entry["explanation"]
+
+    @callback
+    def async_set(self, fingerprint: str, explanation: str) -> None:
+        """Cache an explanation, evicting the least recently used if full."""
+        self._entries[fingerprint] = {
+            "explanation": explanation,
+            "created": datetime.now().isoformat(),
+        }
+        self._entries.move_to_end(fingerprint)
+        while len(self._entries) > EXPLANATION_CACHE_SIZE:
+            self._entries.popitem(last=False)
+        self._store.async_delay_save(self._data_to_store, STORAGE_SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        """Forget every explanation and delete the cache from disk."""
+        self._entries.clear()
+        await self._store.async_remove()
+
+    @callback
+    def _data_to_store(self) -> dict[str, Any]:
+        """Return the cache contents to persist, least recently used first."""
+        return {"explanations": dict(self._entries)}
+
+
+async def async_request_explanation(hass: HomeAssistant, joke: str) -> Any:
+    """Ask ai_task.generate_data to explain a joke and return its raw response.
+
+    Concurrent requests for the same joke, from any entry or from
+    pre-generation, share one AI call and its response, which is cached as
+    soon as it arrives. A cancelled caller only cancels the call once no
+    other caller is waiting on it.
+    """
+    cache = await async_get_explanation_cache(hass)
+    if (in_flight := hass.data.get(EXPLANATIONS_IN_FLIGHT)) is None:
+        in_flight = hass.data[EXPLANATIONS_IN_FLIGHT] = SingleFlight(
+            hass, f"{DOMAIN} joke explanation"
+        )
+    fingerprint = joke_fingerprint(joke)
+    if fingerprint in in_flight:
+        _LOGGER.debug("Joining the explanation already in flight for %s", fingerprint)
+    return await in_flight.async_run(
+        fingerprint, lambda: _async_call_ai(hass, cache, fingerprint, joke)
+    )
+
+
+async def _async_call_ai(
+    hass: HomeAssistant, cache: ExplanationCache, fingerprint: str, joke: str
+) -> Any:
+    """Call ai_task.generate_data to explain a joke, caching the explanation."""
+    response = await hass.services.async_call(
+        "ai_task",
+        "generate_data",
+        {
+            "task_name": "explain_joke",
+            "instructions": f"Explain the following joke in plain language:\n{joke}",
+        },
+        blocking=True,
+        return_response=True,
+    )
+    if isinstance(response, dict) and response.get("data"):
+        cache.async_set(fingerprint, response["data"])
+    return response
+
+
+class ExplanationPrefetcher:
+    """Generate explanations in the background before anyone asks for them.
+
+    One prefetcher serves a whole config entry, so its channels share the
+    concurrency cap and the budget. Each sensor lists its jokes in priority
+    order (its current joke first, then queued ones); the lists are merged
+    rank by rank, so every sensor's current joke comes before any queued
+    one. At most ``concurrency`` AI calls run at a time and at most
+    ``hourly_budget`` start in any rolling hour. Work for a joke that is no
+    longer current or queued is cancelled, and so is its AI call unless an
+    explain request is waiting on it too.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        cache: ExplanationCache,
+        concurrency: int,
+        hourly_budget: int,
+    ) -> None:
+        """Initialize the prefetcher."""
+        self._hass = hass
+        self._cache = cache
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.hourly_budget = hourly_budget
+        self._calls: deque[float] = deque()
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._wanted: dict[str, list[str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def calls_last_hour(self) -> int:
+        """Return how many AI calls were started in the last hour."""
+        cutoff = time.monotonic() - 3600
+        while self._calls and self._calls[0] < cutoff:
+            self._calls.popleft()
+        return len(self._calls)
+
+    @property
+    def hit_rate(self) -> float | None:
+        """Return the share of explain requests answered without waiting on AI."""
+        total = self.hits + self.misses
+        return round(self.hits / total, 3) if total else None
+
+    def record(self, hit: bool) -> None:
+        """Record whether an explain request was served from the cache."""
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    @callback
+    def async_update(self, source: str, jokes: list[str]) -> None:
+        """Pre-generate explanations for a sensor's ``jokes``, highest priority first."""
+        self._wanted[source] = jokes
+        self._async_schedule()
+
+    @callback
+    def async_forget(self, source: str) -> None:
+        """Drop a sensor's jokes, cancelling work only it wanted."""
+        if self._wanted.pop(source, None) is not None:
+            self._async_schedule()
+
+    @callback
+    def _async_schedule(self) -> None:
+        """Cancel unwanted work and start work for the wanted jokes."""
+        ranked = chain.from_iterable(zip_longest(*self._wanted.values()))
+        wanted = {joke_fingerprint(joke): joke for joke in ranked if joke}
+        for fingerprint, task in list(self._tasks.items()):
+            if fingerprint not in wanted:
+                task.cancel()
+
+        # Don't queue more work than the remaining budget can pay for.
+        available = self.hourly_budget - self.calls_last_hour - len(self._tasks)
+        for fingerprint, joke in wanted.items():
+            if available <= 0:
+                break
+            if fingerprint in self._tasks or fingerprint in self._cache:
+                continue
+            task = self._hass.async_create_background_task(
+                self._async_generate(fingerprint, joke),
+                f"{DOMAIN} explanation pre-generation",
+            )
+            task.add_done_callback(
+                lambda _, fingerprint=fingerprint: self._tasks.pop(fingerprint, None)
+            )
+            self._tasks[fingerprint] = task
+            available -= 1
+
+    async def async_wait(self, fingerprint: str) -> None:
+        """Wait for an in-flight pre-generation of a joke, if there is one."""
+        if (task := self._tasks.get(fingerprint)) is not None:
+            # asyncio.wait never raises, even if the task is cancelled meanwhile.
+            await asyncio.wait({task})
+
+    async def _async_generate(self, fingerprint: str, joke: str) -> None:
+        """Explain one joke and cache the result."""
+        async with self._semaphore:
+            if fingerprint in self._cache:
+                return
+            if self.calls_last_hour >= self.hourly_budget:
+                _LOGGER.debug("Explanation pre-generation budget used up for this hour")
+                return
+            self._calls.append(time.monotonic())
+            try:
+                # The shared call caches the explanation itself
+                await async_request_explanation(self._hass, joke)
+            except Exception as err:
+                _LOGGER.debug("Explanation pre-generation failed: %s", err)
+                return
+        if fingerprint in self._cache:
+            _LOGGER.debug("Pre-generated explanation for joke %s", fingerprint)
+
+    @callback
+    def async_cancel(self) -> None:
+        """Cancel all pre-generation work."""
+        for task in self._tasks.values():
+            task.cancel()
+
+
+async def async_get_explanation_cache(hass: HomeAssistant) -> ExplanationCache:
+    """Return the shared explanation cache, loading it from disk on first use."""
+    cache: ExplanationCache | None = hass.data.get(EXPLANATION_CACHE)
+    if cache is None:
+        cache = ExplanationCache(hass)
+        await cache.async_load()
+        # Another caller may have finished loading while we awaited.
+        cache = hass.data.setdefault(EXPLANATION_CACHE, cache)
+    return cache
+
+
+async def async_remove_explanation_cache(hass: HomeAssistant) -> None:
+    """Cancel the AI calls in flight and delete the shared explanation cache."""
+    if (in_flight := hass.data.pop(EXPLANATIONS_IN_FLIGHT, None)) is not None:
+        in_flight.cancel_all()
+    if (cache := hass.data.pop(EXPLANATION_CACHE, None)) is None:
+        # Never loaded since startup; the file may still be on disk
+        cache = ExplanationCache(hass)
+    await cache.async_remove()
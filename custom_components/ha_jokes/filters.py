@@ -0,0 +1,136 @@
+"""Joke filters and the inverted index they run against."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from functools import reduce
+import re
+from typing import Any
+
+from .const import ATTR_CATEGORY, ATTR_JOKE
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+def joke_words(text: str) -> list[str]:
+    """Return the case-folded words of a text, in order."""
+    return _WORD.findall(text.casefold())
+
+
+def parse_keywords(value: str | Iterable[str]) -> list[str]:
+    """Split a comma-separated keyword option into keywords."""
+    if isinstance(value, str):
+        value = value.split(",")
+    return [keyword.strip() for keyword in value if keyword.strip()]
+
+
+class JokeFilter:
+    """Constraints a joke must meet: category, length and keywords.
+
+    Keywords match whole words, case-insensitively; a keyword of several
+    words matches them as a phrase. An empty filter matches every joke.
+    """
+
+    def __init__(
+        self,
+        categories: Iterable[str] = (),
+        max_length: int = 0,
+        include_keywords: Iterable[str] = (),
+        exclude_keywords: Iterable[str] = (),
+    ) -> None:
+        """Initialize; a max_length of 0 means no limit."""
+        self.categories = frozenset(
+            category.strip().casefold() for category in categories if category.strip()
+        )
+        self.max_length = max_length
+        self.include = [words for k in include_keywords if (words := tuple(joke_words(k)))]
+        self.exclude = [words for k in exclude_keywords if (words := tuple(joke_words(k)))]
+
+    @property
+    def active(self) -> bool:
+        """Return whether the filter constrains anything."""
+        return bool(self.categories or self.max_length or self.include or self.exclude)
+
+    def matches(self, joke: dict[str, Any]) -> bool:
+        """Return whether a joke meets every constraint."""
+        text = joke[ATTR_JOKE]
+        if self.max_length and len(text) > self.max_length:
+            return False
+        if self.categories and (
+            str(joke.get(ATTR_CATEGORY) or "").casefold() not in self.categories
+        ):
+            return False
+        if not (self.include or self.exclude):
+            return True
+        padded = f" {' '.join(joke_words(text))} "
+        if self.include and not any(f" {' '.join(k)} " in padded for k in self.include):
+            return False
+        return not any(f" {' '.join(k)} " in padded for k in self.exclude)
+
+
+class JokeIndex:
+    """Inverted index from words and categories to the keys of held jokes.
+
+    Selecting the jokes that match a filter intersects a few posting sets
+    instead of scanning every joke; only the candidates left are checked
+    in full, for length and keyword phrases.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty index."""
+        self._words: dict[str, set[str]] = {}
+        self._categories: dict[str, set[str]] = {}
+        self._jokes: dict[str, dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of indexed jokes."""
+        return len(self._jokes)
+
+    def add(self, key: str, joke: dict[str, Any]) -> None:
+        """Index a joke under a key."""
+        self._jokes[key] = joke
+        for word in set(joke_words(joke[ATTR_JOKE])):
+            self._words.setdefault(word, set()).add(key)
+        if category := str(joke.get(ATTR_CATEGORY) or "").casefold():
+            self._categories.setdefault(category, set()).add(key)
+
+    def remove(self, key: str) -> None:
+        """Drop a joke from the index."""
+        if (joke := self._jokes.pop(key, None)) is None:
+            return
+        for word in set(joke_words(joke[ATTR_JOKE])):
+            self._discard(self._words, word, key)
+        if category := str(joke.get(ATTR_CATEGORY) or "").casefold():
+            self._discard(self._categories, category, key)
+
+    @staticmethod
+    def _discard(postings: dict[str, set[str]], term: str, key: str) -> None:
+        """Remove a key from a posting set, dropping the set once empty."""
+        if (keys := postings.get(term)) is not None:
+            keys.discard(key)
+            if not keys:
+                del postings[term]
+
+    def _phrase(self, words: tuple[str, ...]) -> set[str]:
+        """Return the keys of jokes holding every word of a keyword."""
+        postings = [self._words.get(word, set()) for word in words]
+        return reduce(set.intersection, postings[1:], set(postings[0]))
+
+    def select(self, joke_filter: JokeFilter) -> list[str]:
+        """Return the keys of the indexed jokes that match a filter."""
+        if not joke_filter.active:
+            return list(self._jokes)
+        candidates: set[str] | None = None
+        if joke_filter.categories:
+            candidates = set().union(
+                *(self._categories.get(c, ()) for c in joke_filter.categories)
+            )
+        if joke_filter.include:
+            included = set().union(*(self._phrase(k) for k in joke_filter.include))
+            candidates = included if candidates is None else candidates & included
+        if candidates is None:
+            candidates = set(self._jokes)
+        for keyword in joke_filter.exclude:
+            if len(keyword) == 1:
+                candidates -= self._words.get(keyword[0], set())
+        # Phrases and lengths are confirmed on the few candidates left
+        return [key for key in candidates if joke_filter.matches(self._jokes[key])]
@@ -0,0 +1,137 @@
+"""Provider health scoring and circuit breaking for the Jokes integration."""
+from __future__ import annotations
+
+from collections import deque
+import random
+import time
+from typing import Any
+
+from .const import (
+    BREAKER_COOLDOWN,
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_MAX_COOLDOWN,
+    HEALTH_DEFAULT_LATENCY,
+    HEALTH_EWMA_ALPHA,
+    HEALTH_EXPLORATION,
+    HEALTH_WINDOW,
+)
+
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+
+class ProviderHealth:
+    """Rolling success rate, EWMA latency and circuit breaker for one provider."""
+
+    def __init__(self, name: str) -> None:
+        """Initialize a provider with no history."""
+        self.name = name
+        self._outcomes: deque[bool] = deque(maxlen=HEALTH_WINDOW)
+        self.latency: float | None = None
+        self.consecutive_failures = 0
+        self.state = BREAKER_CLOSED
+        self.opened_at = 0.0
+        self.cooldown = BREAKER_COOLDOWN
+
+    @property
+    def success_rate(self) -> float:
+        """Return the smoothed success rate over the rolling window."""
+        # Laplace smoothing keeps a provider with no history at an even 0.5.
+        return (sum(self._outcomes) + 1) / (len(self._outcomes) + 2)
+
+    @property
+    def weight(self) -> float:
+        """Return the ordering weight: reliable and fast providers score higher."""
+        latency = self.latency if self.latency is not None else HEALTH_DEFAULT_LATENCY
+        return self.success_rate**2 / max(latency, 0.05)
+
+    def allow_request(self, now: float) -> bool:
+        """Return whether the breaker lets a request through right now."""
+        if self.state == BREAKER_OPEN and now - self.opened_at >= self.cooldown:
+            # Cool-down elapsed: let trial requests through; the next
+            # outcome decides whether the breaker closes or re-opens.
+            self.state = BREAKER_HALF_OPEN
+        return self.state != BREAKER_OPEN
+
+    def record_success(self, latency: float) -> None:
+        """Record a successful request and its latency in seconds."""
+        self._outcomes.append(True)
+        self.latency = (
+            latency
+            if self.latency is None
+            else HEALTH_EWMA_ALPHA * latency + (1 - HEALTH_EWMA_ALPHA) * self.latency
+        )
+        self.consecutive_failures = 0
+        self.state = BREAKER_CLOSED
+        self.cooldown = BREAKER_COOLDOWN
+
+    def record_failure(self) -> None:
+        """Record a failed request, opening the breaker when warranted."""
+        self._outcomes.append(False)
+        self.consecutive_failures += 1
+        if self.state == BREAKER_HALF_OPEN:
+            # The trial failed: back off for longer before trying again.
+            self.cooldown = min(self.cooldown * 2, BREAKER_MAX_COOLDOWN)
+            self._open()
+        elif (
+            self.state == BREAKER_CLOSED
+            and self.consecutive_failures >= BREAKER_FAILURE_THRESHOLD
+        ):
+            self._open()
+
+    def _open(self) -> None:
+        """Open the breaker."""
+        self.state = BREAKER_OPEN
+        self.opened_at = time.monotonic()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a snapshot suitable for attributes and diagnostics."""
+        return {
+            "state": self.state,
+            "success_rate": round(self.success_rate, 3),
+            "latency": round(self.latency, 3) if self.latency is not None else None,
+            "consecutive_failures": self.consecutive_failures,
+        }
+
+
+class ProviderHealthTracker:
+    """Health of every provider, used to order providers for each refresh."""
+
+    def __init__(self) -> None:
+        """Initialize an empty tracker."""
+        self._providers: dict[str, ProviderHealth] = {}
+
+    def get(self, name: str) -> ProviderHealth:
+        """Return the health record for a provider, creating it if needed."""
+        if (health := self._providers.get(name)) is None:
+            health = self._providers[name] = ProviderHealth(name)
+        return health
+
+    def order(self, names: list[str]) -> list[str]:
+        """Return provider names in the order they should be tried.
+
+        Providers whose breaker is open are skipped. The rest are shuffled with
+        a weighted random draw, so healthy, fast providers usually come first
+        while slower ones still get picked now and then for variety. If every
+        breaker is open, all providers are returned, soonest-to-recover first,
+        rather than giving up entirely.
+        """
+        now = time.monotonic()
+        available = [name for name in names if self.get(name).allow_request(now)]
+        if not available:
+            return sorted(
+                names,
+                key=lambda name: self.get(name).opened_at + self.get(name).cooldown,
+            )
+
+        weights = {name: self.get(name).weight for name in available}
+        floor = HEALTH_EXPLORATION * max(weights.values())
+
+        # Weighted sampling without replacement (Efraimidis-Spirakis): sort by
+        # u ** (1 / w) for u uniform in (0, 1].
+        return sorted(
+            available,
+            key=lambda name: (1.0 - random.random()) ** (1 / max(weights[name], floor)),
+            reverse=True,
+        )
@@ -0,0 +1,95 @@
+"""Ring buffer of recently shown jokes for the Jokes integration."""
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterator
+from itertools import islice
+from typing import Any
+
+from .const import ATTR_CATEGORY, ATTR_JOKE, ATTR_JOKE_ID, ATTR_SHOWN_AT, ATTR_SOURCE
+
+
+class HistoryRecord:
+    """One shown joke; slotted, as an entry can hold hundreds of them."""
+
+    __slots__ = ("joke", "joke_id", "source", "shown_at", "category")
+
+    def __init__(
+        self, joke: str, joke_id: str, source: str, shown_at: str, category: str = ""
+    ) -> None:
+        """Initialize a record."""
+        self.joke = joke
+        self.joke_id = joke_id
+        self.source = source
+        self.shown_at = shown_at
+        self.category = category
+
+    def as_joke(self) -> dict[str, Any]:
+        """Return the joke in the form providers and the pool use."""
+        return {
+            ATTR_JOKE: self.joke,
+            ATTR_JOKE_ID: self.joke_id,
+            ATTR_SOURCE: self.source,
+            ATTR_CATEGORY: self.category,
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the record as returned by the get_history action."""
+        return {**self.as_joke(), ATTR_SHOWN_AT: self.shown_at}
+
+
+class JokeHistory:
+    """Fixed-capacity ring buffer of shown jokes; the oldest drop off when full.
+
+    Records are persisted as plain lists rather than dicts to keep the
+    storage file small.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize an empty history holding at most ``capacity`` jokes."""
+        self._records: deque[HistoryRecord] = deque(maxlen=capacity)
+
+    def __len__(self) -> int:
+        """Return the number of jokes in the history."""
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[HistoryRecord]:
+        """Iterate over the records, oldest first."""
+        return iter(self._records)
+
+    def append(self, joke: dict[str, Any], shown_at: str) -> None:
+        """Record a shown joke."""
+        self._records.append(
+            HistoryRecord(
+                joke[ATTR_JOKE],
+                str(joke.get(ATTR_JOKE_ID, "")),
+                joke.get(ATTR_SOURCE, ""),
+                shown_at,
+                joke.get(ATTR_CATEGORY) or "",
+            )
+        )
+
+    def page(self, offset: int, limit: int) -> list[HistoryRecord]:
+        """Return up to ``limit`` records, newest first, skipping ``offset``."""
+        return list(islice(reversed(self._records), offset, offset + limit))
+
+    def load(self, rows: list[list[str]]) -> None:
+        """Restore records saved by ``rows()``, oldest first."""
+        for row in rows:
+            try:
+                self._records.append(HistoryRecord(*row))
+            except TypeError:
+                continue
+
+    def rows(self) -> list[list[str]]:
+        """Return the records as compact lists for storage, oldest first."""
+        return [
+            [
+                record.joke,
+                record.joke_id,
+                record.source,
+                record.shown_at,
+                record.category,
+            ]
+            for record in self._records
+        ]
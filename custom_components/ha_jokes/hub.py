@@ -0,0 +1,467 @@
+"""Domain-level fetch hub shared by every Jokes config entry."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+import json
+import logging
+from pathlib import Path
+import random
+import time
+from typing import TYPE_CHECKING, Any, Protocol
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, callback
+
+from .client import JokesHttpClient
+from .const import (
+    API_HEADERS_GEEKJOKES,
+    API_HEADERS_ICANHAZDADJOKE,
+    API_HEADERS_JOKEAPI,
+    API_HEADERS_OFFICIAL,
+    API_HEADERS_YOMAMA,
+    API_URL_GEEKJOKES,
+    API_URL_ICANHAZDADJOKE,
+    API_URL_ICANHAZDADJOKE_SEARCH,
+    API_URL_JOKEAPI,
+    API_URL_JOKEAPI_BULK,
+    API_URL_OFFICIAL,
+    API_URL_OFFICIAL_BULK,
+    API_URL_YOMAMA,
+    ATTR_CATEGORY,
+    ATTR_FLAGS,
+    ATTR_JOKE,
+    ATTR_JOKE_ID,
+    ATTR_SOURCE,
+    CORPUS_BATCH_SIZE,
+    DOMAIN,
+    ICANHAZDADJOKE_DEFAULT_PAGES,
+    ICANHAZDADJOKE_PAGE_SIZE,
+    PROVIDER_GEEKJOKES,
+    PROVIDER_ICANHAZDADJOKE,
+    PROVIDER_JOKEAPI,
+    PROVIDER_LOCAL,
+    PROVIDER_OFFICIAL,
+    PROVIDER_YOMAMA,
+    RATE_LIMIT_JOKEAPI,
+)
+from .health import ProviderHealthTracker
+from .metrics import MetricsRegistry
+from .ratelimit import RateLimitTracker
+from .singleflight import SingleFlight
+
+if TYPE_CHECKING:
+    from .corpus import JokeCorpus
+
+_LOGGER = logging.getLogger(__name__)
+
+# hass.data key holding the single JokesFetchHub for this Home Assistant instance.
+FETCH_HUB = f"{DOMAIN}_fetch_hub"
+
+
+class JokesSubscriber(Protocol):
+    """A consumer of fetched jokes, typically a coordinator's pool."""
+
+    def accepts(self, provider: str, corpus_path: str | None) -> bool:
+        """Return whether jokes from this provider are wanted."""
+
+    def offer_jokes(self, provider: str, jokes: list[dict[str, Any]]) -> None:
+        """Receive a batch of freshly fetched jokes."""
+
+
+class JokesFetchHub:
+    """Owns the HTTP layer, per-provider state and in-flight requests.
+
+    Identical provider requests made while one is already in flight share that
+    request (single-flight), and every successful batch is offered to every
+    subscribed coordinator that has the provider enabled, so several config
+    entries together cost about as much network I/O as one.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the hub."""
+        self._hass = hass
+        self.client = JokesHttpClient(hass)
+        # Keyed by provider name, so health and breaker state is shared by
+        # every entry and survives entry reloads: the hub outlives unloads
+        # and only closes on shutdown or when the last entry is deleted.
+        self.health = ProviderHealthTracker()
+        self.limits = RateLimitTracker({PROVIDER_JOKEAPI: RATE_LIMIT_JOKEAPI})
+        self.metrics = MetricsRegistry()
+        self._providers = {p["name"]: p for p in self._build_provider_configs()}
+        self._corpora: dict[str, JokeCorpus] = {}
+        self._inflight: SingleFlight[
+            tuple[str, bool, str | None], list[dict[str, Any]] | None
+        ] = SingleFlight(hass, f"{DOMAIN} fetch")
+        self._subscribers: set[JokesSubscriber] = set()
+        self._icanhazdadjoke_pages = ICANHAZDADJOKE_DEFAULT_PAGES
+        self.coalesced = 0
+        # Provider requests skipped because the provider was throttled
+        self.throttled = 0
+        self._unsub_close = hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_CLOSE, self._async_handle_close
+        )
+
+    @property
+    def provider_names(self) -> list[str]:
+        """Return the names of all known providers."""
+        return list(self._providers)
+
+    def is_local(self, name: str) -> bool:
+        """Return whether a provider is served from disk rather than over HTTP."""
+        return "fetch" in self._providers[name]
+
+    def order(self, names: list[str]) -> list[str]:
+        """Return the providers to try, best first, leaving out throttled ones."""
+        now = time.monotonic()
+        available = [
+            name
+            for name in names
+            if self.is_local(name) or self.limits.get(name).retry_in(now) == 0
+        ]
+        self.throttled += len(names) - len(available)
+        return self.health.order(available)
+
+    def _build_provider_configs(self) -> list[dict[str, Any]]:
+        """Build provider configurations.
+
+        Providers with a batch endpoint also carry ``bulk_url`` (plus optional
+        ``bulk_params``) and a ``bulk_parser`` returning a list of jokes; the
+        others are refilled one joke per request. Local providers have a
+        ``fetch`` coroutine instead of a URL.
+        """
+        return [
+            {
+                "name": PROVIDER_ICANHAZDADJOKE,
+                "url": API_URL_ICANHAZDADJOKE,
+                "headers": API_HEADERS_ICANHAZDADJOKE,
+                "parser": self._parse_icanhazdadjoke,
+                "bulk_url": API_URL_ICANHAZDADJOKE_SEARCH,
+                "bulk_params": self._icanhazdadjoke_search_params,
+                "bulk_parser": self._parse_icanhazdadjoke_search,
+            },
+            {
+                "name": PROVIDER_JOKEAPI,
+                "url": API_URL_JOKEAPI,
+                "headers": API_HEADERS_JOKEAPI,
+                "parser": self._parse_jokeapi,
+                "bulk_url": API_URL_JOKEAPI_BULK,
+                "bulk_parser": self._parse_jokeapi_batch,
+            },
+            {
+                "name": PROVIDER_OFFICIAL,
+                "url": API_URL_OFFICIAL,
+                "headers": API_HEADERS_OFFICIAL,
+                "parser": self._parse_official_joke_api,
+                "bulk_url": API_URL_OFFICIAL_BULK,
+                "bulk_parser": self._parse_official_joke_api_batch,
+            },
+            {
+                "name": PROVIDER_GEEKJOKES,
+                "url": API_URL_GEEKJOKES,
+                "headers": API_HEADERS_GEEKJOKES,
+                "parser": self._parse_geekjokes,
+            },
+            {
+                "name": PROVIDER_YOMAMA,
+                "url": API_URL_YOMAMA,
+                "headers": API_HEADERS_YOMAMA,
+                "parser": self._parse_yomama,
+            },
+            {
+                "name": PROVIDER_LOCAL,
+                "fetch": self._fetch_local_corpus,
+            },
+        ]
+
+    def _parse_icanhazdadjoke(self, data: dict) -> dict[str, Any]:
+        """Parse icanhazdadjoke.com response."""
+        return {
+            ATTR_JOKE: data.get("joke", ""),
+            ATTR_JOKE_ID: data.get("id", ""),
+            ATTR_SOURCE: "icanhazdadjoke.com",
+        }
+
+    def _icanhazdadjoke_search_params(self) -> dict[str, int]:
+        """Return query parameters for a random page of the search endpoint."""
+        return {
+            "limit": ICANHAZDADJOKE_PAGE_SIZE,
+            "page": random.randint(1, self._icanhazdadjoke_pages),
+        }
+
+    def _parse_icanhazdadjoke_search(self, data: dict) -> list[dict[str, Any]]:
+        """Parse an icanhazdadjoke.com search page."""
+        # Remember how many pages exist so later requests stay in range
+        self._icanhazdadjoke_pages = max(int(data.get("total_pages") or 1), 1)
+        return [self._parse_icanhazdadjoke(item) for item in data.get("results", [])]
+
+    def _parse_jokeapi(self, data: dict) -> dict[str, Any]:
+        """Parse JokeAPI v2 response."""
+        # JokeAPI returns different formats for single and two-part jokes
+        # We're using type=single, so we get the 'joke' field
+        joke_text = data.get("joke", "")
+        joke_id = str(data.get("id", ""))
+
+        return {
+            ATTR_JOKE: joke_text,
+            ATTR_JOKE_ID: joke_id,
+            ATTR_SOURCE: "jokeapi.dev",
+            ATTR_CATEGORY: data.get("category", ""),
+            # e.g. nsfw, religious, political; only the flags that are set
+            ATTR_FLAGS: [flag for flag, value in (data.get("flags") or {}).items() if value],
+        }
+
+    def _parse_jokeapi_batch(self, data: dict) -> list[dict[str, Any]]:
+        """Parse a JokeAPI v2 response requested with amount=N."""
+        return [self._parse_jokeapi(item) for item in data.get("jokes", [])]
+
+    def _parse_official_joke_api(self, data: dict) -> dict[str, Any]:
+        """Parse Official Joke API response."""
+        # Official Joke API returns setup and punchline separately
+        setup = data.get("setup", "")
+        punchline = data.get("punchline", "")
+        joke_text = f"{setup} {punchline}" if setup and punchline else ""
+        joke_id = str(data.get("id", ""))
+
+        return {
+            ATTR_JOKE: joke_text,
+            ATTR_JOKE_ID: joke_id,
+            ATTR_SOURCE: "official-joke-api.appspot.com",
+            ATTR_CATEGORY: data.get("type", ""),
+        }
+
+    def _parse_official_joke_api_batch(self, data: list) -> list[dict[str, Any]]:
+        """Parse an Official Joke API /random_ten response."""
+        return [self._parse_official_joke_api(item) for item in data]
+
+    def _parse_geekjokes(self, data: dict) -> dict[str, Any]:
+        """Parse Geek Jokes response."""
+        # Geek Jokes returns a single 'joke' field and no id
+        return {
+            ATTR_JOKE: data.get("joke", ""),
+            ATTR_JOKE_ID: "",
+            ATTR_SOURCE: "geek-jokes.sameerkumar.website",
+        }
+
+    def _parse_yomama(self, data: dict) -> dict[str, Any]:
+        """Parse Yo Mama Jokes response (adult/roast humour)."""
+        # Yo Mama returns a 'joke' field, a 'category' and no id
+        return {
+            ATTR_JOKE: data.get("joke", ""),
+            ATTR_JOKE_ID: "",
+            ATTR_SOURCE: "yomama-jokes.com",
+            ATTR_CATEGORY: data.get("category", ""),
+        }
+
+    async def _fetch_local_corpus(
+        self, bulk: bool, corpus_path: str | None
+    ) -> list[dict[str, Any]]:
+        """Draw random jokes from a local corpus file."""
+        if corpus_path is None:
+            return []
+        if (corpus := self._corpora.get(corpus_path)) is None:
+            corpus = await self._hass.async_add_executor_job(
+                self._open_corpus, Path(self._hass.config.path(corpus_path))
+            )
+            # Another request may have opened it while we waited.
+            corpus = self._corpora.setdefault(corpus_path, corpus)
+        return await self._hass.async_add_executor_job(
+            corpus.random_jokes, CORPUS_BATCH_SIZE if bulk else 1
+        )
+
+    @staticmethod
+    def _open_corpus(path: Path) -> JokeCorpus:
+        """Create a corpus reader, importing the module off the event loop."""
+        # Only installs using the local provider pay for importing it.
+        from .corpus import JokeCorpus
+
+        return JokeCorpus(path)
+
+    async def _fetch_from_provider(
+        self, provider: dict, bulk: bool, corpus_path: str | None
+    ) -> list[dict[str, Any]] | None:
+        """Fetch jokes from a specific provider.
+
+        With ``bulk`` set, providers that have a batch endpoint return a whole
+        batch in one request; the rest return a single joke.
+        """
+        if "fetch" in provider:
+            try:
+                jokes = await provider["fetch"](bulk, corpus_path)
+            except Exception as err:
+                _LOGGER.warning(
+                    "Error fetching from provider %s: %s", provider["name"], err
+                )
+                return None
+            if not jokes:
+                _LOGGER.warning("Provider %s returned no jokes", provider["name"])
+                return None
+            return jokes
+
+        bulk = bulk and "bulk_url" in provider
+        url = provider["bulk_url"] if bulk else provider["url"]
+        params = provider["bulk_params"]() if bulk and "bulk_params" in provider else None
+        try:
+            async with self.client.session.get(
+                url, headers=provider["headers"], params=params
+            ) as response:
+                limit = self.limits.get(provider["name"])
+                limit.record_response(
+                    response.status, response.headers, time.monotonic()
+                )
+                if response.status == 200:
+                    body = await response.read()
+                    parse_started = time.perf_counter()
+                    data = json.loads(body)
+                    if bulk:
+                        parsed = provider["bulk_parser"](data)
+                    else:
+                        parsed = [provider["parser"](data)]
+                    self.metrics.get(provider["name"]).record_response(
+                        len(body), time.perf_counter() - parse_started
+                    )
+                    jokes = [joke for joke in parsed if joke.get(ATTR_JOKE)]
+                    if not jokes:
+                        _LOGGER.warning(
+                            "Provider %s returned no joke text", provider["name"]
+                        )
+                        return None
+                    _LOGGER.debug(
+                        "Successfully fetched %s joke(s) from %s",
+                        len(jokes),
+                        provider["name"],
+                    )
+                    return jokes
+                elif response.status == 429:
+                    _LOGGER.warning(
+                        "Provider %s is rate limiting requests; backing off for %.0f seconds",
+                        provider["name"],
+                        limit.retry_in(time.monotonic()),
+                    )
+                    return None
+                else:
+                    _LOGGER.warning(
+                        "Provider %s returned status %s",
+                        provider["name"],
+                        response.status,
+                    )
+                    return None
+        except Exception as err:
+            _LOGGER.warning(
+                "Error fetching from provider %s: %s", provider["name"], err
+            )
+            return None
+
+    async def _async_fetch_shared(
+        self, name: str, bulk: bool, timeout: float, corpus_path: str | None
+    ) -> list[dict[str, Any]] | None:
+        """Fetch once for every caller, then fan the result out to subscribers."""
+        health = self.health.get(name)
+        metrics = self.metrics.get(name)
+        started = time.monotonic()
+        timed_out = False
+        try:
+            async with asyncio.timeout(timeout):
+                result = await self._fetch_from_provider(
+                    self._providers[name], bulk, corpus_path
+                )
+        except asyncio.TimeoutError:
+            _LOGGER.warning(
+                "Provider %s did not answer within %s seconds", name, timeout
+            )
+            result = None
+            timed_out = True
+
+        if not result:
+            health.record_failure()
+            metrics.record_failure(timed_out)
+            return None
+
+        latency = time.monotonic() - started
+        health.record_success(latency)
+        metrics.record_success(latency)
+        for subscriber in list(self._subscribers):
+            if subscriber.accepts(name, corpus_path):
+                subscriber.offer_jokes(name, result)
+        self.client.log_stats()
+        return result
+
+    async def async_fetch(
+        self,
+        name: str,
+        bulk: bool,
+        timeout: float,
+        corpus_path: str | None = None,
+    ) -> list[dict[str, Any]] | None:
+        """Fetch jokes from a provider, sharing any identical request in flight.
+
+        The result is also offered to every subscriber that has the provider
+        enabled. A cancelled caller, such as a losing hedged request, only
+        cancels the shared request once no other caller is waiting on it.
+        """
+        key = (name, bulk, corpus_path if name == PROVIDER_LOCAL else None)
+        if key not in self._inflight:
+            # Throttled providers are skipped without a request, and without
+            # counting against their health.
+            if not self.is_local(name) and not self.limits.get(name).try_acquire(
+                time.monotonic()
+            ):
+                self.throttled += 1
+                _LOGGER.debug(
+                    "Skipping %s: rate limited for another %.0f seconds",
+                    name,
+                    self.limits.get(name).retry_in(time.monotonic()),
+                )
+                return None
+        else:
+            self.coalesced += 1
+            _LOGGER.debug("Joining in-flight request to %s", name)
+
+        return await self._inflight.async_run(
+            key, lambda: self._async_fetch_shared(name, bulk, timeout, key[2])
+        )
+
+    @callback
+    def async_subscribe(self, subscriber: JokesSubscriber) -> Callable[[], None]:
+        """Offer every fetched batch to ``subscriber``; return an unsubscribe callable."""
+        self._subscribers.add(subscriber)
+
+        @callback
+        def _unsubscribe() -> None:
+            self._subscribers.discard(subscriber)
+
+        return _unsubscribe
+
+    async def async_close(self) -> None:
+        """Cancel in-flight requests, close the HTTP session and local corpora."""
+        if self._unsub_close is not None:
+            self._unsub_close()
+            self._unsub_close = None
+        self._inflight.cancel_all()
+        await self.client.async_close()
+        for corpus in self._corpora.values():
+            await self._hass.async_add_executor_job(corpus.close)
+        self._corpora.clear()
+
+    async def _async_handle_close(self, event: Event) -> None:
+        """Close and forget the hub when Home Assistant shuts down."""
+        self._unsub_close = None
+        if self._hass.data.get(FETCH_HUB) is self:
+            del self._hass.data[FETCH_HUB]
+        await self.async_close()
+
+
+@callback
+def async_get_hub(hass: HomeAssistant) -> JokesFetchHub:
+    """Return the shared fetch hub, creating it on first use."""
+    hub: JokesFetchHub | None = hass.data.get(FETCH_HUB)
+    if hub is None:
+        hub = hass.data[FETCH_HUB] = JokesFetchHub(hass)
+    return hub
+
+
+async def async_close_hub(hass: HomeAssistant) -> None:
+    """Close and forget the shared fetch hub, if one exists."""
+    hub: JokesFetchHub | None = hass.data.pop(FETCH_HUB, None)
+    if hub is not None:
+        await hub.async_close()
@@ -0,0 +1,116 @@
+"""Append-only log of shown jokes for the Jokes integration.
+
+In compact-history mode the recorder only stores a short joke reference (the
+joke's fingerprint); the text behind each reference is written here once, as
+one JSON line, so history stays readable without bloating the database.
+
+Once the log holds ``JOKE_LOG_MAX_ENTRIES`` jokes it is rotated: the file
+moves to ``<file>.1``, replacing the previous one, and a new log starts. Older
+references stay readable there, while disk and memory use stay bounded.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from pathlib import Path
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    ATTR_JOKE,
+    ATTR_JOKE_ID,
+    ATTR_SOURCE,
+    DOMAIN,
+    JOKE_LOG_FILE,
+    JOKE_LOG_MAX_ENTRIES,
+)
+from .pool import joke_fingerprint
+
+_LOGGER = logging.getLogger(__name__)
+
+# hass.data key holding the single JokeLog for this Home Assistant instance.
+JOKE_LOG = f"{DOMAIN}_joke_log"
+
+
+class JokeLog:
+    """Joke texts keyed by fingerprint, each written once."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize; the existing log is read on first use."""
+        self._hass = hass
+        self.path = Path(hass.config.path(".storage", JOKE_LOG_FILE))
+        self.rotated_path = self.path.with_name(f"{self.path.name}.1")
+        self._logged: set[str] | None = None
+        self._lock = asyncio.Lock()
+
+    async def async_append(self, joke: dict[str, Any]) -> str:
+        """Log a joke unless it already is; return its reference."""
+        ref = joke_fingerprint(joke[ATTR_JOKE])
+        async with self._lock:
+            if self._logged is None:
+                self._logged = await self._hass.async_add_executor_job(self._load)
+            if ref in self._logged:
+                return ref
+            line = json.dumps(
+                {
+                    "ref": ref,
+                    ATTR_JOKE: joke[ATTR_JOKE],
+                    ATTR_JOKE_ID: joke.get(ATTR_JOKE_ID, ""),
+                    ATTR_SOURCE: joke.get(ATTR_SOURCE, ""),
+                },
+                ensure_ascii=False,
+            )
+            await self._hass.async_add_executor_job(self._write, line)
+            self._logged.add(ref)
+            if len(self._logged) >= JOKE_LOG_MAX_ENTRIES:
+                await self._hass.async_add_executor_job(self._rotate)
+                self._logged = set()
+                _LOGGER.debug("Rotated joke log to %s", self.rotated_path)
+        _LOGGER.debug("Logged joke %s to %s", ref, self.path)
+        return ref
+
+    def _load(self) -> set[str]:
+        """Return the references already in the log."""
+        refs: set[str] = set()
+        try:
+            with open(self.path, encoding="utf-8") as log:
+                for line in log:
+                    try:
+                        refs.add(json.loads(line)["ref"])
+                    except (ValueError, KeyError):
+                        continue
+        except FileNotFoundError:
+            pass
+        return refs
+
+    async def async_remove(self) -> None:
+        """Delete the log and its rotated predecessor."""
+        async with self._lock:
+            await self._hass.async_add_executor_job(self._remove)
+            self._logged = None
+
+    def _rotate(self) -> None:
+        """Move the log aside, replacing the previous rotated log."""
+        self.path.replace(self.rotated_path)
+
+    def _remove(self) -> None:
+        """Delete the log files."""
+        self.path.unlink(missing_ok=True)
+        self.rotated_path.unlink(missing_ok=True)
+
+    def _write(self, line: str) -> None:
+        """Append one line to the log."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as log:
+            log.write(line + "\n")
+
+
+@callback
+def async_get_joke_log(hass: HomeAssistant) -> JokeLog:
+    """Return the shared joke log, creating it on first use."""
+    log: JokeLog | None = hass.data.get(JOKE_LOG)
+    if log is None:
+        log = hass.data[JOKE_LOG] = JokeLog(hass)
+    return log
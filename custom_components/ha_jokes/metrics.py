@@ -0,0 +1,122 @@
+"""Per-provider request metrics for the Jokes integration."""
+from __future__ import annotations
+
+from bisect import bisect_left
+import math
+from typing import Any
+
+from .const import (
+    METRICS_HISTOGRAM_FACTOR,
+    METRICS_HISTOGRAM_MAX,
+    METRICS_HISTOGRAM_MIN,
+)
+
+
+class LatencyHistogram:
+    """Fixed-memory latency histogram with log-spaced buckets.
+
+    Bucket bounds grow by a constant factor, so percentiles are accurate to
+    within that factor whatever the scale, and memory does not grow with the
+    number of samples.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty histogram."""
+        steps = math.ceil(
+            math.log(METRICS_HISTOGRAM_MAX / METRICS_HISTOGRAM_MIN)
+            / math.log(METRICS_HISTOGRAM_FACTOR)
+        )
+        self._bounds = [
+            METRICS_HISTOGRAM_MIN * METRICS_HISTOGRAM_FACTOR**step
+            for step in range(steps + 1)
+        ]
+        # One extra bucket for samples above the largest bound.
+        self._counts = [0] * (len(self._bounds) + 1)
+        self.count = 0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Add a sample."""
+        self._counts[bisect_left(self._bounds, seconds)] += 1
+        self.count += 1
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q: float) -> float | None:
+        """Return the upper bound of the bucket holding the q-th percentile."""
+        if not self.count:
+            return None
+        rank = math.ceil(q / 100 * self.count)
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank:
+                if index < len(self._bounds):
+                    return min(self._bounds[index], self.max)
+                return self.max
+        return self.max
+
+
+class ProviderMetrics:
+    """Request counters and latency distribution for one provider."""
+
+    def __init__(self, name: str) -> None:
+        """Initialize a provider with no requests."""
+        self.name = name
+        self.requests = 0
+        self.successes = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.response_bytes = 0
+        self.parse_time = 0.0
+        self.latency = LatencyHistogram()
+
+    def record_success(self, latency: float) -> None:
+        """Record a request that returned jokes."""
+        self.requests += 1
+        self.successes += 1
+        self.latency.record(latency)
+
+    def record_failure(self, timed_out: bool = False) -> None:
+        """Record a request that failed or timed out."""
+        self.requests += 1
+        self.failures += 1
+        if timed_out:
+            self.timeouts += 1
+
+    def record_response(self, size: int, parse_time: float) -> None:
+        """Record the size of a response body and how long parsing it took."""
+        self.response_bytes += size
+        self.parse_time += parse_time
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a snapshot suitable for attributes and diagnostics."""
+
+        def _ms(seconds: float | None) -> float | None:
+            return round(seconds * 1000, 1) if seconds is not None else None
+
+        return {
+            "requests": self.requests,
+            "successes": self.successes,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "latency_p50_ms": _ms(self.latency.percentile(50)),
+            "latency_p95_ms": _ms(self.latency.percentile(95)),
+            "latency_p99_ms": _ms(self.latency.percentile(99)),
+            "latency_max_ms": _ms(self.latency.max if self.latency.count else None),
+            "response_bytes": self.response_bytes,
+            "parse_time_ms": _ms(self.parse_time),
+        }
+
+
+class MetricsRegistry:
+    """Metrics of every provider, keyed by provider name."""
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._providers: dict[str, ProviderMetrics] = {}
+
+    def get(self, name: str) -> ProviderMetrics:
+        """Return the metrics for a provider, creating them if needed."""
+        if (metrics := self._providers.get(name)) is None:
+            metrics = self._providers[name] = ProviderMetrics(name)
+        return metrics
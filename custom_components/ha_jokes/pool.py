@@ -0,0 +1,163 @@
+"""In-memory pool of prefetched jokes for the Jokes integration."""
+from __future__ import annotations
+
+from collections import OrderedDict
+import hashlib
+import random
+import re
+from typing import Any
+
+from .const import ATTR_JOKE
+from .filters import JokeFilter, JokeIndex
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def joke_fingerprint(text: str) -> str:
+    """Return a short stable fingerprint of a joke's normalized text.
+
+    Case, punctuation and whitespace are ignored, so the same joke served by
+    two providers with different formatting gets the same fingerprint.
+    """
+    normalized = _NON_WORD.sub(" ", text.casefold()).strip()
+    return hashlib.blake2b(normalized.encode(), digest_size=8).hexdigest()
+
+
+class SeenJokes:
+    """Fixed-size LRU set of fingerprints of recently shown jokes.
+
+    Fingerprints are taken from the normalized joke text, so repeats are caught
+    across providers and for providers that return no joke id.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize an empty index holding at most ``capacity`` fingerprints."""
+        self.capacity = capacity
+        self._fingerprints: OrderedDict[str, None] = OrderedDict()
+
+    def __contains__(self, fingerprint: object) -> bool:
+        """Return whether a fingerprint was seen recently."""
+        return fingerprint in self._fingerprints
+
+    def __len__(self) -> int:
+        """Return the number of remembered fingerprints."""
+        return len(self._fingerprints)
+
+    def add(self, fingerprint: str) -> None:
+        """Remember a fingerprint, evicting the least recently seen if full."""
+        if self.capacity <= 0:
+            return
+        self._fingerprints[fingerprint] = None
+        self._fingerprints.move_to_end(fingerprint)
+        while len(self._fingerprints) > self.capacity:
+            self._fingerprints.popitem(last=False)
+
+    def load(self, fingerprints: list[str]) -> None:
+        """Restore fingerprints, oldest first."""
+        for fingerprint in fingerprints:
+            self.add(fingerprint)
+
+    def fingerprints(self) -> list[str]:
+        """Return the remembered fingerprints, oldest first."""
+        return list(self._fingerprints)
+
+
+class JokePool:
+    """Bounded set of ready-to-serve jokes, refilled in bulk in the background.
+
+    With a filter, only matching jokes are served and count towards the
+    pool's depth; they are found through an inverted index rather than by
+    scanning. Jokes that do not match are kept while there is room, and
+    make way for matching ones once the pool is full.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        refill_threshold: int,
+        seen: SeenJokes | None = None,
+        joke_filter: JokeFilter | None = None,
+    ) -> None:
+        """Initialize an empty pool, optionally rejecting recently seen jokes."""
+        self.max_size = max_size
+        self.refill_threshold = refill_threshold
+        self._seen = seen
+        self._filter = joke_filter or JokeFilter()
+        self._jokes: dict[str, dict[str, Any]] = {}
+        self._index = JokeIndex()
+
+    def __len__(self) -> int:
+        """Return the number of jokes held, matching the filter or not."""
+        return len(self._jokes)
+
+    @property
+    def available(self) -> int:
+        """Return the number of jokes that match the filter."""
+        if not self._filter.active:
+            return len(self._jokes)
+        return len(self._index.select(self._filter))
+
+    @property
+    def needs_refill(self) -> bool:
+        """Return whether the pool has dropped to its low-water mark."""
+        return self.available <= self.refill_threshold
+
+    def add(self, jokes: list[dict[str, Any]]) -> int:
+        """Add jokes until the pool is full; return how many were added.
+
+        Jokes already pooled or recently seen are skipped, so the next
+        candidate in the batch takes their place.
+        """
+        added = 0
+        for joke in jokes:
+            key = joke_fingerprint(joke[ATTR_JOKE])
+            if key in self._jokes or (self._seen is not None and key in self._seen):
+                continue
+            if len(self._jokes) >= self.max_size and not self._make_room(joke):
+                continue
+            self._jokes[key] = joke
+            self._index.add(key, joke)
+            added += 1
+        return added
+
+    def _make_room(self, joke: dict[str, Any]) -> bool:
+        """Evict a joke that does not match the filter for one that does."""
+        if not self._filter.active or not self._filter.matches(joke):
+            return False
+        unmatched = self._jokes.keys() - set(self._index.select(self._filter))
+        if not unmatched:
+            return False
+        self._remove(next(iter(unmatched)))
+        return True
+
+    def _remove(self, key: str) -> dict[str, Any]:
+        """Remove a joke from the pool and its index."""
+        self._index.remove(key)
+        return self._jokes.pop(key)
+
+    def pop(self) -> dict[str, Any] | None:
+        """Remove and return a random unseen matching joke, or None.
+
+        The returned joke is recorded as seen.
+        """
+        while keys := self._index.select(self._filter):
+            # Batches arrive one provider at a time; drawing at random keeps
+            # consecutive jokes from all coming from the same source.
+            key = random.choice(keys)
+            joke = self._remove(key)
+            if self._seen is None:
+                return joke
+            # The joke may have been shown since it was pooled (e.g. by a
+            # restored pool); drop it and draw again.
+            if key not in self._seen:
+                self._seen.add(key)
+                return joke
+        return None
+
+    def jokes(self) -> list[dict[str, Any]]:
+        """Return every pooled joke without removing it."""
+        return list(self._jokes.values())
+
+    def matching_jokes(self) -> list[dict[str, Any]]:
+        """Return the pooled jokes that match the filter without removing them."""
+        return [self._jokes[key] for key in self._index.select(self._filter)]
@@ -0,0 +1,161 @@
+"""Per-provider rate limiting for the Jokes integration."""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from email.utils import parsedate_to_datetime
+import random
+import time
+from typing import Any
+
+from .const import (
+    RATE_LIMIT_BACKOFF_BASE,
+    RATE_LIMIT_BACKOFF_MAX,
+    RATE_LIMIT_DEFAULT,
+    RATE_LIMIT_PERIOD,
+)
+
+# Header names are matched case-insensitively; providers use both the
+# IETF draft names and the older X- prefixed ones.
+_REMAINING_HEADERS = ("RateLimit-Remaining", "X-RateLimit-Remaining")
+_LIMIT_HEADERS = ("RateLimit-Limit", "X-RateLimit-Limit")
+_RESET_HEADERS = ("RateLimit-Reset", "X-RateLimit-Reset")
+
+# Reset values larger than this are Unix timestamps rather than delays.
+_EPOCH_THRESHOLD = 10**9
+
+
+def _header_number(headers: Mapping[str, str], names: tuple[str, ...]) -> float | None:
+    """Return the first of ``names`` present in ``headers`` as a number."""
+    for name in names:
+        if (value := headers.get(name)) is not None:
+            try:
+                return float(value)
+            except ValueError:
+                return None
+    return None
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Return the delay in seconds from a Retry-After header, if valid.
+
+    The header holds either a number of seconds or an HTTP date.
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+class ProviderRateLimit:
+    """Token bucket plus server-driven backoff for one provider.
+
+    The bucket allows ``rate`` requests per ``period`` seconds, refilled
+    continuously. On top of that, a 429 or 5xx response blocks the provider
+    for an exponentially growing, jittered delay (or the server's
+    ``Retry-After``, whichever is longer), and quota headers reporting no
+    requests left block it until the quota resets.
+    """
+
+    def __init__(self, name: str, rate: int, period: float) -> None:
+        """Initialize a full bucket."""
+        self.name = name
+        self.capacity = rate
+        self._refill_rate = rate / period
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.backoff_attempts = 0
+        self.server_limit: int | None = None
+        self.server_remaining: int | None = None
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens accrued since the last call."""
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self._refill_rate
+        )
+        self._updated = now
+
+    def retry_in(self, now: float) -> float:
+        """Return how many seconds until a request may be made (0 if now)."""
+        self._refill(now)
+        wait = max(self.blocked_until - now, 0.0)
+        if self._tokens < 1:
+            wait = max(wait, (1 - self._tokens) / self._refill_rate)
+        return wait
+
+    def try_acquire(self, now: float) -> bool:
+        """Spend a token if the provider may be asked right now."""
+        if self.retry_in(now) > 0:
+            return False
+        self._tokens -= 1
+        return True
+
+    def record_response(
+        self, status: int, headers: Mapping[str, str], now: float
+    ) -> None:
+        """Update quota and backoff from a provider's response."""
+        if (remaining := _header_number(headers, _REMAINING_HEADERS)) is not None:
+            self.server_remaining = int(remaining)
+            # Never believe we have more budget than the server says we do.
+            self._refill(now)
+            self._tokens = min(self._tokens, remaining)
+        if (limit := _header_number(headers, _LIMIT_HEADERS)) is not None:
+            self.server_limit = int(limit)
+        if self.server_remaining == 0 and (
+            reset := _header_number(headers, _RESET_HEADERS)
+        ) is not None:
+            if reset > _EPOCH_THRESHOLD:
+                reset -= time.time()
+            self.blocked_until = max(self.blocked_until, now + max(reset, 0.0))
+
+        if status == 429 or status >= 500:
+            self.backoff_attempts += 1
+            # Full jitter between half and all of the exponential delay keeps
+            # several entries or instances from retrying in lockstep.
+            delay = min(
+                RATE_LIMIT_BACKOFF_BASE * 2 ** (self.backoff_attempts - 1),
+                RATE_LIMIT_BACKOFF_MAX,
+            ) * random.uniform(0.5, 1.0)
+            retry_after = parse_retry_after(headers.get("Retry-After"))
+            self.blocked_until = max(
+                self.blocked_until, now + max(delay, retry_after or 0.0)
+            )
+        elif status < 400:
+            self.backoff_attempts = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a snapshot suitable for attributes and diagnostics."""
+        now = time.monotonic()
+        retry_in = self.retry_in(now)
+        return {
+            "remaining": int(self._tokens)
+            if self.server_remaining is None
+            else min(int(self._tokens), self.server_remaining),
+            "limit": self.server_limit or self.capacity,
+            "throttled_for": round(retry_in, 1) if retry_in else 0,
+            "backoff_attempts": self.backoff_attempts,
+        }
+
+
+class RateLimitTracker:
+    """Rate limits of every provider, keyed by provider name."""
+
+    def __init__(self, rates: Mapping[str, int] | None = None) -> None:
+        """Initialize with per-provider requests per RATE_LIMIT_PERIOD."""
+        self._rates = dict(rates or {})
+        self._providers: dict[str, ProviderRateLimit] = {}
+
+    def get(self, name: str) -> ProviderRateLimit:
+        """Return the rate limit for a provider, creating it if needed."""
+        if (limit := self._providers.get(name)) is None:
+            limit = self._providers[name] = ProviderRateLimit(
+                name, self._rates.get(name, RATE_LIMIT_DEFAULT), RATE_LIMIT_PERIOD
+            )
+        return limit
@@ -0,0 +1,110 @@
+"""Content safety filter for the Jokes integration."""
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterable
+import logging
+from typing import Any
+
+from .const import ATTR_JOKE, SAFETY_BLOCKLIST
+from .filters import joke_words
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _padded(text: str) -> str:
+    """Return a text's words, space-separated and space-padded.
+
+    Padding both the jokes and the blocked words this way makes every match
+    a whole-word (or whole-phrase) match.
+    """
+    return f" {' '.join(joke_words(text))} "
+
+
+class AhoCorasick:
+    """Multi-pattern string matcher.
+
+    All patterns are compiled into one automaton, so searching a text costs
+    time linear in its length however many patterns there are.
+    """
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        """Compile the automaton for a set of patterns."""
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._match: list[str | None] = [None]
+        for pattern in patterns:
+            self._insert(pattern)
+        self._link()
+
+    def _insert(self, pattern: str) -> None:
+        """Add a pattern to the trie."""
+        state = 0
+        for char in pattern:
+            if (next_state := self._goto[state].get(char)) is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._match.append(None)
+                self._goto[state][char] = next_state
+            state = next_state
+        self._match[state] = pattern
+
+    def _link(self) -> None:
+        """Compute failure links breadth-first, inheriting matches along them."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                if self._match[next_state] is None:
+                    self._match[next_state] = self._match[self._fail[next_state]]
+
+    def search(self, text: str) -> str | None:
+        """Return the first pattern found in a text, or None."""
+        goto, fail, match = self._goto, self._fail, self._match
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if match[state] is not None:
+                return match[state]
+        return None
+
+
+class ContentFilter:
+    """Reject jokes containing a blocked word or phrase, counting per provider.
+
+    The built-in blocklist of crude words can be extended with the entry's
+    own words. Matching is case-insensitive, ignores punctuation and only
+    hits whole words.
+    """
+
+    def __init__(self, extra_words: Iterable[str] = ()) -> None:
+        """Compile the blocklist."""
+        patterns = {_padded(word) for word in (*SAFETY_BLOCKLIST, *extra_words)}
+        patterns.discard("  ")
+        self._matcher = AhoCorasick(patterns)
+        self.rejects: dict[str, int] = {}
+
+    def blocked(self, joke: dict[str, Any]) -> str | None:
+        """Return the blocked word a joke contains, or None if it is clean."""
+        if (match := self._matcher.search(_padded(joke[ATTR_JOKE]))) is None:
+            return None
+        return match.strip()
+
+    def screen(self, provider: str, jokes: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Return the clean jokes of a batch, counting the rejected ones."""
+        clean = []
+        for joke in jokes:
+            if (word := self.blocked(joke)) is None:
+                clean.append(joke)
+                continue
+            self.rejects[provider] = self.rejects.get(provider, 0) + 1
+            _LOGGER.debug("Rejected a joke from %s containing %r", provider, word)
+        return clean
@@ -1,52 +1,59 @@
 """Jokes sensor platform."""
 from __future__ import annotations
 
-import asyncio
-from datetime import datetime, timedelta
 import logging
-import random
 from typing import Any
 
-import aiohttp
-import async_timeout
-
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
-    UpdateFailed,
-)
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
+from .channels import (
+    channel_title,
+    channel_unique_id,
+    entry_providers,
+    get_channels,
+)
+from .coordinator import JokesDataUpdateCoordinator
+from .explanations import (
+    ExplanationPrefetcher,
+    async_get_explanation_cache,
+    async_request_explanation,
+)
+from .jokelog import async_get_joke_log
+from .pool import joke_fingerprint
 from .const import (
-    API_HEADERS_GEEKJOKES,
-    API_HEADERS_ICANHAZDADJOKE,
-    API_HEADERS_JOKEAPI,
-    API_HEADERS_OFFICIAL,
-    API_HEADERS_YOMAMA,
-    API_URL_GEEKJOKES,
-    API_URL_ICANHAZDADJOKE,
-    API_URL_JOKEAPI,
-    API_URL_OFFICIAL,
-    API_URL_YOMAMA,
+    ATTR_CACHED,
+    ATTR_CATEGORY,
     ATTR_EXPLANATION,
+    ATTR_FLAGS,
+    ATTR_FROM_CACHE,
     ATTR_JOKE,
     ATTR_JOKE_ID,
+    ATTR_JOKE_REF,
     ATTR_LAST_UPDATED,
+    ATTR_POLLING,
+    ATTR_POOL_DEPTH,
+    ATTR_PREGENERATE_BUDGET,
+    ATTR_PREGENERATE_CALLS,
+    ATTR_PREGENERATE_HIT_RATE,
     ATTR_REFRESH_INTERVAL,
     ATTR_SOURCE,
+    CONF_CHANNEL_ID,
+    CONF_COMPACT_HISTORY,
     CONF_PROVIDERS,
     CONF_REFRESH_INTERVAL,
+    DEFAULT_COMPACT_HISTORY,
     DEFAULT_PROVIDERS,
     DEFAULT_REFRESH_INTERVAL,
     DOMAIN,
-    PROVIDER_GEEKJOKES,
-    PROVIDER_ICANHAZDADJOKE,
-    PROVIDER_JOKEAPI,
-    PROVIDER_OFFICIAL,
-    PROVIDER_YOMAMA,
     SENSOR_ICON,
     SENSOR_NAME,
     STATE_ERROR,
@@ -65,193 +72,40 @@ async def async_setup_entry(
     # Get coordinator from hass.data
     coordinator = hass.data[DOMAIN][config_entry.entry_id]["coordinator"]
     
-    # Create main joke sensor and explanation sensor
+    # Compact history keeps joke text and fast-changing attributes out of
+    # the recorder
+    if config_entry.options.get(CONF_COMPACT_HISTORY, DEFAULT_COMPACT_HISTORY):
+        joke_sensor_class = CompactJokesSensor
+        explanation_sensor_class = CompactJokeExplanationSensor
+    else:
+        joke_sensor_class = JokesSensor
+        explanation_sensor_class = JokeExplanationSensor
+
+    # Create main joke sensor and explanation sensor, the same pair for
+    # every channel, plus a diagnostic sensor per provider enabled for the
+    # entry or any of its channels
+    channels = hass.data[DOMAIN][config_entry.entry_id]["channels"]
+    channel_coordinators = {
+        channel_id: channel_data["coordinator"]
+        for channel_id, channel_data in channels.items()
+    }
     async_add_entities([
-        JokesSensor(coordinator, config_entry),
-        JokeExplanationSensor(coordinator, config_entry),
-    ], True)
-
-
-class JokesDataUpdateCoordinator(DataUpdateCoordinator):
-    """Class to manage fetching data from the API."""
-
-    def _build_provider_configs(self) -> list[dict[str, Any]]:
-        """Build provider configurations."""
-        return [
-            {
-                "name": PROVIDER_ICANHAZDADJOKE,
-                "url": API_URL_ICANHAZDADJOKE,
-                "headers": API_HEADERS_ICANHAZDADJOKE,
-                "parser": self._parse_icanhazdadjoke,
-            },
-            {
-                "name": PROVIDER_JOKEAPI,
-                "url": API_URL_JOKEAPI,
-                "headers": API_HEADERS_JOKEAPI,
-                "parser": self._parse_jokeapi,
-            },
-            {
-                "name": PROVIDER_OFFICIAL,
-                "url": API_URL_OFFICIAL,
-                "headers": API_HEADERS_OFFICIAL,
-                "parser": self._parse_official_joke_api,
-            },
-            {
-                "name": PROVIDER_GEEKJOKES,
-                "url": API_URL_GEEKJOKES,
-                "headers": API_HEADERS_GEEKJOKES,
-                "parser": self._parse_geekjokes,
-            },
-            {
-                "name": PROVIDER_YOMAMA,
-                "url": API_URL_YOMAMA,
-                "headers": API_HEADERS_YOMAMA,
-                "parser": self._parse_yomama,
-            },
-        ]
-
-    def __init__(self, hass: HomeAssistant, refresh_interval: int, enabled_providers: list[str]) -> None:
-        """Initialize."""
-        self.platforms = []
-        self._refresh_interval = refresh_interval
-        self._enabled_providers = enabled_providers if enabled_providers else DEFAULT_PROVIDERS
-        
-        # Filter to only enabled providers
-        self._providers = [p for p in self._build_provider_configs() if p["name"] in self._enabled_providers]
-        
-        super().__init__(
-            hass,
-            _LOGGER,
-            name=DOMAIN,
-            update_interval=timedelta(minutes=refresh_interval),
-        )
-
-    def _parse_icanhazdadjoke(self, data: dict) -> dict[str, Any]:
-        """Parse icanhazdadjoke.com response."""
-        return {
-            ATTR_JOKE: data.get("joke", ""),
-            ATTR_JOKE_ID: data.get("id", ""),
-            ATTR_SOURCE: "icanhazdadjoke.com",
-        }
-
-    def _parse_jokeapi(self, data: dict) -> dict[str, Any]:
-        """Parse JokeAPI v2 response."""
-        # JokeAPI returns different formats for single and two-part jokes
-        # We're using type=single, so we get the 'joke' field
-        joke_text = data.get("joke", "")
-        joke_id = str(data.get("id", ""))
-        
-        return {
-            ATTR_JOKE: joke_text,
-            ATTR_JOKE_ID: joke_id,
-            ATTR_SOURCE: "jokeapi.dev",
-        }
-
-    def _parse_official_joke_api(self, data: dict) -> dict[str, Any]:
-        """Parse Official Joke API response."""
-        # Official Joke API returns setup and punchline separately
-        setup = data.get("setup", "")
-        punchline = data.get("punchline", "")
-        joke_text = f"{setup} {punchline}" if setup and punchline else ""
-        joke_id = str(data.get("id", ""))
-        
-        return {
-            ATTR_JOKE: joke_text,
-            ATTR_JOKE_ID: joke_id,
-            ATTR_SOURCE: "official-joke-api.appspot.com",
-        }
-
-    def _parse_geekjokes(self, data: dict) -> dict[str, Any]:
-        """Parse Geek Jokes response."""
-        # Geek Jokes returns a single 'joke' field and no id
-        return {
-            ATTR_JOKE: data.get("joke", ""),
-            ATTR_JOKE_ID: "",
-            ATTR_SOURCE: "geek-jokes.sameerkumar.website",
-        }
-
-    def _parse_yomama(self, data: dict) -> dict[str, Any]:
-        """Parse Yo Mama Jokes response (adult/roast humour)."""
-        # Yo Mama returns a 'joke' field (plus a 'category') and no id
-        return {
-            ATTR_JOKE: data.get("joke", ""),
-            ATTR_JOKE_ID: "",
-            ATTR_SOURCE: "yomama-jokes.com",
-        }
-
-    async def _fetch_from_provider(
-        self, session: aiohttp.ClientSession, provider: dict
-    ) -> dict[str, Any] | None:
-        """Fetch joke from a specific provider."""
-        try:
-            async with session.get(
-                provider["url"], headers=provider["headers"]
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    parsed = provider["parser"](data)
-                    _LOGGER.debug(
-                        "Successfully fetched joke from %s", provider["name"]
-                    )
-                    return parsed
-                else:
-                    _LOGGER.warning(
-                        "Provider %s returned status %s",
-                        provider["name"],
-                        response.status,
-                    )
-                    return None
-        except Exception as err:
-            _LOGGER.warning(
-                "Error fetching from provider %s: %s", provider["name"], err
+        joke_sensor_class(coordinator, config_entry),
+        explanation_sensor_class(coordinator, config_entry),
+        *(
+            sensor_class(channels[channel[CONF_CHANNEL_ID]]["coordinator"], config_entry, channel)
+            for channel in get_channels(config_entry.options)
+            for sensor_class in (joke_sensor_class, explanation_sensor_class)
+        ),
+        *(
+            JokeProviderLatencySensor(
+                coordinator, config_entry, provider, channel_coordinators
             )
-            return None
-
-    async def _async_update_data(self) -> dict[str, Any]:
-        """Update data via library with fault tolerance."""
-        # Randomize provider order for each request
-        providers = self._providers.copy()
-        random.shuffle(providers)
-        
-        _LOGGER.debug("Attempting to fetch joke from providers in random order")
-        
-        try:
-            async with async_timeout.timeout(30):
-                async with aiohttp.ClientSession() as session:
-                    # Try each provider until one succeeds
-                    for provider in providers:
-                        result = await self._fetch_from_provider(session, provider)
-                        if result:
-                            # Add common attributes
-                            result[ATTR_LAST_UPDATED] = datetime.now().isoformat()
-                            result[ATTR_REFRESH_INTERVAL] = self._refresh_interval
-                            return result
-                    
-                    # If all providers failed
-                    raise UpdateFailed("All joke providers failed to respond")
-                    
-        except asyncio.TimeoutError as exception:
-            raise UpdateFailed(
-                f"Timeout communicating with joke APIs: {exception}"
-            ) from exception
-        except UpdateFailed:
-            raise
-        except Exception as exception:
-            raise UpdateFailed(
-                f"Error communicating with joke APIs: {exception}"
-            ) from exception
-
-    def update_refresh_interval(self, refresh_interval: int) -> None:
-        """Update the refresh interval."""
-        self._refresh_interval = refresh_interval
-        self.update_interval = timedelta(minutes=refresh_interval)
-
-    def update_enabled_providers(self, enabled_providers: list[str]) -> None:
-        """Update the enabled providers."""
-        self._enabled_providers = enabled_providers if enabled_providers else DEFAULT_PROVIDERS
-        
-        # Rebuild providers list using centralized configuration
-        self._providers = [p for p in self._build_provider_configs() if p["name"] in self._enabled_providers]
+            for provider in entry_providers(
+                [coordinator, *channel_coordinators.values()]
+            )
+        ),
+    ], True)
 
 
 class JokesSensor(CoordinatorEntity, SensorEntity):
@@ -261,13 +115,21 @@ class JokesSensor(CoordinatorEntity, SensorEntity):
         self,
         coordinator: JokesDataUpdateCoordinator,
         config_entry: ConfigEntry,
+        channel: dict[str, Any] | None = None,
     ) -> None:
-        """Initialize the sensor."""
+        """Initialize the sensor, for the entry itself or one of its channels."""
         super().__init__(coordinator)
         self._config_entry = config_entry
-        self._attr_name = SENSOR_NAME
+        self._channel = channel
         self._attr_icon = SENSOR_ICON
-        self._attr_unique_id = f"{DOMAIN}_{config_entry.entry_id}"
+        if channel is None:
+            self._attr_name = SENSOR_NAME
+            self._attr_unique_id = f"{DOMAIN}_{config_entry.entry_id}"
+        else:
+            self._attr_name = f"{SENSOR_NAME} {channel_title(channel)}"
+            self._attr_unique_id = channel_unique_id(
+                config_entry.entry_id, channel[CONF_CHANNEL_ID]
+            )
 
     @property
     def state(self) -> str:
@@ -286,18 +148,25 @@ class JokesSensor(CoordinatorEntity, SensorEntity):
             ATTR_JOKE: self.coordinator.data.get(ATTR_JOKE, ""),
             ATTR_JOKE_ID: self.coordinator.data.get(ATTR_JOKE_ID, ""),
             ATTR_SOURCE: self.coordinator.data.get(ATTR_SOURCE, ""),
+            ATTR_CATEGORY: self.coordinator.data.get(ATTR_CATEGORY, ""),
+            ATTR_FLAGS: self.coordinator.data.get(ATTR_FLAGS, []),
             ATTR_LAST_UPDATED: self.coordinator.data.get(ATTR_LAST_UPDATED, ""),
+            ATTR_FROM_CACHE: self.coordinator.data.get(ATTR_FROM_CACHE, False),
             ATTR_REFRESH_INTERVAL: self.coordinator.data.get(ATTR_REFRESH_INTERVAL, DEFAULT_REFRESH_INTERVAL),
+            ATTR_POOL_DEPTH: self.coordinator.pool_depth,
+            ATTR_POLLING: self.coordinator.polling,
         }
 
     async def async_added_to_hass(self) -> None:
         """When entity is added to hass."""
         await super().async_added_to_hass()
         
-        # Listen for options updates
-        self._config_entry.async_on_unload(
-            self._config_entry.add_update_listener(self._async_update_options)
-        )
+        # Listen for options updates; channels have their own settings and
+        # are set up again with the entry
+        if self._channel is None:
+            self._config_entry.async_on_unload(
+                self._config_entry.add_update_listener(self._async_update_options)
+            )
 
     async def _async_update_options(self, config_entry: ConfigEntry) -> None:
         """Update options."""
@@ -312,6 +181,56 @@ class JokesSensor(CoordinatorEntity, SensorEntity):
         await self.coordinator.async_request_refresh()
 
 
+class CompactJokesSensor(JokesSensor):
+    """Jokes sensor whose recorded history holds only a short joke reference.
+
+    The joke text is appended once to the joke log under that reference.
+    """
+
+    _unrecorded_attributes = frozenset(
+        {
+            ATTR_JOKE,
+            ATTR_JOKE_ID,
+            ATTR_SOURCE,
+            ATTR_CATEGORY,
+            ATTR_FLAGS,
+            ATTR_LAST_UPDATED,
+            ATTR_FROM_CACHE,
+            ATTR_REFRESH_INTERVAL,
+            ATTR_POOL_DEPTH,
+            ATTR_POLLING,
+        }
+    )
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the state attributes, plus the joke's log reference."""
+        attributes = super().extra_state_attributes
+        if joke := attributes.get(ATTR_JOKE):
+            attributes[ATTR_JOKE_REF] = joke_fingerprint(joke)
+        return attributes
+
+    async def async_added_to_hass(self) -> None:
+        """Log the current joke when the entity is added."""
+        await super().async_added_to_hass()
+        self._async_log_joke()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Log the new joke, then update state."""
+        self._async_log_joke()
+        super()._handle_coordinator_update()
+
+    @callback
+    def _async_log_joke(self) -> None:
+        """Append the current joke to the joke log in the background."""
+        if self.coordinator.data and self.coordinator.data.get(ATTR_JOKE):
+            self.hass.async_create_background_task(
+                async_get_joke_log(self.hass).async_append(self.coordinator.data),
+                f"{DOMAIN} joke log",
+            )
+
+
 class JokeExplanationSensor(CoordinatorEntity, SensorEntity):
     """Representation of a Joke Explanation sensor."""
 
@@ -319,14 +238,24 @@ class JokeExplanationSensor(CoordinatorEntity, SensorEntity):
         self,
         coordinator: JokesDataUpdateCoordinator,
         config_entry: ConfigEntry,
+        channel: dict[str, Any] | None = None,
     ) -> None:
-        """Initialize the sensor."""
+        """Initialize the sensor, for the entry itself or one of its channels."""
         super().__init__(coordinator)
         self._config_entry = config_entry
-        self._attr_name = "Joke Explanation"
+        self._channel = channel
         self._attr_icon = "mdi:comment-question-outline"
-        self._attr_unique_id = f"{DOMAIN}_{config_entry.entry_id}_explanation"
+        if channel is None:
+            self._attr_name = "Joke Explanation"
+            self._attr_unique_id = f"{DOMAIN}_{config_entry.entry_id}_explanation"
+        else:
+            self._attr_name = f"Joke Explanation {channel_title(channel)}"
+            self._attr_unique_id = channel_unique_id(
+                config_entry.entry_id, channel[CONF_CHANNEL_ID]
+            ) + "_explanation"
         self._explanation = None
+        self._cached = False
+        self._prefetcher: ExplanationPrefetcher | None = None
 
     @property
     def state(self) -> str:
@@ -338,39 +267,50 @@ class JokeExplanationSensor(CoordinatorEntity, SensorEntity):
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return the state attributes."""
-        return {
+        attributes = {
             ATTR_EXPLANATION: self._explanation or "No explanation available",
+            ATTR_CACHED: self._cached,
         }
-
-    async def async_explain_joke(self) -> None:
-        """Explain the current joke using AI."""
+        if self._prefetcher is not None:
+            attributes[ATTR_PREGENERATE_HIT_RATE] = self._prefetcher.hit_rate
+            attributes[ATTR_PREGENERATE_CALLS] = self._prefetcher.calls_last_hour
+            attributes[ATTR_PREGENERATE_BUDGET] = self._prefetcher.hourly_budget
+        return attributes
+
+    async def async_explain_joke(self, force: bool = False) -> None:
+        """Explain the current joke using AI.
+
+        Explanations are cached by joke fingerprint; ``force`` skips the cache
+        and asks the AI again.
+        """
         _LOGGER.info("=== Starting explain_joke service ===")
-        # Find the joke sensor entity dynamically
-        joke = None
-        joke_entity_id = None
-        
-        # Search for the joke sensor entity
-        for entity_id in self.hass.states.async_entity_ids("sensor"):
-            if entity_id.startswith(f"sensor.{DOMAIN}_") and "explanation" not in entity_id:
-                # This is likely our joke sensor
-                state = self.hass.states.get(entity_id)
-                if state and state.attributes.get(ATTR_JOKE):
-                    joke = state.attributes.get(ATTR_JOKE)
-                    joke_entity_id = entity_id
-                    break
-            elif entity_id == "sensor.joke":
-                # Check for the main joke sensor by name
-                state = self.hass.states.get(entity_id)
-                if state and state.attributes.get(ATTR_JOKE):
-                    joke = state.attributes.get(ATTR_JOKE)
-                    joke_entity_id = entity_id
-                    break
+        # The joke comes straight from the coordinator this sensor shares with
+        # its joke sensor, so the right entry's joke is used without a lookup.
+        joke = self.coordinator.data.get(ATTR_JOKE) if self.coordinator.data else None
+        joke_entry_id = self._config_entry.entry_id
         
+        self._cached = False
         if not joke:
             _LOGGER.warning("No joke available to explain")
             self._explanation = "No joke available to explain"
             self.async_write_ha_state()
             return
+
+        cache = await async_get_explanation_cache(self.hass)
+        fingerprint = joke_fingerprint(joke)
+        if not force and self._prefetcher is not None:
+            # A background explanation may be moments from finishing
+            await self._prefetcher.async_wait(fingerprint)
+        if not force and (explanation := cache.get(fingerprint)):
+            _LOGGER.debug("Using cached explanation for joke from entry %s", joke_entry_id)
+            self._explanation = explanation
+            self._cached = True
+            if self._prefetcher is not None:
+                self._prefetcher.record(hit=True)
+            self.async_write_ha_state()
+            return
+        if not force and self._prefetcher is not None:
+            self._prefetcher.record(hit=False)
         
         # Check if ai_task service is available
         if not self.hass.services.has_service("ai_task", "generate_data"):
@@ -381,26 +321,26 @@ class JokeExplanationSensor(CoordinatorEntity, SensorEntity):
         
         try:
             # Call the ai_task.generate_data service with correct parameters
-            _LOGGER.info("Calling ai_task.generate_data for joke from %s", joke_entity_id)
+            _LOGGER.info("Calling ai_task.generate_data for joke from entry %s", joke_entry_id)
             _LOGGER.info("Joke to explain: %s", joke[:100])
-            response = await self.hass.services.async_call(
-                "ai_task",
-                "generate_data",
-                {
-                    "task_name": "explain_joke",
-                    "instructions": f"Explain the following joke in plain language:\n{joke}",
-                },
-                blocking=True,
-                return_response=True,
-            )
+            response = await async_request_explanation(self.hass, joke)
             
             _LOGGER.info("AI service response: %s", response)
             _LOGGER.info("Response type: %s", type(response))
+
+            current = self.coordinator.data.get(ATTR_JOKE) if self.coordinator.data else None
+            if current != joke:
+                # The joke rotated while the AI was thinking; the answer is
+                # cached for later, but not shown next to a different joke.
+                _LOGGER.debug("Dropping explanation for a joke that is no longer shown")
+                return
             
             if response:
                 # The azure_ai_tasks service returns a dict with 'data' key containing the text
-                if isinstance(response, dict):
-                    self._explanation = response.get("data", "Unable to generate explanation")
+                if isinstance(response, dict) and response.get("data"):
+                    self._explanation = response["data"]
+                elif isinstance(response, dict):
+                    self._explanation = "Unable to generate explanation"
                 else:
                     self._explanation = str(response)
             else:
@@ -420,4 +360,109 @@ class JokeExplanationSensor(CoordinatorEntity, SensorEntity):
         
         # Store reference to this entity in hass.data for service calls
         if DOMAIN in self.hass.data and self._config_entry.entry_id in self.hass.data[DOMAIN]:
-            self.hass.data[DOMAIN][self._config_entry.entry_id]["explanation_entity"] = self
+            entry_data = self.hass.data[DOMAIN][self._config_entry.entry_id]
+            if self._channel is not None:
+                entry_data = entry_data["channels"][self._channel[CONF_CHANNEL_ID]]
+            entry_data["explanation_entity"] = self
+
+            # One prefetcher, and so one budget, serves the entry and its channels
+            self._prefetcher = self.hass.data[DOMAIN][self._config_entry.entry_id][
+                "prefetcher"
+            ]
+        self._async_pregenerate()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Drop this sensor's background explanation work when it is removed."""
+        await super().async_will_remove_from_hass()
+        if self._prefetcher is not None:
+            self._prefetcher.async_forget(self.unique_id)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Pre-generate explanations for the new joke, then update state."""
+        self._async_pregenerate()
+        super()._handle_coordinator_update()
+
+    @callback
+    def _async_pregenerate(self) -> None:
+        """Queue explanations for the current joke first, then pooled jokes."""
+        if self._prefetcher is None or not self.coordinator.data:
+            return
+        if not self.hass.services.has_service("ai_task", "generate_data"):
+            return
+        self._prefetcher.async_update(
+            self.unique_id,
+            [self.coordinator.data.get(ATTR_JOKE, ""), *self.coordinator.pooled_jokes],
+        )
+
+
+class CompactJokeExplanationSensor(JokeExplanationSensor):
+    """Joke explanation sensor that keeps explanation text out of the recorder."""
+
+    _unrecorded_attributes = frozenset(
+        {
+            ATTR_EXPLANATION,
+            ATTR_PREGENERATE_HIT_RATE,
+            ATTR_PREGENERATE_CALLS,
+            ATTR_PREGENERATE_BUDGET,
+        }
+    )
+
+
+class JokeProviderLatencySensor(CoordinatorEntity, SensorEntity):
+    """Diagnostic sensor with a provider's p95 latency and request metrics."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_icon = "mdi:timer-outline"
+    # The p95 state is what history needs; the counters change on every
+    # request and would only bloat the recorder.
+    _unrecorded_attributes = frozenset(
+        {
+            "requests",
+            "successes",
+            "failures",
+            "timeouts",
+            "latency_p50_ms",
+            "latency_p95_ms",
+            "latency_p99_ms",
+            "latency_max_ms",
+            "response_bytes",
+            "parse_time_ms",
+            "health",
+            "quota",
+            "safety_rejects",
+            "channel_safety_rejects",
+        }
+    )
+
+    def __init__(
+        self,
+        coordinator: JokesDataUpdateCoordinator,
+        config_entry: ConfigEntry,
+        provider: str,
+        channels: dict[str, JokesDataUpdateCoordinator],
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._provider = provider
+        self._channels = channels
+        self._attr_name = f"Joke provider {provider} latency"
+        self._attr_unique_id = f"{DOMAIN}_{config_entry.entry_id}_{provider}_latency"
+
+    @property
+    def available(self) -> bool:
+        """Stay available when refreshes fail; that is when the metrics matter."""
+        return True
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the provider's p95 latency in milliseconds."""
+        return self.coordinator.provider_stats(self._provider)["latency_p95_ms"]
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return request counts, latency percentiles, health and quota."""
+        return self.coordinator.provider_stats(self._provider, self._channels)
@@ -0,0 +1,83 @@
+"""Single-flight helper for the Jokes integration: share identical work in flight."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Coroutine, Hashable
+import logging
+from typing import Any, Generic, TypeVar
+
+from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+_KeyT = TypeVar("_KeyT", bound=Hashable)
+_ResultT = TypeVar("_ResultT")
+
+
+class _Call(Generic[_ResultT]):
+    """A task in flight and the number of callers waiting on it."""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task[_ResultT]) -> None:
+        """Initialize with no waiters yet."""
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight(Generic[_KeyT, _ResultT]):
+    """Run at most one task per key; concurrent callers share its result.
+
+    The task runs in the background and each caller awaits it through a
+    shield, so a cancelled caller, such as a losing hedged request, does not
+    cancel it for the others. Once the last caller has left, the task is
+    cancelled: nobody wants its result any more.
+    """
+
+    def __init__(self, hass: HomeAssistant, name: str) -> None:
+        """Initialize with nothing in flight; ``name`` labels the tasks."""
+        self._hass = hass
+        self._name = name
+        self._calls: dict[_KeyT, _Call[_ResultT]] = {}
+
+    def __contains__(self, key: object) -> bool:
+        """Return whether a task for ``key`` is in flight."""
+        return key in self._calls
+
+    def __len__(self) -> int:
+        """Return the number of tasks in flight."""
+        return len(self._calls)
+
+    async def async_run(
+        self,
+        key: _KeyT,
+        factory: Callable[[], Coroutine[Any, Any, _ResultT]],
+    ) -> _ResultT:
+        """Return the result of the task for ``key``, starting it with ``factory`` if needed."""
+        if (call := self._calls.get(key)) is None:
+            call = self._calls[key] = _Call(
+                self._hass.async_create_background_task(
+                    factory(), f"{self._name} {key}"
+                )
+            )
+            call.task.add_done_callback(
+                lambda _: self._calls.pop(key, None)
+                if self._calls.get(key) is call
+                else None
+            )
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if not call.waiters and not call.task.done():
+                _LOGGER.debug("Cancelling %s %s: nobody waits for it", self._name, key)
+                self._calls.pop(key, None)
+                call.task.cancel()
+
+    def cancel_all(self) -> None:
+        """Cancel every task in flight."""
+        for call in self._calls.values():
+            call.task.cancel()
+        self._calls.clear()
@@ -0,0 +1,38 @@
+"""Persistent on-disk state for the Jokes integration."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, STORAGE_SAVE_DELAY, STORAGE_VERSION
+
+
+class JokesStore:
+    """Per-entry `.storage` file holding the current joke and a rolling cache.
+
+    Writes are debounced: any number of save requests within
+    ``STORAGE_SAVE_DELAY`` seconds collapse into a single write, and Home
+    Assistant flushes a pending write when it shuts down.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the store for a config entry."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}"
+        )
+
+    async def async_load(self) -> dict[str, Any]:
+        """Load the stored state, or an empty dict if there is none."""
+        return await self._store.async_load() or {}
+
+    @callback
+    def async_schedule_save(self, data_func: Callable[[], dict[str, Any]]) -> None:
+        """Schedule a debounced write of the state returned by ``data_func``."""
+        self._store.async_delay_save(data_func, STORAGE_SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        """Delete the stored state."""
+        await self._store.async_remove()
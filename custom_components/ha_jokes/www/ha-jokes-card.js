@@ -2,15 +2,26 @@
  * ha-jokes-card — a custom Lovelace card for the ha_jokes integration.
  *
  * Displays the current joke, its source, an "Explain it" button (AI explanation
- * via the ha_jokes.explain_joke service), a "New joke" button (forces a refresh),
- * and a conditional explanation panel. Dependency-free vanilla web component — no
- * build step. Bundled with the integration and auto-registered as a frontend
- * resource, so it needs no manual "add resource" step.
+ * via the ha_jokes.explain_joke service), a "New joke" button (ha_jokes.next_joke,
+ * which shows an already-fetched joke at once) and a conditional explanation
+ * panel. Dependency-free vanilla web component — no build step. Bundled with the
+ * integration and auto-registered as a frontend resource, so it needs no manual
+ * "add resource" step.
+ *
+ * While mounted and visible, the card holds a ha_jokes/subscribe_viewer websocket
+ * subscription so that an entry in on-demand refresh mode only polls while
+ * somebody is actually looking.
+ *
+ * Home Assistant sets `hass` on every state change anywhere in the instance. The
+ * card only renders when the state object of its joke or explanation entity has
+ * changed (Home Assistant replaces a state object whenever it changes, so an
+ * identity check is enough), and then only touches the text nodes whose text
+ * actually differs.
  *
  * Version is kept in lockstep with the integration's manifest.json.
  */
 
-const CARD_VERSION = "1.4.0";
+const CARD_VERSION = "1.5.0";
 
 console.info(
   `%c HA-JOKES-CARD %c v${CARD_VERSION} `,
@@ -34,12 +45,71 @@ class HaJokesCard extends HTMLElement {
     };
     // Rebuild the DOM on (re)config.
     this._built = false;
+    this._jokeState = undefined;
+    this._explanationState = undefined;
     if (this._hass) this._render();
+    this._syncViewer();
   }
 
   set hass(hass) {
     this._hass = hass;
+    const cfg = this._config;
+    if (
+      cfg &&
+      this._built &&
+      hass.states[cfg.entity] === this._jokeState &&
+      hass.states[cfg.explanation_entity] === this._explanationState
+    ) {
+      // Some other entity changed; nothing on this card did.
+      if (!this._viewerSub) this._syncViewer();
+      return;
+    }
     this._render();
+    this._syncViewer();
+  }
+
+  connectedCallback() {
+    this._connected = true;
+    if (!this._onVisibility) {
+      this._onVisibility = () => this._syncViewer();
+    }
+    document.addEventListener("visibilitychange", this._onVisibility);
+    // Renders are now driven by our own entities only, so keep the
+    // "updated ... ago" label ticking on a slow timer.
+    if (!this._ticker) {
+      this._ticker = setInterval(() => this._renderUpdated(), 30000);
+    }
+    this._syncViewer();
+  }
+
+  disconnectedCallback() {
+    this._connected = false;
+    document.removeEventListener("visibilitychange", this._onVisibility);
+    clearInterval(this._ticker);
+    this._ticker = undefined;
+    this._syncViewer();
+  }
+
+  // Count as a viewer of the entity's entry while mounted and the tab is visible.
+  _syncViewer() {
+    const entity = this._config && this._config.entity;
+    const want =
+      this._connected && this._hass && entity && document.visibilityState !== "hidden";
+
+    if (this._viewerSub && (!want || this._viewerEntity !== entity)) {
+      const sub = this._viewerSub;
+      this._viewerSub = undefined;
+      sub.then((unsub) => unsub && unsub()).catch(() => {});
+    }
+    if (want && !this._viewerSub) {
+      this._viewerEntity = entity;
+      this._viewerSub = this._hass.connection
+        .subscribeMessage(() => {}, {
+          type: "ha_jokes/subscribe_viewer",
+          entity_id: entity,
+        })
+        .catch(() => undefined);
+    }
   }
 
   getCardSize() {
@@ -130,7 +200,8 @@ class HaJokesCard extends HTMLElement {
     this.innerHTML = "";
     this.appendChild(card);
 
-    // Cache references.
+    // Cache references, and the text last written to each element.
+    this._text = new Map();
     this._els = {
       titleText: wrap.querySelector(".title-text"),
       joke: wrap.querySelector(".joke"),
@@ -146,11 +217,15 @@ class HaJokesCard extends HTMLElement {
 
     // Wire buttons once.
     this._els.explainBtn.addEventListener("click", () => {
-      if (this._hass) this._hass.callService("ha_jokes", "explain_joke");
+      if (this._hass) {
+        this._hass.callService("ha_jokes", "explain_joke", {
+          entity_id: this._config.entity,
+        });
+      }
     });
     this._els.newBtn.addEventListener("click", () => {
       if (this._hass) {
-        this._hass.callService("homeassistant", "update_entity", {
+        this._hass.callService("ha_jokes", "next_joke", {
           entity_id: this._config.entity,
         });
       }
@@ -159,6 +234,21 @@ class HaJokesCard extends HTMLElement {
     this._built = true;
   }
 
+  // Write text to an element only when it differs from what it already shows.
+  _setText(el, text) {
+    if (this._text.get(el) === text) return;
+    this._text.set(el, text);
+    el.textContent = text;
+  }
+
+  _renderUpdated() {
+    if (!this._built) return;
+    const st = this._jokeState;
+    const upd = st && st.attributes ? st.attributes.last_updated : "";
+    const rel = this._relativeTime(upd);
+    this._setText(this._els.upd, rel ? `🕒 ${rel}` : "");
+  }
+
   _render() {
     if (!this._config || !this._hass) return;
     if (!this._built) this._build();
@@ -166,42 +256,36 @@ class HaJokesCard extends HTMLElement {
     const els = this._els;
     const cfg = this._config;
     const st = this._hass.states[cfg.entity];
+    const exp = this._hass.states[cfg.explanation_entity];
+    this._jokeState = st;
+    this._explanationState = exp;
 
-    els.titleText.textContent = cfg.title;
+    this._setText(els.titleText, cfg.title);
 
     const joke = st && st.attributes ? st.attributes.joke : "";
-    if (joke) {
-      els.joke.textContent = joke;
-      els.joke.classList.remove("empty");
-    } else {
-      els.joke.textContent = "No joke right now — the next one is on its way…";
-      els.joke.classList.add("empty");
-    }
+    this._setText(
+      els.joke,
+      joke || "No joke right now — the next one is on its way…"
+    );
+    els.joke.classList.toggle("empty", !joke);
 
     // Source + updated meta.
     const source = st && st.attributes ? st.attributes.source : "";
-    if (cfg.show_source && source) {
-      els.src.textContent = `🎲 ${source}`;
-      els.src.classList.remove("hidden");
-    } else {
-      els.src.classList.add("hidden");
-    }
-    const upd = st && st.attributes ? st.attributes.last_updated : "";
-    const rel = this._relativeTime(upd);
-    els.upd.textContent = rel ? `🕒 ${rel}` : "";
+    const showSource = Boolean(cfg.show_source && source);
+    if (showSource) this._setText(els.src, `🎲 ${source}`);
+    els.src.classList.toggle("hidden", !showSource);
+    this._renderUpdated();
 
     // Buttons.
     els.buttons.classList.toggle("hidden", !cfg.show_buttons);
 
     // Explanation panel — shown when the explanation entity reports "Explained".
-    const exp = this._hass.states[cfg.explanation_entity];
-    const explained = exp && exp.state === "Explained";
-    if (explained && exp.attributes && exp.attributes.explanation) {
-      els.explanationText.textContent = exp.attributes.explanation;
-      els.explanation.classList.remove("hidden");
-    } else {
-      els.explanation.classList.add("hidden");
-    }
+    const explanation =
+      exp && exp.state === "Explained" && exp.attributes
+        ? exp.attributes.explanation
+        : "";
+    if (explanation) this._setText(els.explanationText, explanation);
+    els.explanation.classList.toggle("hidden", !explanation);
   }
 }
 
@@ -0,0 +1,137 @@
+"""Tests for the offline joke corpus."""
+from pathlib import Path
+
+from custom_components.ha_jokes.const import ATTR_JOKE
+from custom_components.ha_jokes.corpus import JokeCorpus
+
+# Enough draws that every line of a small corpus is picked at least once.
+_DRAWS = 500
+
+
+def _jokes(corpus: JokeCorpus) -> set[str]:
+    """Return the text of every joke the corpus serves."""
+    return {joke[ATTR_JOKE] for joke in corpus.random_jokes(_DRAWS)}
+
+
+def test_plain_text_corpus(tmp_path: Path) -> None:
+    """Each non-blank line of a text file is a joke."""
+    path = tmp_path / "jokes.txt"
+    path.write_text("first joke\n\nsecond joke\n")
+    corpus = JokeCorpus(path)
+
+    assert _jokes(corpus) == {"first joke", "second joke"}
+    assert corpus.line_count == 3
+    corpus.close()
+
+
+def test_json_lines_corpus(tmp_path: Path) -> None:
+    """JSON lines give a joke or a setup and punchline, with id and category."""
+    path = tmp_path / "jokes.jsonl"
+    path.write_text(
+        '{"joke": "A joke", "id": 7, "category": "pun"}\n'
+        '{"setup": "Why?", "punchline": "Because."}\n'
+    )
+    corpus = JokeCorpus(path)
+
+    jokes = {joke[ATTR_JOKE]: joke for joke in corpus.random_jokes(_DRAWS)}
+    assert set(jokes) == {"A joke", "Why? Because."}
+    assert jokes["A joke"]["joke_id"] == "7"
+    assert jokes["A joke"]["category"] == "pun"
+    corpus.close()
+
+
+def test_appended_lines_are_indexed(tmp_path: Path) -> None:
+    """Lines appended to a loaded corpus are picked up incrementally."""
+    path = tmp_path / "jokes.txt"
+    path.write_text("one\ntwo\n")
+    corpus = JokeCorpus(path)
+    assert _jokes(corpus) == {"one", "two"}
+
+    with path.open("a") as corpus_file:
+        corpus_file.write("three\n")
+
+    assert _jokes(corpus) == {"one", "two", "three"}
+    assert corpus.line_count == 3
+    corpus.close()
+
+
+def test_rewritten_corpus_is_reindexed(tmp_path: Path) -> None:
+    """A corpus rewritten with new content is indexed again from scratch."""
+    path = tmp_path / "jokes.txt"
+    path.write_text("alpha\nbeta\n")
+    corpus = JokeCorpus(path)
+    assert _jokes(corpus) == {"alpha", "beta"}
+
+    path.write_text("gamma\ndelta\nepsilon\n")
+
+    assert _jokes(corpus) == {"gamma", "delta", "epsilon"}
+    corpus.close()
+
+
+def test_index_is_reused_by_a_new_corpus(tmp_path: Path) -> None:
+    """A fresh JokeCorpus reads the existing sidecar index."""
+    path = tmp_path / "jokes.txt"
+    path.write_text("one\ntwo\n")
+    first = JokeCorpus(path)
+    first.random_jokes(1)
+    first.close()
+    indexed = first.index_path.read_bytes()
+
+    corpus = JokeCorpus(path)
+    assert _jokes(corpus) == {"one", "two"}
+    assert corpus.index_path.read_bytes() == indexed
+    corpus.close()
+
+
+def test_csv_header_names_the_joke_column(tmp_path: Path) -> None:
+    """A CSV header with a joke column selects it and is not served as a joke."""
+    path = tmp_path / "jokes.csv"
+    path.write_text('id,joke\n1,"Hello, world"\n2,Second\n')
+    corpus = JokeCorpus(path)
+
+    assert _jokes(corpus) == {"Hello, world", "Second"}
+    corpus.close()
+
+
+def test_csv_without_header_uses_first_column(tmp_path: Path) -> None:
+    """Without a joke header, the first column holds the joke."""
+    path = tmp_path / "jokes.csv"
+    path.write_text("First,pun\nSecond,dad\n")
+    corpus = JokeCorpus(path)
+
+    assert _jokes(corpus) == {"First", "Second"}
+    corpus.close()
+
+
+def test_unterminated_last_line(tmp_path: Path) -> None:
+    """A last line without a newline is served, and appending to it is safe."""
+    path = tmp_path / "jokes.txt"
+    path.write_text("one\ntw")
+    corpus = JokeCorpus(path)
+    assert _jokes(corpus) == {"one", "tw"}
+
+    with path.open("a") as corpus_file:
+        corpus_file.write("o\nthree\n")
+
+    assert _jokes(corpus) == {"one", "two", "three"}
+    corpus.close()
+
+
+def test_half_written_json_line_is_skipped(tmp_path: Path) -> None:
+    """A JSON object still being appended is never served."""
+    path = tmp_path / "jokes.jsonl"
+    path.write_text('{"joke": "Complete"}\n{"joke": "Half')
+    corpus = JokeCorpus(path)
+
+    assert _jokes(corpus) == {"Complete"}
+    corpus.close()
+
+
+def test_empty_corpus(tmp_path: Path) -> None:
+    """An empty file serves no jokes."""
+    path = tmp_path / "jokes.txt"
+    path.write_text("")
+    corpus = JokeCorpus(path)
+
+    assert corpus.random_jokes(3) == []
+    corpus.close()
@@ -0,0 +1,158 @@
+"""Tests for the shared fetch hub."""
+import asyncio
+from collections.abc import AsyncGenerator
+import time
+from typing import Any
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.ha_jokes.const import ATTR_JOKE, PROVIDER_OFFICIAL
+from custom_components.ha_jokes.hub import JokesFetchHub
+
+JOKES = [{ATTR_JOKE: "A joke"}]
+
+
+class _Provider:
+    """Stand-in for a provider request that answers when released."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.cancelled = 0
+        self.release = asyncio.Event()
+
+    async def fetch(
+        self, provider: dict, bulk: bool, corpus_path: str | None
+    ) -> list[dict[str, Any]]:
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return JOKES
+
+
+class _Subscriber:
+    """Records every batch the hub offers it."""
+
+    def __init__(self) -> None:
+        self.offers: list[tuple[str, list[dict[str, Any]]]] = []
+
+    def accepts(self, provider: str, corpus_path: str | None) -> bool:
+        return True
+
+    def offer_jokes(self, provider: str, jokes: list[dict[str, Any]]) -> None:
+        self.offers.append((provider, jokes))
+
+
+@pytest.fixture
+async def hub(hass: HomeAssistant) -> AsyncGenerator[JokesFetchHub, None]:
+    """Return a hub, closed after the test."""
+    hub = JokesFetchHub(hass)
+    yield hub
+    await hub.async_close()
+
+
+@pytest.fixture
+def provider(hub: JokesFetchHub, monkeypatch: pytest.MonkeyPatch) -> _Provider:
+    """Route every provider request of the hub to a stand-in."""
+    provider = _Provider()
+    monkeypatch.setattr(hub, "_fetch_from_provider", provider.fetch)
+    return provider
+
+
+def _fetch(hub: JokesFetchHub) -> asyncio.Task:
+    return asyncio.create_task(hub.async_fetch(PROVIDER_OFFICIAL, False, 10))
+
+
+async def test_concurrent_fetches_share_one_request(
+    hub: JokesFetchHub, provider: _Provider
+) -> None:
+    """Identical requests in flight share one provider request and one offer."""
+    subscriber = _Subscriber()
+    hub.async_subscribe(subscriber)
+
+    first, second = _fetch(hub), _fetch(hub)
+    await asyncio.sleep(0)
+    provider.release.set()
+
+    assert await first == JOKES
+    assert await second == JOKES
+    assert provider.calls == 1
+    assert hub.coalesced == 1
+    assert subscriber.offers == [(PROVIDER_OFFICIAL, JOKES)]
+
+
+async def test_cancelled_waiter_leaves_request_to_others(
+    hub: JokesFetchHub, provider: _Provider
+) -> None:
+    """Cancelling one caller does not cancel the request another waits on."""
+    first, second = _fetch(hub), _fetch(hub)
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    provider.release.set()
+
+    assert await second == JOKES
+    assert first.cancelled()
+    assert provider.cancelled == 0
+
+
+async def test_last_waiter_cancels_request(
+    hub: JokesFetchHub, provider: _Provider
+) -> None:
+    """Once nobody waits, the request is cancelled and a new one can start."""
+    first = _fetch(hub)
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    assert provider.cancelled == 1
+
+    provider.release.set()
+    assert await _fetch(hub) == JOKES
+    assert provider.calls == 2
+    assert hub.coalesced == 0
+
+
+async def test_unsubscribed_subscriber_gets_no_offers(
+    hub: JokesFetchHub, provider: _Provider
+) -> None:
+    """A subscriber stops receiving batches once it unsubscribes."""
+    subscriber = _Subscriber()
+    hub.async_subscribe(subscriber)()
+    provider.release.set()
+
+    assert await _fetch(hub) == JOKES
+    assert subscriber.offers == []
+
+
+async def test_throttled_provider_is_skipped(
+    hub: JokesFetchHub, provider: _Provider
+) -> None:
+    """A rate-limited provider returns nothing without sending a request."""
+    hub.limits.get(PROVIDER_OFFICIAL).record_response(
+        429, {"Retry-After": "60"}, time.monotonic()
+    )
+
+    assert await _fetch(hub) is None
+    assert provider.calls == 0
+    assert hub.throttled == 1
+
+
+async def test_close_cancels_requests_in_flight(
+    hub: JokesFetchHub, provider: _Provider
+) -> None:
+    """Closing the hub cancels the requests it is still waiting on."""
+    pending = _fetch(hub)
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert provider.calls == 1
+    await hub.async_close()
+
+    with pytest.raises(asyncio.CancelledError):
+        await pending
+    assert provider.cancelled == 1
@@ -0,0 +1,137 @@
+"""Tests for per-provider rate limiting."""
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+import time
+
+import pytest
+
+from custom_components.ha_jokes import ratelimit
+from custom_components.ha_jokes.const import (
+    RATE_LIMIT_BACKOFF_BASE,
+    RATE_LIMIT_BACKOFF_MAX,
+    RATE_LIMIT_DEFAULT,
+    RATE_LIMIT_JOKEAPI,
+)
+from custom_components.ha_jokes.ratelimit import (
+    ProviderRateLimit,
+    RateLimitTracker,
+    parse_retry_after,
+)
+
+NOW = 1000.0
+
+
+@pytest.fixture
+def limit() -> ProviderRateLimit:
+    """Return a full bucket of 2 requests per 10 seconds, last refilled at NOW."""
+    limit = ProviderRateLimit("test", 2, 10)
+    limit._updated = NOW
+    return limit
+
+
+@pytest.fixture(autouse=True)
+def no_jitter(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Make backoff delays deterministic: always the full exponential delay."""
+    monkeypatch.setattr(ratelimit.random, "uniform", lambda low, high: high)
+
+
+def test_bucket_empties_and_refills(limit: ProviderRateLimit) -> None:
+    """The bucket allows its rate, then one more request per refill interval."""
+    assert limit.try_acquire(NOW)
+    assert limit.try_acquire(NOW)
+    assert not limit.try_acquire(NOW)
+    assert limit.retry_in(NOW) == pytest.approx(5)
+
+    assert not limit.try_acquire(NOW + 4.9)
+    assert limit.try_acquire(NOW + 5)
+
+
+def test_bucket_never_overfills(limit: ProviderRateLimit) -> None:
+    """An idle provider does not save up more than its capacity."""
+    assert limit.try_acquire(NOW + 3600)
+    assert limit.try_acquire(NOW + 3600)
+    assert not limit.try_acquire(NOW + 3600)
+
+
+def test_backoff_grows_and_resets(limit: ProviderRateLimit) -> None:
+    """429s and 5xx back off exponentially; a success resets the attempts."""
+    limit.record_response(429, {}, NOW)
+    assert limit.retry_in(NOW) == pytest.approx(RATE_LIMIT_BACKOFF_BASE)
+
+    limit.record_response(503, {}, NOW)
+    assert limit.retry_in(NOW) == pytest.approx(RATE_LIMIT_BACKOFF_BASE * 2)
+    assert limit.backoff_attempts == 2
+
+    limit.record_response(200, {}, NOW)
+    assert limit.backoff_attempts == 0
+
+
+def test_backoff_is_capped(limit: ProviderRateLimit) -> None:
+    """The backoff delay never exceeds RATE_LIMIT_BACKOFF_MAX."""
+    for _ in range(30):
+        limit.record_response(500, {}, NOW)
+    assert limit.retry_in(NOW) == pytest.approx(RATE_LIMIT_BACKOFF_MAX)
+
+
+def test_client_errors_neither_back_off_nor_reset(limit: ProviderRateLimit) -> None:
+    """A 404 is not the provider asking us to slow down."""
+    limit.record_response(429, {}, NOW)
+    limit.record_response(404, {}, NOW)
+    assert limit.backoff_attempts == 1
+
+
+def test_retry_after_longer_than_backoff(limit: ProviderRateLimit) -> None:
+    """A Retry-After longer than the backoff delay is honoured."""
+    limit.record_response(429, {"Retry-After": "120"}, NOW)
+    assert limit.retry_in(NOW) == pytest.approx(120)
+    assert not limit.try_acquire(NOW + 119)
+    assert limit.try_acquire(NOW + 120)
+
+
+def test_quota_headers_cap_the_bucket(limit: ProviderRateLimit) -> None:
+    """The server's remaining quota caps the local bucket."""
+    limit.record_response(200, {"RateLimit-Remaining": "1", "RateLimit-Limit": "50"}, NOW)
+    assert limit.try_acquire(NOW)
+    assert not limit.try_acquire(NOW)
+    assert limit.server_limit == 50
+
+
+def test_exhausted_quota_blocks_until_reset(limit: ProviderRateLimit) -> None:
+    """No requests left blocks the provider until the quota resets."""
+    limit.record_response(
+        200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "30"}, NOW
+    )
+    assert limit.retry_in(NOW) == pytest.approx(30)
+
+
+def test_as_dict() -> None:
+    """The snapshot reports remaining requests, limit, throttling and backoff."""
+    limit = ProviderRateLimit("test", 2, 10)
+    limit.try_acquire(time.monotonic())
+    assert limit.as_dict() == {
+        "remaining": 1,
+        "limit": 2,
+        "throttled_for": 0,
+        "backoff_attempts": 0,
+    }
+
+
+def test_parse_retry_after() -> None:
+    """Retry-After is either delay seconds or an HTTP date."""
+    assert parse_retry_after("10") == 10
+    assert parse_retry_after("-5") == 0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=60)
+    assert parse_retry_after(format_datetime(retry_at, usegmt=True)) == pytest.approx(
+        60, abs=2
+    )
+
+
+def test_tracker_uses_per_provider_rates() -> None:
+    """Providers without a configured rate get the default one, created once."""
+    tracker = RateLimitTracker({"jokeapi": RATE_LIMIT_JOKEAPI})
+    assert tracker.get("jokeapi").capacity == RATE_LIMIT_JOKEAPI
+    assert tracker.get("official").capacity == RATE_LIMIT_DEFAULT
+    assert tracker.get("official") is tracker.get("official")
+    assert tracker.get("official").retry_in(time.monotonic()) == 0
@@ -0,0 +1,65 @@
+"""Tests for the content safety filter."""
+from custom_components.ha_jokes.const import ATTR_JOKE
+from custom_components.ha_jokes.safety import AhoCorasick, ContentFilter
+
+
+def _joke(text: str) -> dict[str, str]:
+    return {ATTR_JOKE: text}
+
+
+def test_aho_corasick_finds_any_pattern() -> None:
+    """Every pattern is found, wherever it sits in the text."""
+    matcher = AhoCorasick(["he", "she", "his", "hers"])
+    assert matcher.search("ushers") == "she"
+    assert matcher.search("this") == "his"
+    assert matcher.search("ahe") == "he"
+    assert matcher.search("xyz") is None
+
+
+def test_aho_corasick_follows_failure_links() -> None:
+    """A partial match that fails falls back to the longest matching suffix."""
+    matcher = AhoCorasick(["abcd", "bce"])
+    assert matcher.search("abce") == "bce"
+    assert matcher.search("abcd") == "abcd"
+
+
+def test_aho_corasick_reports_pattern_inside_longer_one() -> None:
+    """A pattern ending inside a longer pattern's path is still reported."""
+    matcher = AhoCorasick(["abcde", "bc"])
+    assert matcher.search("xabcx") == "bc"
+
+
+def test_aho_corasick_without_patterns() -> None:
+    """An empty automaton never matches."""
+    assert AhoCorasick([]).search("anything") is None
+
+
+def test_content_filter_matches_whole_words_only() -> None:
+    """Blocked words match case-insensitively, ignoring punctuation, as whole words."""
+    content_filter = ContentFilter(["spoiler"])
+    assert content_filter.blocked(_joke("No SPOILER! here")) == "spoiler"
+    assert content_filter.blocked(_joke("Spoilers are fine")) is None
+
+
+def test_content_filter_matches_phrases() -> None:
+    """Blocked phrases match across punctuation between their words."""
+    content_filter = ContentFilter(["bad joke"])
+    assert content_filter.blocked(_joke("What a bad, joke.")) == "bad joke"
+    assert content_filter.blocked(_joke("What a bad pun")) is None
+
+
+def test_content_filter_ignores_blank_words() -> None:
+    """Empty or punctuation-only blocklist entries block nothing."""
+    assert ContentFilter(["", "!!"]).blocked(_joke("A clean joke")) is None
+
+
+def test_content_filter_screen_counts_rejects_per_provider() -> None:
+    """Screening keeps clean jokes in order and counts rejects by provider."""
+    content_filter = ContentFilter(["spoiler"])
+    jokes = [_joke("first"), _joke("a spoiler"), _joke("second")]
+
+    assert content_filter.screen("jokeapi", jokes) == [jokes[0], jokes[2]]
+    content_filter.screen("jokeapi", [_joke("spoiler alert")])
+    content_filter.screen("official", [_joke("clean")])
+
+    assert content_filter.rejects == {"jokeapi": 2}